@@ -1,18 +1,26 @@
-from fastapi import APIRouter, HTTPException, Depends
-from uuid import UUID
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Response
+from uuid import UUID, uuid4
+from typing import List, Optional
 from datetime import datetime
 import logging
 
-from app.database import get_supabase_client
+from app.repositories import get_repositories
 from app.models.pydantic_models import (
     CreateScanRequest,
+    RedFlagResponse,
     ScanResponse,
     ScanResultResponse
 )
 from app.models.db_models import Scan
 from app.services.scoring_engine import ScoringEngine
 from app.services.red_flag_engine import RedFlagEngine
+from app.services.red_flag_rules import get_red_flag_rule_store
+from app.services.red_flag_store import build_red_flag_rows
+from app.services.pattern_aggregator import get_pattern_aggregator
+from app.services.dual_scan_session import get_dual_scan_session_service
+from app.services.profile_cache import get_profile_cache
+from app.services.scan_features import ScanFeatures
+from app.utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, next_cursor
 from app.config import settings
 
 router = APIRouter()
@@ -35,64 +43,79 @@ async def create_assessment(
     Process a new assessment and return results.
     """
     try:
-        supabase = get_supabase_client()
-        
-        # Create scan record
-        scan_data = {
-            "user_id": str(user_id),
-            "scan_type": request.scan_type.value,
-            "person_name": request.person_name,
-            "interaction_type": request.interaction_type,
-            "answers": [answer.dict() for answer in request.answers],
-            "reflection_notes": request.reflection_notes,
-            "status": "completed",
-            "categories_completed": list(set([a.category for a in request.answers]))
-        }
-        
-        result = supabase.table("scans").insert(scan_data).execute()
-        if not result.data:
-            raise HTTPException(status_code=500, detail="Failed to create scan")
-        
-        scan = Scan.from_dict(result.data[0])
-        
-        # Load user blueprint
-        blueprint_result = supabase.table("blueprints").select("*").eq(
-            "user_id", str(user_id)
-        ).eq("is_active", True).limit(1).execute()
-        
-        if not blueprint_result.data:
+        repos = get_repositories()
+        
+        # Load user profile and active blueprint (cached; one query on a miss)
+        user_profile, blueprint = await get_profile_cache().load(repos, user_id)
+        if not user_profile:
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        if not blueprint:
             raise HTTPException(
                 status_code=400,
                 detail="No active blueprint found. Please complete self-assessment first."
             )
         
-        from app.models.db_models import Blueprint, User, ScanResult
-        blueprint = Blueprint.from_dict(blueprint_result.data[0])
-        
-        # Load user profile
-        user_result = supabase.table("users").select("*").eq("id", str(user_id)).execute()
-        if not user_result.data:
-            raise HTTPException(status_code=404, detail="User not found")
-        
-        user_profile = User.from_dict(user_result.data[0])
+        from app.models.db_models import ScanResult
+        
+        # Group the answers once; reused for the scan record and both engines
+        answers = [answer.dict() for answer in request.answers]
+        features = ScanFeatures(answers)
+        
+        # Build the scan in memory; nothing is written until scoring succeeds
+        scan = Scan(
+            id=uuid4(),
+            user_id=user_id,
+            scan_type=request.scan_type.value,
+            person_name=request.person_name,
+            interaction_type=request.interaction_type,
+            answers=answers,
+            reflection_notes=request.reflection_notes,
+            categories_completed=features.categories,
+            status="completed",
+            dual_scan_session_id=request.dual_scan_session_id,
+            dual_scan_role=request.dual_scan_role,
+            partner_scan_id=request.partner_scan_id
+        )
         
         # Process with AI engine
         scoring_engine = ScoringEngine(ai_version=settings.AI_VERSION)
-        scan_result = scoring_engine.process_scan(scan, blueprint, user_profile)
+        scan_result = scoring_engine.process_scan(scan, blueprint, user_profile, features)
         
-        # Detect red flags
-        flag_engine = RedFlagEngine()
-        red_flags = flag_engine.detect_all(scan, blueprint, user_profile)
+        # Detect red flags (cached rules; never waits on a rule refresh)
+        flag_engine = RedFlagEngine(rules=get_red_flag_rule_store().snapshot())
+        red_flags = flag_engine.detect_all(scan, blueprint, user_profile, features)
         scan_result.red_flags = red_flags
+        scan_result.inconsistencies = flag_engine.detect_inconsistencies(scan, features)
         
-        # Save result to database
-        result_data = scan_result.to_dict()
-        result_insert = supabase.table("scan_results").insert(result_data).execute()
+        # Save scan and result together in one transaction
+        scan_row, result_row = await repos.scans.create_with_result(
+            scan.to_dict(), scan_result.to_dict()
+        )
         
-        if not result_insert.data:
+        if not scan_row or not result_row:
             raise HTTPException(status_code=500, detail="Failed to save scan result")
         
-        saved_result = ScanResult.from_dict(result_insert.data[0])
+        saved_result = ScanResult.from_dict(result_row)
+        
+        # Partners polling the session are served from the cache until now
+        if scan.dual_scan_session_id:
+            get_dual_scan_session_service().invalidate(scan.dual_scan_session_id)
+        
+        # Mirror flags into red_flags rows for indexed safety queries; the
+        # scan result above already holds them, so a failure here is not fatal
+        try:
+            await repos.red_flags.save(
+                build_red_flag_rows(red_flags, scan.id, user_id, saved_result.id)
+            )
+        except Exception as e:
+            logger.error(f"Error saving red flags for scan {scan.id}: {e}")
+        
+        # Fold into pattern_knowledge_base statistics (buffered)
+        try:
+            get_pattern_aggregator().observe(saved_result)
+        except Exception as e:
+            logger.error(f"Error aggregating patterns for scan {scan.id}: {e}")
         
         # Convert to response model
         return ScanResultResponse(
@@ -120,13 +143,12 @@ async def create_assessment(
 async def get_assessment(scan_id: UUID):
     """Get assessment by ID."""
     try:
-        supabase = get_supabase_client()
-        result = supabase.table("scans").select("*").eq("id", str(scan_id)).execute()
+        scan_row = await get_repositories().scans.get(scan_id)
         
-        if not result.data:
+        if not scan_row:
             raise HTTPException(status_code=404, detail="Scan not found")
         
-        scan = Scan.from_dict(result.data[0])
+        scan = Scan.from_dict(scan_row)
         return ScanResponse(
             id=scan.id,
             user_id=scan.user_id,
@@ -146,31 +168,50 @@ async def get_assessment(scan_id: UUID):
 
 @router.get("/", response_model=List[ScanResponse])
 async def list_assessments(
+    response: Response,
     user_id: UUID = Depends(get_user_id_from_auth),
     limit: int = 20,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    include_answers: bool = True
 ):
-    """List user's assessments."""
+    """
+    List user's assessments, newest first.
+    
+    The cursor for the next page is returned in the X-Next-Cursor header;
+    pass it back as `cursor` (`offset` is kept for older clients).
+    `include_answers=false` leaves the answers out of list views.
+    """
     try:
-        supabase = get_supabase_client()
-        result = supabase.table("scans").select("*").eq(
-            "user_id", str(user_id)
-        ).order("created_at", desc=True).limit(limit).offset(offset).execute()
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        scans = [Scan.from_dict(data) for data in result.data]
+        rows = await get_repositories().scans.list_for_user(
+            user_id, limit, after=after, offset=offset, include_answers=include_answers
+        )
+        
+        page_cursor = next_cursor(rows, limit)
+        if page_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = page_cursor
+        
+        now = datetime.now()
         return [
             ScanResponse(
-                id=scan.id,
-                user_id=scan.user_id,
-                scan_type=scan.scan_type,
-                person_name=scan.person_name,
-                status=scan.status,
-                answers=scan.answers,
-                created_at=scan.created_at or datetime.now(),
-                updated_at=scan.updated_at or datetime.now()
+                id=data["id"],
+                user_id=data["user_id"],
+                scan_type=data["scan_type"],
+                person_name=data.get("person_name"),
+                status=data.get("status", "in_progress"),
+                answers=data.get("answers", []) if include_answers else None,
+                created_at=data.get("created_at") or now,
+                updated_at=data.get("updated_at") or now
             )
-            for scan in scans
+            for data in rows
         ]
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error listing assessments: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -7,7 +7,7 @@ import secrets
 from datetime import datetime, timedelta
 from typing import Optional
 
-from app.database import get_supabase_client
+from app.repositories import get_repositories
 from app.config import settings
 
 router = APIRouter()
@@ -56,11 +56,11 @@ async def sign_up(request: SignUpRequest):
     No email verification required - users can start using immediately.
     """
     try:
-        supabase = get_supabase_client()
+        repos = get_repositories()
         
         # Check if user already exists
-        existing = supabase.table("users").select("id").eq("email", request.email).execute()
-        if existing.data:
+        existing = await repos.users.get_by_email(request.email)
+        if existing:
             raise HTTPException(status_code=400, detail="Email already registered")
         
         # Hash password
@@ -83,13 +83,11 @@ async def sign_up(request: SignUpRequest):
             "subscription_tier": "free"
         }
         
-        result = supabase.table("users").insert(user_data).execute()
+        user = await repos.users.create(user_data)
         
-        if not result.data:
+        if not user:
             raise HTTPException(status_code=500, detail="Failed to create user")
         
-        user = result.data[0]
-        
         # Return user data
         user_response = UserResponse(
             id=str(user["id"]),
@@ -120,16 +118,12 @@ async def sign_in(request: SignInRequest):
     Returns user data if credentials are valid.
     """
     try:
-        supabase = get_supabase_client()
-        
         # Find user by email
-        result = supabase.table("users").select("*").eq("email", request.email).execute()
+        user = await get_repositories().users.get_by_email(request.email)
         
-        if not result.data:
+        if not user:
             raise HTTPException(status_code=401, detail="Invalid email or password")
         
-        user = result.data[0]
-        
         # Verify password
         password_hash = hash_password(request.password)
         if user.get("password_hash") != password_hash:
@@ -168,14 +162,10 @@ async def sign_in(request: SignInRequest):
 async def get_user(user_id: UUID):
     """Get user profile by ID."""
     try:
-        supabase = get_supabase_client()
+        user = await get_repositories().users.get(user_id)
         
-        result = supabase.table("users").select("*").eq("id", str(user_id)).execute()
-        
-        if not result.data:
+        if not user:
             raise HTTPException(status_code=404, detail="User not found")
-        
-        user = result.data[0]
         profile = user.get("profile", {})
         
         return UserResponse(
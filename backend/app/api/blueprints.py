@@ -4,7 +4,7 @@ from typing import List
 from datetime import datetime
 import logging
 
-from app.database import get_supabase_client
+from app.repositories import get_repositories
 from app.models.pydantic_models import (
     CreateBlueprintRequest,
     UpdateBlueprintRequest,
@@ -12,6 +12,7 @@ from app.models.pydantic_models import (
 )
 from app.models.db_models import Blueprint
 from app.services.scoring_engine import ScoringEngine
+from app.services.profile_cache import get_profile_cache
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -29,8 +30,6 @@ async def create_blueprint(
 ):
     """Create a new blueprint (self-assessment)."""
     try:
-        supabase = get_supabase_client()
-        
         # Calculate profile summary
         profile_summary = _calculate_profile_summary(request.answers)
         
@@ -47,12 +46,14 @@ async def create_blueprint(
             "version": 1
         }
         
-        result = supabase.table("blueprints").insert(blueprint_data).execute()
+        row = await get_repositories().blueprints.create(blueprint_data)
         
-        if not result.data:
+        if not row:
             raise HTTPException(status_code=500, detail="Failed to create blueprint")
         
-        blueprint = Blueprint.from_dict(result.data[0])
+        await get_profile_cache().invalidate(user_id)
+        
+        blueprint = Blueprint.from_dict(row)
         
         return BlueprintResponse(
             id=blueprint.id,
@@ -77,15 +78,12 @@ async def get_blueprint(
 ):
     """Get user's active blueprint."""
     try:
-        supabase = get_supabase_client()
-        result = supabase.table("blueprints").select("*").eq(
-            "user_id", str(user_id)
-        ).eq("is_active", True).limit(1).execute()
+        row = await get_repositories().blueprints.get_active(user_id)
         
-        if not result.data:
+        if not row:
             raise HTTPException(status_code=404, detail="No active blueprint found")
         
-        blueprint = Blueprint.from_dict(result.data[0])
+        blueprint = Blueprint.from_dict(row)
         
         return BlueprintResponse(
             id=blueprint.id,
@@ -111,14 +109,12 @@ async def update_blueprint(
 ):
     """Update an existing blueprint."""
     try:
-        supabase = get_supabase_client()
+        repos = get_repositories()
         
         # Verify ownership
-        existing = supabase.table("blueprints").select("*").eq(
-            "id", str(blueprint_id)
-        ).eq("user_id", str(user_id)).execute()
+        existing = await repos.blueprints.get_owned(blueprint_id, user_id)
         
-        if not existing.data:
+        if not existing:
             raise HTTPException(status_code=404, detail="Blueprint not found")
         
         # Calculate updated profile summary
@@ -128,18 +124,17 @@ async def update_blueprint(
         update_data = {
             "answers": [answer.dict() for answer in request.answers],
             "profile_summary": profile_summary,
-            "completion_percentage": completion_percentage,
-            "updated_at": datetime.now().isoformat()
+            "completion_percentage": completion_percentage
         }
         
-        result = supabase.table("blueprints").update(update_data).eq(
-            "id", str(blueprint_id)
-        ).execute()
+        row = await repos.blueprints.update(blueprint_id, update_data)
         
-        if not result.data:
+        if not row:
             raise HTTPException(status_code=500, detail="Failed to update blueprint")
         
-        blueprint = Blueprint.from_dict(result.data[0])
+        await get_profile_cache().invalidate(user_id)
+        
+        blueprint = Blueprint.from_dict(row)
         
         return BlueprintResponse(
             id=blueprint.id,
@@ -7,8 +7,9 @@ from uuid import UUID
 import logging
 
 from app.models.pydantic_models import CoachRequest, CoachResponse
-from app.services.amora_enhanced_service import AmoraEnhancedService
-from app.database import get_supabase_client
+from app.services.amora_enhanced_service import get_amora_service
+from app.services.subscription_cache import get_subscription_cache
+from app.utils.concurrency import ExecutorSaturatedError, get_coach_executor
 
 router = APIRouter(prefix="/coach", tags=["coach"])
 logger = logging.getLogger(__name__)
@@ -22,21 +23,21 @@ async def get_user_id_from_auth() -> UUID:
 
 
 async def check_subscription_status(user_id: UUID) -> bool:
-    """Check if user has paid subscription."""
-    try:
-        supabase = get_supabase_client()
-        response = supabase.table("users") \
-            .select("subscription_status") \
-            .eq("id", str(user_id)) \
-            .single() \
-            .execute()
-        
-        if response.data:
-            return response.data.get("subscription_status") == "premium"
-        return False
-    except Exception as e:
-        logger.error(f"Error checking subscription: {e}")
-        return False
+    """Check if user has paid subscription (cached per user)."""
+    return await get_subscription_cache().is_premium(user_id)
+
+
+def _generate_response(
+    request: CoachRequest,
+    user_id: UUID,
+    is_paid_user: bool
+) -> CoachResponse:
+    """Blocking coach pipeline: embedding, detection, template lookup."""
+    # Shared service keeps conversation memory across requests
+    service = get_amora_service()
+    
+    # Get response with all enhancements
+    return service.get_response(request, user_id, is_paid_user)
 
 
 @router.post("/", response_model=CoachResponse)
@@ -61,16 +62,22 @@ async def get_coach_response(
         # Check subscription status
         is_paid_user = await check_subscription_status(user_id)
         
-        # Initialize enhanced service
-        service = AmoraEnhancedService()
-        
-        # Get response with all enhancements
-        response = service.get_response(request, user_id, is_paid_user)
+        # Run the CPU-bound pipeline off the event loop
+        response = await get_coach_executor().run(
+            _generate_response, request, user_id, is_paid_user
+        )
         
         logger.info(f"Amora Enhanced response: {response.message[:100]}...")
         
         return response
         
+    except ExecutorSaturatedError:
+        logger.warning("Coach executor saturated, rejecting request")
+        raise HTTPException(
+            status_code=503,
+            detail="Amora is busy right now. Please try again in a moment.",
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         logger.error(f"Error in coach endpoint: {e}", exc_info=True)
         
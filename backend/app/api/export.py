@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from uuid import UUID
+import logging
+
+from app.repositories import get_repositories
+from app.services.export import gzip_stream, iter_user_export
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def get_user_id_from_auth() -> UUID:
+    """Placeholder for authentication."""
+    return UUID("00000000-0000-0000-0000-000000000001")
+
+
+@router.get("/")
+async def export_history(
+    user_id: UUID = Depends(get_user_id_from_auth),
+    gzip: bool = False
+):
+    """
+    Stream the user's blueprints, scans and scan results as NDJSON.
+    
+    Pass `gzip=true` for a gzip-compressed download.
+    """
+    stream = iter_user_export(get_repositories(), user_id)
+    filename = "matchiq-export.ndjson"
+    media_type = "application/x-ndjson"
+    if gzip:
+        stream = gzip_stream(stream)
+        filename += ".gz"
+        media_type = "application/gzip"
+    
+    return StreamingResponse(
+        stream,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
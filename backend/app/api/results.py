@@ -1,51 +1,74 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
 from uuid import UUID
-from typing import List
+from typing import Any, Dict, List, Optional
+from datetime import datetime
 import logging
 
-from app.database import get_supabase_client
-from app.models.pydantic_models import ScanResultResponse
-from app.models.db_models import ScanResult
+from app.repositories import get_repositories
+from app.models.pydantic_models import ScanResultResponse, DualScanSessionResponse
+from app.services.dual_scan_session import get_dual_scan_session_service
+from app.utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, next_cursor
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+def to_scan_result_response(data: Dict[str, Any]) -> ScanResultResponse:
+    """Validate a scan_results row into its response model in one pass."""
+    return ScanResultResponse.model_validate({
+        "id": data["id"],
+        "scan_id": data["scan_id"],
+        "overall_score": data["overall_score"],
+        "category": data["category"],
+        "category_scores": data.get("category_scores") or {},
+        "ai_analysis": data.get("ai_analysis") or {},
+        "red_flags": data.get("red_flags") or [],
+        "inconsistencies": data.get("inconsistencies") or [],
+        "profile_mismatches": data.get("profile_mismatches") or [],
+        "created_at": data.get("created_at") or datetime.now(),
+        "ai_version": data.get("ai_version") or "1.0.0",
+    })
+
+
 def get_user_id_from_auth() -> UUID:
     """Placeholder for authentication."""
     return UUID("00000000-0000-0000-0000-000000000001")
 
 
+@router.get("/dual/{session_id}", response_model=DualScanSessionResponse)
+async def get_dual_scan_session(session_id: UUID):
+    """Get both participants of a dual scan session and, once complete, their mutual alignment."""
+    try:
+        session = await get_dual_scan_session_service().get_session(session_id)
+        
+        if session is None:
+            raise HTTPException(status_code=404, detail="Dual scan session not found")
+        
+        return DualScanSessionResponse(
+            session_id=session["session_id"],
+            status=session["status"],
+            participants=session["participants"],
+            alignment=session.get("alignment")
+        )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting dual scan session: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{scan_id}", response_model=ScanResultResponse)
 async def get_scan_result(scan_id: UUID):
     """Get scan result by scan ID."""
     try:
-        supabase = get_supabase_client()
-        result = supabase.table("scan_results").select("*").eq(
-            "scan_id", str(scan_id)
-        ).limit(1).execute()
+        row = await get_repositories().scan_results.get_by_scan(scan_id)
         
-        if not result.data:
+        if not row:
             raise HTTPException(status_code=404, detail="Scan result not found")
         
-        scan_result = ScanResult.from_dict(result.data[0])
-        
-        from app.models.pydantic_models import RedFlagResponse, AIAnalysisResponse
-        from datetime import datetime
-        
-        return ScanResultResponse(
-            id=scan_result.id,
-            scan_id=scan_result.scan_id,
-            overall_score=scan_result.overall_score,
-            category=scan_result.category,
-            category_scores=scan_result.category_scores,
-            ai_analysis=AIAnalysisResponse(**scan_result.ai_analysis),
-            red_flags=[RedFlagResponse(**flag) for flag in scan_result.red_flags],
-            inconsistencies=scan_result.inconsistencies,
-            profile_mismatches=scan_result.profile_mismatches,
-            created_at=scan_result.created_at or datetime.now(),
-            ai_version=scan_result.ai_version
-        )
+        return to_scan_result_response(row)
     except HTTPException:
         raise
     except Exception as e:
@@ -55,49 +78,35 @@ async def get_scan_result(scan_id: UUID):
 
 @router.get("/", response_model=List[ScanResultResponse])
 async def list_scan_results(
+    response: Response,
     user_id: UUID = Depends(get_user_id_from_auth),
     limit: int = 20,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None
 ):
-    """List user's scan results."""
+    """
+    List user's scan results, newest first.
+    
+    The cursor for the next page is returned in the X-Next-Cursor header;
+    pass it back as `cursor` (`offset` is kept for older clients).
+    """
     try:
-        supabase = get_supabase_client()
-        
-        # Get user's scans first
-        scans_result = supabase.table("scans").select("id").eq(
-            "user_id", str(user_id)
-        ).execute()
-        
-        scan_ids = [s["id"] for s in scans_result.data]
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        if not scan_ids:
-            return []
-        
-        # Get results for those scans
-        result = supabase.table("scan_results").select("*").in_(
-            "scan_id", scan_ids
-        ).order("created_at", desc=True).limit(limit).offset(offset).execute()
+        rows = await get_repositories().scan_results.list_for_user(
+            user_id, limit, after=after, offset=offset
+        )
         
-        from app.models.pydantic_models import RedFlagResponse, AIAnalysisResponse
-        from datetime import datetime
+        page_cursor = next_cursor(rows, limit)
+        if page_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = page_cursor
         
-        return [
-            ScanResultResponse(
-                id=ScanResult.from_dict(data).id,
-                scan_id=ScanResult.from_dict(data).scan_id,
-                overall_score=ScanResult.from_dict(data).overall_score,
-                category=ScanResult.from_dict(data).category,
-                category_scores=ScanResult.from_dict(data).category_scores,
-                ai_analysis=AIAnalysisResponse(**ScanResult.from_dict(data).ai_analysis),
-                red_flags=[RedFlagResponse(**flag) for flag in ScanResult.from_dict(data).red_flags],
-                inconsistencies=ScanResult.from_dict(data).inconsistencies,
-                profile_mismatches=ScanResult.from_dict(data).profile_mismatches,
-                created_at=ScanResult.from_dict(data).created_at or datetime.now(),
-                ai_version=ScanResult.from_dict(data).ai_version
-            )
-            for data in result.data
-        ]
+        return [to_scan_result_response(data) for data in rows]
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error listing scan results: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-
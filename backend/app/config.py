@@ -10,8 +10,18 @@ class Settings(BaseSettings):
     ENVIRONMENT: str = "production"
     DEBUG: bool = False
     
+    # Server workers for gunicorn.conf.py (0: one per CPU)
+    WEB_CONCURRENCY: int = 0
+    
     # Database
     DATABASE_URL: str = "postgresql://localhost:5432/matchiq"
+    # Repository backend: "rest" (Supabase PostgREST) or "postgres" (asyncpg pool on DATABASE_URL)
+    DATABASE_BACKEND: str = "rest"
+    DATABASE_POOL_MIN_SIZE: int = 1
+    DATABASE_POOL_MAX_SIZE: int = 10
+    # Prepared statements per connection; use 0 behind a transaction-mode pooler (pgbouncer)
+    DATABASE_STATEMENT_CACHE_SIZE: int = 100
+    DATABASE_COMMAND_TIMEOUT_SECONDS: float = 30.0
     
     # Supabase
     SUPABASE_PROJECT_ID: str
@@ -48,6 +58,61 @@ class Settings(BaseSettings):
     MAX_TOKENS_PER_RESPONSE: int = 150
     CACHE_TTL_SECONDS: int = 604800  # 7 days
     
+    # Amora template index
+    TEMPLATE_INDEX_REFRESH_SECONDS: int = 300
+    
+    # Red flag rules (reloaded from the active ai_logic_versions row)
+    RED_FLAG_RULES_REFRESH_SECONDS: int = 60
+    
+    # Pattern knowledge base aggregation (buffered, flushed in batches)
+    PATTERN_AGGREGATOR_MAX_PENDING: int = 500
+    PATTERN_AGGREGATOR_FLUSH_SECONDS: int = 30
+    
+    # Dual scan sessions (a worker drops a session when it saves one of its
+    # scans; the TTL bounds how long other workers and rescore runs take to
+    # show up; alignments are keyed by the scored result fields, so they can
+    # be kept much longer)
+    DUAL_SCAN_CACHE_MAX_ENTRIES: int = 5000
+    DUAL_SCAN_SESSION_TTL_SECONDS: int = 30
+    DUAL_SCAN_ALIGNMENT_TTL_SECONDS: int = 3600
+    
+    # User profile / active blueprint cache ("memory" or "redis"; redis uses REDIS_URL).
+    # "memory" is per worker: a blueprint change clears only the worker that
+    # handled it, and other workers can serve the old entry for up to
+    # PROFILE_CACHE_MEMORY_TTL_SECONDS. Use "redis" when running several workers
+    PROFILE_CACHE_BACKEND: str = "memory"
+    PROFILE_CACHE_MAX_ENTRIES: int = 10000
+    PROFILE_CACHE_TTL_SECONDS: int = 300
+    PROFILE_CACHE_MEMORY_TTL_SECONDS: int = 30
+    
+    # Coach subscription checks (non-premium / failed lookups use the negative TTL)
+    SUBSCRIPTION_CACHE_MAX_ENTRIES: int = 50000
+    SUBSCRIPTION_CACHE_TTL_SECONDS: int = 300
+    SUBSCRIPTION_CACHE_NEGATIVE_TTL_SECONDS: int = 60
+    
+    # History export (rows per keyset page; one page is held in memory)
+    EXPORT_PAGE_SIZE: int = 500
+    
+    # Embedding micro-batching
+    EMBEDDING_BATCH_MAX_SIZE: int = 32
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 5.0
+    
+    # Embedding cache (set EMBEDDING_CACHE_PATH to persist across restarts)
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 20000
+    EMBEDDING_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    EMBEDDING_CACHE_TTL_SECONDS: int = 86400
+    EMBEDDING_CACHE_PATH: str = ""
+    EMBEDDING_CACHE_DISK_CAPACITY: int = 50000
+    
+    # Coach inference executor
+    COACH_EXECUTOR_MAX_WORKERS: int = 4
+    COACH_EXECUTOR_QUEUE_DEPTH: int = 32
+    
+    # Conversation session store ("memory" or "redis"; redis uses REDIS_URL)
+    SESSION_STORE_BACKEND: str = "memory"
+    SESSION_STORE_MAX_SESSIONS: int = 50000
+    
     def get_cors_origins(self) -> List[str]:
         """Parse CORS origins from comma-separated string."""
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
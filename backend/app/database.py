@@ -1,4 +1,5 @@
 from supabase import create_client, Client
+from postgrest import AsyncPostgrestClient
 from app.config import settings
 from typing import Optional
 import logging
@@ -8,6 +9,9 @@ logger = logging.getLogger(__name__)
 # Global Supabase client
 _supabase_client: Optional[Client] = None
 
+# Global async PostgREST client for use from async routes
+_async_rest_client: Optional[AsyncPostgrestClient] = None
+
 
 def get_supabase_client() -> Client:
     """Get or create Supabase client instance."""
@@ -27,6 +31,48 @@ def get_supabase_client() -> Client:
     return _supabase_client
 
 
+def get_async_rest_client() -> AsyncPostgrestClient:
+    """
+    Get or create a non-blocking PostgREST client for the Supabase project.
+    Use this from async routes instead of get_supabase_client, whose
+    requests block the event loop.
+    """
+    global _async_rest_client
+    
+    if _async_rest_client is None:
+        _async_rest_client = AsyncPostgrestClient(
+            f"{settings.SUPABASE_URL}/rest/v1",
+            headers={
+                "apikey": settings.SUPABASE_ANON_KEY,
+                "Authorization": f"Bearer {settings.SUPABASE_ANON_KEY}",
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+            }
+        )
+    
+    return _async_rest_client
+
+
+async def close_async_rest_client():
+    """Close the async PostgREST client's connection pool."""
+    global _async_rest_client
+    
+    if _async_rest_client is not None:
+        await _async_rest_client.aclose()
+        _async_rest_client = None
+
+
+def reset_clients():
+    """
+    Forget clients inherited from a parent process (e.g. a preloading server
+    master) without closing them; their connections belong to the parent.
+    """
+    global _supabase_client, _async_rest_client
+    
+    _supabase_client = None
+    _async_rest_client = None
+
+
 def get_supabase_admin_client() -> Client:
     """Get Supabase client with service role key for admin operations."""
     if not settings.SUPABASE_SERVICE_ROLE_KEY:
@@ -1,12 +1,21 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from contextlib import asynccontextmanager
 import uvicorn
 import logging
 
 from app.config import settings
-from app.database import init_db
-from app.api import auth, assessments, blueprints, results, coach, coach_enhanced
+from app.database import init_db, get_async_rest_client, close_async_rest_client
+from app.repositories import close_repositories
+from app.utils.concurrency import shutdown_executors
+from app.services.pattern_aggregator import flush_pattern_aggregator
+from app.services.red_flag_rules import get_red_flag_rule_store
+from app.services.profile_cache import close_profile_cache, get_profile_cache
+from app.services.subscription_cache import get_subscription_cache
+from app.services.dual_scan_session import get_dual_scan_session_service
+from app.services.session_store import get_session_store
+from app.api import auth, assessments, blueprints, results, export, coach, coach_enhanced
 from app.models.pydantic_models import HealthResponse
 
 # Configure logging
@@ -25,16 +34,24 @@ async def lifespan(app: FastAPI):
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"AI Version: {settings.AI_VERSION}")
     
-    db_status = init_db()
+    db_status = await run_in_threadpool(init_db)
     if db_status:
         logger.info("Database connection successful")
     else:
         logger.warning("Database connection check failed - tables may not exist yet")
     
+    # Load the red flag rules before the first request (no-op if preloaded)
+    await run_in_threadpool(get_red_flag_rule_store().ensure_fresh)
+    
     yield
     
     # Shutdown
     logger.info("Shutting down MyMatchIQ Backend...")
+    await flush_pattern_aggregator()
+    shutdown_executors()
+    await close_repositories()
+    await close_profile_cache()
+    await close_async_rest_client()
 
 
 app = FastAPI(
@@ -63,6 +80,7 @@ app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(assessments.router, prefix="/api/v1/assessments", tags=["assessments"])
 app.include_router(blueprints.router, prefix="/api/v1/blueprints", tags=["blueprints"])
 app.include_router(results.router, prefix="/api/v1/results", tags=["results"])
+app.include_router(export.router, prefix="/api/v1/export", tags=["export"])
 
 # Use Enhanced Amora (V1 Complete - semantic, emotionally intelligent)
 # Comment out old coach router, use coach_enhanced
@@ -74,10 +92,9 @@ app.include_router(coach_enhanced.router, prefix="/api/v1", tags=["coach-enhance
 async def health_check():
     """Health check endpoint."""
     try:
-        from app.database import get_supabase_client
-        supabase = get_supabase_client()
-        # Try a simple query
-        supabase.table("users").select("id").limit(1).execute()
+        client = get_async_rest_client()
+        # Try a simple query without blocking the event loop
+        await client.table("users").select("id").limit(1).execute()
         db_status = "connected"
     except Exception as e:
         logger.warning(f"Database health check failed: {e}")
@@ -90,6 +107,20 @@ async def health_check():
     )
 
 
+@app.get("/health/caches")
+async def cache_health():
+    """Hit/miss counters of the in-process caches."""
+    caches = [
+        get_profile_cache().stats(),
+        get_subscription_cache().stats(),
+        *get_dual_scan_session_service().stats(),
+    ]
+    session_store = get_session_store()
+    if hasattr(session_store, "stats"):
+        caches.append(session_store.stats())
+    return {"caches": caches}
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
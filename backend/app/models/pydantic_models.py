@@ -63,6 +63,9 @@ class CreateScanRequest(BaseModel):
     interaction_type: Optional[str] = None
     answers: List[ScanAnswerInput] = []
     reflection_notes: Optional[Dict[str, Any]] = None
+    dual_scan_session_id: Optional[UUID] = None
+    dual_scan_role: Optional[str] = None
+    partner_scan_id: Optional[UUID] = None
 
 
 class CreateBlueprintRequest(BaseModel):
@@ -122,6 +125,27 @@ class ScanResultResponse(BaseModel):
     ai_version: str
 
 
+class DualScanParticipantResponse(BaseModel):
+    scan_id: UUID
+    role: Optional[str]
+    completed: bool
+
+
+class MutualAlignmentResponse(BaseModel):
+    mutual_score: int
+    category_alignment: Dict[str, float]
+    mutual_deal_breakers: List[Dict[str, Any]]
+    complementary_areas: List[str]
+    individual_scores: Dict[str, int]
+
+
+class DualScanSessionResponse(BaseModel):
+    session_id: UUID
+    status: str
+    participants: List[DualScanParticipantResponse]
+    alignment: Optional[MutualAlignmentResponse] = None
+
+
 class BlueprintResponse(BaseModel):
     id: UUID
     user_id: UUID
@@ -138,7 +162,7 @@ class ScanResponse(BaseModel):
     scan_type: str
     person_name: Optional[str]
     status: str
-    answers: List[Dict[str, Any]]
+    answers: Optional[List[Dict[str, Any]]] = None
     created_at: datetime
     updated_at: datetime
 
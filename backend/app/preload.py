@@ -0,0 +1,44 @@
+"""
+Preload - Warm read-only state in the server master before workers fork.
+
+Workers forked afterwards share these pages copy-on-write, so the
+embedding model, template index and compiled red flag rules are held
+once per machine instead of once per worker. Nothing that owns threads,
+sockets or an event loop is created here; see gunicorn.conf.py.
+"""
+import gc
+import logging
+
+from app.database import reset_clients
+from app.services.embedding_service import get_embedding_model
+from app.services.red_flag_rules import get_red_flag_rule_store
+from app.services.template_index import get_template_index
+
+logger = logging.getLogger(__name__)
+
+
+def preload():
+    """Load shared read-only state; call once in the master process."""
+    try:
+        get_embedding_model()
+    except Exception as e:
+        # Workers load it lazily on first use instead
+        logger.error(f"Error preloading embedding model: {e}")
+
+    # Both keep serving their previous (here: empty/default) state on errors
+    get_template_index().ensure_fresh(force=True)
+    get_red_flag_rule_store().ensure_fresh(force=True)
+
+    # The loads above used the master's HTTP client; workers open their own
+    reset_clients()
+
+    # Move everything loaded so far out of the collector's reach, so cyclic
+    # GC in the workers does not write to (and un-share) these pages
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Preloaded shared state ({gc.get_freeze_count()} objects frozen)")
+
+
+def reset_after_fork():
+    """Drop per-process state inherited from the master; call in each worker."""
+    reset_clients()
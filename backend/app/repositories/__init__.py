@@ -0,0 +1,80 @@
+"""
+Repositories - Async data access for the API routers.
+
+Routers use these interfaces instead of a database client, so no request
+blocks the event loop on I/O. Rows are plain dicts shaped like PostgREST
+responses, so the db_models `from_dict` helpers work for every backend.
+Backends (DATABASE_BACKEND):
+    rest      Supabase PostgREST over the shared async HTTP client (default)
+    postgres  asyncpg pool against DATABASE_URL
+
+The template index and the red flag rule store stay on the sync REST
+client: they are loaded in the gunicorn master before workers fork
+(app.preload), refreshed on background threads and read from the coach's
+executor threads, none of which can use the loop-bound clients here.
+"""
+from typing import Optional
+import logging
+
+from app.config import settings
+from app.repositories.base import (
+    BlueprintRepository,
+    PatternStatsRepository,
+    RedFlagRepository,
+    Repositories,
+    Row,
+    ScanRepository,
+    ScanResultRepository,
+    UserRepository,
+)
+
+logger = logging.getLogger(__name__)
+
+_repositories: Optional[Repositories] = None
+
+
+def get_repositories() -> Repositories:
+    """Get the configured process-wide repositories."""
+    global _repositories
+    if _repositories is None:
+        _repositories = _create_repositories()
+    return _repositories
+
+
+async def close_repositories():
+    """Close the backend's connections (called on shutdown)."""
+    global _repositories
+    if _repositories is not None:
+        await _repositories.close()
+        _repositories = None
+
+
+def _create_repositories() -> Repositories:
+    if settings.DATABASE_BACKEND == "postgres":
+        from app.repositories.postgres import PostgresPool, PostgresRepositories
+        logger.info("Using asyncpg repositories")
+        return PostgresRepositories(PostgresPool(
+            settings.DATABASE_URL,
+            min_size=settings.DATABASE_POOL_MIN_SIZE,
+            max_size=settings.DATABASE_POOL_MAX_SIZE,
+            statement_cache_size=settings.DATABASE_STATEMENT_CACHE_SIZE,
+            command_timeout=settings.DATABASE_COMMAND_TIMEOUT_SECONDS,
+        ))
+
+    from app.database import get_async_rest_client
+    from app.repositories.rest import RestRepositories
+    return RestRepositories(get_async_rest_client())
+
+
+__all__ = [
+    "BlueprintRepository",
+    "PatternStatsRepository",
+    "RedFlagRepository",
+    "Repositories",
+    "Row",
+    "ScanRepository",
+    "ScanResultRepository",
+    "UserRepository",
+    "close_repositories",
+    "get_repositories",
+]
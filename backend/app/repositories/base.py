@@ -0,0 +1,176 @@
+"""Repository interfaces shared by every backend."""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from app.utils.pagination import Cursor
+
+# A row shaped like a PostgREST response: ids and timestamps as strings,
+# JSON columns as Python objects
+Row = Dict[str, Any]
+
+SCAN_LIST_COLUMNS = ("id", "user_id", "scan_type", "person_name", "status", "created_at", "updated_at")
+
+DUAL_SESSION_COLUMNS = (
+    "id", "user_id", "scan_type", "status", "dual_scan_session_id", "dual_scan_role",
+    "partner_scan_id", "created_at",
+)
+
+# Everything ScanResultResponse needs (explanation_metadata is left out)
+RESULT_LIST_COLUMNS = (
+    "id", "scan_id", "overall_score", "category", "category_scores", "ai_analysis",
+    "red_flags", "inconsistencies", "profile_mismatches", "created_at", "ai_version",
+)
+
+
+class UserRepository:
+    async def get(self, user_id: UUID) -> Optional[Row]:
+        raise NotImplementedError
+
+    async def get_by_email(self, email: str) -> Optional[Row]:
+        raise NotImplementedError
+
+    async def create(self, data: Row) -> Optional[Row]:
+        raise NotImplementedError
+
+    async def get_with_active_blueprint(self, user_id: UUID) -> Tuple[Optional[Row], Optional[Row]]:
+        """(user, active blueprint) in one query; either may be None."""
+        raise NotImplementedError
+
+    async def list_by_ids(self, user_ids: Sequence[str]) -> List[Row]:
+        raise NotImplementedError
+
+    async def get_subscription_status(self, user_id: UUID) -> Optional[str]:
+        """The user's subscription_status; None for an unknown user."""
+        raise NotImplementedError
+
+
+class BlueprintRepository:
+    async def get_active(self, user_id: UUID) -> Optional[Row]:
+        raise NotImplementedError
+
+    async def get_owned(self, blueprint_id: UUID, user_id: UUID) -> Optional[Row]:
+        raise NotImplementedError
+
+    async def list_active_for_users(self, user_ids: Sequence[str]) -> List[Row]:
+        raise NotImplementedError
+
+    async def create(self, data: Row) -> Optional[Row]:
+        raise NotImplementedError
+
+    async def update(self, blueprint_id: UUID, values: Row) -> Optional[Row]:
+        """Update columns and stamp updated_at; returns the new row."""
+        raise NotImplementedError
+
+    async def export_page(self, user_id: UUID, limit: int, after: Optional[Cursor] = None) -> List[Row]:
+        """Every column of the user's rows, newest first by (created_at, id)."""
+        raise NotImplementedError
+
+
+class ScanRepository:
+    async def get(self, scan_id: UUID) -> Optional[Row]:
+        raise NotImplementedError
+
+    async def create(self, data: Row) -> Optional[Row]:
+        raise NotImplementedError
+
+    async def create_with_result(self, scan: Row, result: Row) -> Tuple[Row, Row]:
+        """Insert a scan and its scan result in one transaction; returns both rows."""
+        raise NotImplementedError
+
+    async def list_for_user(
+        self,
+        user_id: UUID,
+        limit: int,
+        after: Optional[Cursor] = None,
+        offset: int = 0,
+        include_answers: bool = True
+    ) -> List[Row]:
+        """Newest first, ordered by (created_at, id); `after` is a decoded cursor."""
+        raise NotImplementedError
+
+    async def list_dual_session(self, session_id: UUID) -> List[Row]:
+        """
+        DUAL_SESSION_COLUMNS of a dual scan session's scans, each with its
+        latest scan_results row under "result" (None until it is scored).
+        """
+        raise NotImplementedError
+
+    async def page_completed(self, after_id: Optional[str], limit: int) -> List[Row]:
+        """Completed scans in id order, starting after `after_id` (keyset on id)."""
+        raise NotImplementedError
+
+    async def export_page(self, user_id: UUID, limit: int, after: Optional[Cursor] = None) -> List[Row]:
+        """Every column of the user's rows, newest first by (created_at, id)."""
+        raise NotImplementedError
+
+
+class ScanResultRepository:
+    async def get_by_scan(self, scan_id: UUID) -> Optional[Row]:
+        raise NotImplementedError
+
+    async def create(self, data: Row) -> Optional[Row]:
+        raise NotImplementedError
+
+    async def upsert(self, rows: List[Row]):
+        """Insert rows, replacing any stored row with the same id."""
+        raise NotImplementedError
+
+    async def list_versions_for_scans(self, scan_ids: Sequence[str]) -> List[Row]:
+        """id, scan_id, ai_version and created_at of every result of these scans."""
+        raise NotImplementedError
+
+    async def list_for_user(
+        self,
+        user_id: UUID,
+        limit: int,
+        after: Optional[Cursor] = None,
+        offset: int = 0
+    ) -> List[Row]:
+        """RESULT_LIST_COLUMNS of the user's results, newest first by (created_at, id)."""
+        raise NotImplementedError
+
+    async def export_page(self, user_id: UUID, limit: int, after: Optional[Cursor] = None) -> List[Row]:
+        """Every column of the user's rows, newest first by (created_at, id)."""
+        raise NotImplementedError
+
+
+class RedFlagRepository:
+    async def save(self, rows: List[Row]):
+        """Insert rows, skipping (scan_id, pattern_hash) pairs already stored."""
+        raise NotImplementedError
+
+    async def prune(self, keep: Dict[str, List[str]]):
+        """
+        Delete flags of the scans in `keep` whose pattern_hash is not listed
+        for that scan. Acknowledged or resolved flags are never deleted.
+        """
+        raise NotImplementedError
+
+
+class PatternStatsRepository:
+    async def merge(self, batch: List[Row]):
+        """Merge PatternStats payloads into pattern_knowledge_base (merge_pattern_stats)."""
+        raise NotImplementedError
+
+
+class Repositories:
+    """The set of repositories one backend provides."""
+
+    def __init__(
+        self,
+        users: UserRepository,
+        blueprints: BlueprintRepository,
+        scans: ScanRepository,
+        scan_results: ScanResultRepository,
+        red_flags: RedFlagRepository,
+        pattern_stats: PatternStatsRepository
+    ):
+        self.users = users
+        self.blueprints = blueprints
+        self.scans = scans
+        self.scan_results = scan_results
+        self.red_flags = red_flags
+        self.pattern_stats = pattern_stats
+
+    async def close(self):
+        """Release backend resources (connection pools)."""
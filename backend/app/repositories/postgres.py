@@ -0,0 +1,389 @@
+"""
+Repositories over a pooled asyncpg connection to DATABASE_URL.
+
+Rows are returned in the same shape as the PostgREST backend (UUIDs and
+timestamps as strings). Writes take that same JSON shape and map it onto
+the table with jsonb_populate_record(set), as PostgREST does, so Postgres
+converts ISO timestamps, UUIDs and arrays and only the given columns are
+written (the rest keep their defaults).
+"""
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+from datetime import datetime
+import asyncio
+import json
+import logging
+
+from app.repositories.base import (
+    DUAL_SESSION_COLUMNS,
+    RESULT_LIST_COLUMNS,
+    SCAN_LIST_COLUMNS,
+    BlueprintRepository,
+    PatternStatsRepository,
+    RedFlagRepository,
+    Repositories,
+    Row,
+    ScanRepository,
+    ScanResultRepository,
+    UserRepository,
+)
+from app.utils.pagination import Cursor
+
+logger = logging.getLogger(__name__)
+
+
+def _ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _columns(names: Iterable[str], alias: Optional[str] = None) -> str:
+    prefix = f"{alias}." if alias else ""
+    return ", ".join(prefix + _ident(name) for name in names)
+
+
+def _value(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def record_to_row(record) -> Row:
+    """asyncpg Record -> PostgREST-shaped dict."""
+    return {key: _value(value) for key, value in record.items()}
+
+
+def _json(value: Any) -> str:
+    return json.dumps(value, default=str)
+
+
+def _by_keys(rows: List[Row]) -> Dict[tuple, List[Row]]:
+    """Rows grouped by their key sets, so columns a row leaves out keep their defaults."""
+    groups: Dict[tuple, List[Row]] = {}
+    for row in rows:
+        groups.setdefault(tuple(row), []).append(row)
+    return groups
+
+
+class PostgresPool:
+    """Lazily created asyncpg pool; created on first use inside the running loop."""
+
+    def __init__(
+        self,
+        dsn: str,
+        min_size: int,
+        max_size: int,
+        statement_cache_size: int,
+        command_timeout: Optional[float] = None
+    ):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.statement_cache_size = statement_cache_size
+        self.command_timeout = command_timeout
+        self._pool = None
+        self._lock = asyncio.Lock()
+
+    async def get(self):
+        if self._pool is None:
+            async with self._lock:
+                if self._pool is None:
+                    import asyncpg
+                    self._pool = await asyncpg.create_pool(
+                        self.dsn,
+                        min_size=self.min_size,
+                        max_size=self.max_size,
+                        statement_cache_size=self.statement_cache_size,
+                        command_timeout=self.command_timeout,
+                        init=self._init_connection,
+                    )
+                    logger.info(f"asyncpg pool ready ({self.min_size}-{self.max_size} connections)")
+        return self._pool
+
+    @staticmethod
+    async def _init_connection(connection):
+        # JSON columns in and out as Python objects
+        for type_name in ("json", "jsonb"):
+            await connection.set_type_codec(
+                type_name, encoder=_json, decoder=json.loads, schema="pg_catalog"
+            )
+
+    async def fetch(self, query: str, *args) -> List[Row]:
+        pool = await self.get()
+        return [record_to_row(record) for record in await pool.fetch(query, *args)]
+
+    async def fetchrow(self, query: str, *args) -> Optional[Row]:
+        pool = await self.get()
+        record = await pool.fetchrow(query, *args)
+        return None if record is None else record_to_row(record)
+
+    async def execute(self, query: str, *args) -> str:
+        pool = await self.get()
+        return await pool.execute(query, *args)
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+
+def _keyset(after: Optional[Cursor], first_param: int, alias: str = "") -> tuple:
+    """SQL condition and parameters for rows after a (created_at, id) cursor."""
+    if not after:
+        return "", []
+    prefix = f"{alias}." if alias else ""
+    value, row_id = after
+    return (
+        f" AND ({prefix}created_at, {prefix}id) < (${first_param}, ${first_param + 1})",
+        [datetime.fromisoformat(value), UUID(row_id)],
+    )
+
+
+class _PostgresRepository:
+    table = ""
+
+    def __init__(self, db: PostgresPool):
+        self.db = db
+
+    async def _get_by(self, column: str, value) -> Optional[Row]:
+        return await self.db.fetchrow(
+            f"SELECT * FROM {self.table} WHERE {_ident(column)} = $1 LIMIT 1", value
+        )
+
+    async def create(self, data: Row) -> Optional[Row]:
+        columns = _columns(data)
+        return await self.db.fetchrow(
+            f"INSERT INTO {self.table} ({columns}) "
+            f"SELECT {columns} FROM jsonb_populate_record(NULL::{self.table}, $1::jsonb) "
+            f"RETURNING *",
+            data
+        )
+
+    async def _owned_page(self, user_id: UUID, limit: int, after: Optional[Cursor]) -> List[Row]:
+        condition, params = _keyset(after, 2)
+        params = [str(user_id), *params, limit]
+        return await self.db.fetch(
+            f"SELECT * FROM {self.table} WHERE user_id = $1{condition} "
+            f"ORDER BY created_at DESC, id DESC LIMIT ${len(params)}",
+            *params
+        )
+
+
+class PostgresUserRepository(_PostgresRepository, UserRepository):
+    table = "users"
+
+    async def get(self, user_id: UUID) -> Optional[Row]:
+        return await self._get_by("id", str(user_id))
+
+    async def get_by_email(self, email: str) -> Optional[Row]:
+        return await self._get_by("email", email)
+
+    async def get_with_active_blueprint(self, user_id: UUID) -> Tuple[Optional[Row], Optional[Row]]:
+        user = await self.db.fetchrow(
+            "SELECT u.*, ("
+            "SELECT to_jsonb(b) FROM blueprints b WHERE b.user_id = u.id AND b.is_active LIMIT 1"
+            ") AS active_blueprint FROM users u WHERE u.id = $1",
+            str(user_id)
+        )
+        if user is None:
+            return None, None
+        return user, user.pop("active_blueprint")
+
+    async def list_by_ids(self, user_ids: Sequence[str]) -> List[Row]:
+        return await self.db.fetch("SELECT * FROM users WHERE id = ANY($1::uuid[])", list(user_ids))
+
+    async def get_subscription_status(self, user_id: UUID) -> Optional[str]:
+        row = await self.db.fetchrow("SELECT subscription_status FROM users WHERE id = $1", str(user_id))
+        return row["subscription_status"] if row else None
+
+
+class PostgresBlueprintRepository(_PostgresRepository, BlueprintRepository):
+    table = "blueprints"
+
+    async def get_active(self, user_id: UUID) -> Optional[Row]:
+        return await self.db.fetchrow(
+            "SELECT * FROM blueprints WHERE user_id = $1 AND is_active LIMIT 1", str(user_id)
+        )
+
+    async def get_owned(self, blueprint_id: UUID, user_id: UUID) -> Optional[Row]:
+        return await self.db.fetchrow(
+            "SELECT * FROM blueprints WHERE id = $1 AND user_id = $2", str(blueprint_id), str(user_id)
+        )
+
+    async def list_active_for_users(self, user_ids: Sequence[str]) -> List[Row]:
+        return await self.db.fetch(
+            "SELECT * FROM blueprints WHERE user_id = ANY($1::uuid[]) AND is_active", list(user_ids)
+        )
+
+    async def update(self, blueprint_id: UUID, values: Row) -> Optional[Row]:
+        assignments = ", ".join(f"{_ident(name)} = source.{_ident(name)}" for name in values)
+        return await self.db.fetchrow(
+            f"UPDATE blueprints SET {assignments}, updated_at = NOW() "
+            f"FROM jsonb_populate_record(NULL::blueprints, $1::jsonb) AS source "
+            f"WHERE blueprints.id = $2 RETURNING blueprints.*",
+            values, str(blueprint_id)
+        )
+
+    async def export_page(self, user_id: UUID, limit: int, after: Optional[Cursor] = None) -> List[Row]:
+        return await self._owned_page(user_id, limit, after)
+
+
+class PostgresScanRepository(_PostgresRepository, ScanRepository):
+    table = "scans"
+
+    async def get(self, scan_id: UUID) -> Optional[Row]:
+        return await self._get_by("id", str(scan_id))
+
+    async def create_with_result(self, scan: Row, result: Row) -> Tuple[Row, Row]:
+        # One statement, so one transaction: the result takes the new scan's id
+        scan_columns = _columns(scan)
+        result_names = [name for name in result if name != "scan_id"]
+        created = await self.db.fetchrow(
+            f"WITH new_scan AS ("
+            f"INSERT INTO scans ({scan_columns}) "
+            f"SELECT {scan_columns} FROM jsonb_populate_record(NULL::scans, $1::jsonb) RETURNING *"
+            f"), new_result AS ("
+            f"INSERT INTO scan_results (scan_id, {_columns(result_names)}) "
+            f"SELECT new_scan.id, {_columns(result_names, 'r')} "
+            f"FROM new_scan, jsonb_populate_record(NULL::scan_results, $2::jsonb) AS r RETURNING *"
+            f") SELECT to_jsonb(new_scan) AS scan, to_jsonb(new_result) AS result "
+            f"FROM new_scan, new_result",
+            scan, result
+        )
+        return created["scan"], created["result"]
+
+    async def list_for_user(
+        self,
+        user_id: UUID,
+        limit: int,
+        after: Optional[Cursor] = None,
+        offset: int = 0,
+        include_answers: bool = True
+    ) -> List[Row]:
+        columns = SCAN_LIST_COLUMNS + (("answers",) if include_answers else ())
+        condition, params = _keyset(after, 2)
+        params = [str(user_id), *params, limit, 0 if after else offset]
+        return await self.db.fetch(
+            f"SELECT {_columns(columns)} FROM scans WHERE user_id = $1{condition} "
+            f"ORDER BY created_at DESC, id DESC LIMIT ${len(params) - 1} OFFSET ${len(params)}",
+            *params
+        )
+
+    async def export_page(self, user_id: UUID, limit: int, after: Optional[Cursor] = None) -> List[Row]:
+        return await self._owned_page(user_id, limit, after)
+
+    async def list_dual_session(self, session_id: UUID) -> List[Row]:
+        return await self.db.fetch(
+            f"SELECT {_columns(DUAL_SESSION_COLUMNS, 's')}, ("
+            f"SELECT to_jsonb(r) FROM scan_results r WHERE r.scan_id = s.id "
+            f"ORDER BY r.created_at DESC LIMIT 1"
+            f") AS result FROM scans s WHERE s.dual_scan_session_id = $1",
+            str(session_id)
+        )
+
+    async def page_completed(self, after_id: Optional[str], limit: int) -> List[Row]:
+        return await self.db.fetch(
+            "SELECT * FROM scans WHERE status = 'completed' AND ($1::uuid IS NULL OR id > $1::uuid) "
+            "ORDER BY id LIMIT $2",
+            after_id, limit
+        )
+
+
+class PostgresScanResultRepository(_PostgresRepository, ScanResultRepository):
+    table = "scan_results"
+
+    async def get_by_scan(self, scan_id: UUID) -> Optional[Row]:
+        return await self._get_by("scan_id", str(scan_id))
+
+    async def upsert(self, rows: List[Row]):
+        for keys, group in _by_keys(rows).items():
+            columns = _columns(keys)
+            updates = ", ".join(f"{_ident(name)} = EXCLUDED.{_ident(name)}" for name in keys if name != "id")
+            await self.db.execute(
+                f"INSERT INTO scan_results ({columns}) "
+                f"SELECT {columns} FROM jsonb_populate_recordset(NULL::scan_results, $1::jsonb) "
+                f"ON CONFLICT (id) DO UPDATE SET {updates}",
+                group
+            )
+
+    async def list_versions_for_scans(self, scan_ids: Sequence[str]) -> List[Row]:
+        return await self.db.fetch(
+            "SELECT id, scan_id, ai_version, created_at FROM scan_results WHERE scan_id = ANY($1::uuid[])",
+            list(scan_ids)
+        )
+
+    async def list_for_user(
+        self,
+        user_id: UUID,
+        limit: int,
+        after: Optional[Cursor] = None,
+        offset: int = 0
+    ) -> List[Row]:
+        condition, params = _keyset(after, 2, alias="r")
+        params = [str(user_id), *params, limit, 0 if after else offset]
+        return await self.db.fetch(
+            f"SELECT {_columns(RESULT_LIST_COLUMNS, 'r')} FROM scan_results r "
+            f"JOIN scans s ON s.id = r.scan_id WHERE s.user_id = $1{condition} "
+            f"ORDER BY r.created_at DESC, r.id DESC LIMIT ${len(params) - 1} OFFSET ${len(params)}",
+            *params
+        )
+
+    async def export_page(self, user_id: UUID, limit: int, after: Optional[Cursor] = None) -> List[Row]:
+        condition, params = _keyset(after, 2, alias="r")
+        params = [str(user_id), *params, limit]
+        return await self.db.fetch(
+            f"SELECT r.* FROM scan_results r JOIN scans s ON s.id = r.scan_id "
+            f"WHERE s.user_id = $1{condition} "
+            f"ORDER BY r.created_at DESC, r.id DESC LIMIT ${len(params)}",
+            *params
+        )
+
+
+class PostgresRedFlagRepository(_PostgresRepository, RedFlagRepository):
+    table = "red_flags"
+
+    async def save(self, rows: List[Row]):
+        for keys, group in _by_keys(rows).items():
+            columns = _columns(keys)
+            await self.db.execute(
+                f"INSERT INTO red_flags ({columns}) "
+                f"SELECT {columns} FROM jsonb_populate_recordset(NULL::red_flags, $1::jsonb) "
+                f"ON CONFLICT (scan_id, pattern_hash) DO NOTHING",
+                group
+            )
+
+    async def prune(self, keep: Dict[str, List[str]]):
+        if not keep:
+            return
+        kept = [f"{scan_id}:{pattern_hash}" for scan_id, hashes in keep.items() for pattern_hash in hashes]
+        await self.db.execute(
+            "DELETE FROM red_flags WHERE scan_id = ANY($1::uuid[]) "
+            "AND acknowledged_at IS NULL AND resolved_at IS NULL "
+            "AND scan_id::text || ':' || COALESCE(pattern_hash, '') <> ALL($2::text[])",
+            list(keep), kept
+        )
+
+
+class PostgresPatternStatsRepository(_PostgresRepository, PatternStatsRepository):
+    async def merge(self, batch: List[Row]):
+        if batch:
+            await self.db.execute("SELECT merge_pattern_stats($1::jsonb)", batch)
+
+
+class PostgresRepositories(Repositories):
+    """asyncpg backend; owns its connection pool."""
+
+    def __init__(self, db: PostgresPool):
+        self.db = db
+        super().__init__(
+            users=PostgresUserRepository(db),
+            blueprints=PostgresBlueprintRepository(db),
+            scans=PostgresScanRepository(db),
+            scan_results=PostgresScanResultRepository(db),
+            red_flags=PostgresRedFlagRepository(db),
+            pattern_stats=PostgresPatternStatsRepository(db),
+        )
+
+    async def close(self):
+        await self.db.close()
@@ -0,0 +1,258 @@
+"""Repositories over Supabase PostgREST, using the shared async HTTP client."""
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+from datetime import datetime
+
+from app.repositories.base import (
+    DUAL_SESSION_COLUMNS,
+    RESULT_LIST_COLUMNS,
+    SCAN_LIST_COLUMNS,
+    BlueprintRepository,
+    PatternStatsRepository,
+    RedFlagRepository,
+    Repositories,
+    Row,
+    ScanRepository,
+    ScanResultRepository,
+    UserRepository,
+)
+from app.utils.pagination import Cursor, paginate
+
+# Keep `in.(...)` filters well under common URL length limits
+IN_FILTER_CHUNK = 100
+# Rows per request for `in` lookups. Must not exceed PostgREST's max-rows
+# (Supabase default 1000): a short page is taken to be the last one
+IN_FILTER_PAGE = 1000
+
+
+def _first(response) -> Optional[Row]:
+    return response.data[0] if response.data else None
+
+
+class _RestRepository:
+    table = ""
+    in_page_size = IN_FILTER_PAGE
+
+    def __init__(self, client):
+        self.client = client
+
+    def _query(self):
+        return self.client.table(self.table)
+
+    async def _list_in(self, columns: str, column: str, values: Sequence[str], **filters) -> List[Row]:
+        """Rows whose `column` is in `values`, in id-ordered pages; a None filter means IS NULL."""
+        values = list(values)
+        rows: List[Row] = []
+        for start in range(0, len(values), IN_FILTER_CHUNK):
+            chunk = values[start:start + IN_FILTER_CHUNK]
+            offset = 0
+            while True:
+                query = self._query().select(columns).in_(column, chunk)
+                for name, value in filters.items():
+                    query = query.is_(name, "null") if value is None else query.eq(name, value)
+                query = query.order("id").range(offset, offset + self.in_page_size - 1)
+                page = (await query.execute()).data or []
+                rows.extend(page)
+                if len(page) < self.in_page_size:
+                    break
+                offset += self.in_page_size
+        return rows
+
+    async def _get_by(self, column: str, value) -> Optional[Row]:
+        return _first(await self._query().select("*").eq(column, str(value)).limit(1).execute())
+
+    async def create(self, data: Row) -> Optional[Row]:
+        return _first(await self._query().insert(data).execute())
+
+    async def _owned_page(self, user_id: UUID, limit: int, after: Optional[Cursor]) -> List[Row]:
+        query = self._query().select("*").eq("user_id", str(user_id))
+        return (await paginate(query, limit, after).execute()).data
+
+
+class RestUserRepository(_RestRepository, UserRepository):
+    table = "users"
+
+    async def get(self, user_id: UUID) -> Optional[Row]:
+        return await self._get_by("id", user_id)
+
+    async def get_by_email(self, email: str) -> Optional[Row]:
+        return await self._get_by("email", email)
+
+    async def get_with_active_blueprint(self, user_id: UUID) -> Tuple[Optional[Row], Optional[Row]]:
+        # The embedded filter and limit apply to the blueprints, not the user
+        user = _first(await self._query().select("*, blueprints(*)").eq(
+            "id", str(user_id)
+        ).eq("blueprints.is_active", True).limit(1, foreign_table="blueprints").execute())
+        if user is None:
+            return None, None
+        blueprints = user.pop("blueprints", None) or []
+        return user, blueprints[0] if blueprints else None
+
+    async def list_by_ids(self, user_ids: Sequence[str]) -> List[Row]:
+        return await self._list_in("*", "id", user_ids)
+
+    async def get_subscription_status(self, user_id: UUID) -> Optional[str]:
+        user = _first(await self._query().select("subscription_status").eq(
+            "id", str(user_id)
+        ).limit(1).execute())
+        return user.get("subscription_status") if user else None
+
+
+class RestBlueprintRepository(_RestRepository, BlueprintRepository):
+    table = "blueprints"
+
+    async def get_active(self, user_id: UUID) -> Optional[Row]:
+        return _first(await self._query().select("*").eq(
+            "user_id", str(user_id)
+        ).eq("is_active", True).limit(1).execute())
+
+    async def get_owned(self, blueprint_id: UUID, user_id: UUID) -> Optional[Row]:
+        return _first(await self._query().select("*").eq(
+            "id", str(blueprint_id)
+        ).eq("user_id", str(user_id)).limit(1).execute())
+
+    async def list_active_for_users(self, user_ids: Sequence[str]) -> List[Row]:
+        return await self._list_in("*", "user_id", user_ids, is_active=True)
+
+    async def update(self, blueprint_id: UUID, values: Row) -> Optional[Row]:
+        values = {**values, "updated_at": datetime.now().isoformat()}
+        return _first(await self._query().update(values).eq("id", str(blueprint_id)).execute())
+
+    async def export_page(self, user_id: UUID, limit: int, after: Optional[Cursor] = None) -> List[Row]:
+        return await self._owned_page(user_id, limit, after)
+
+
+class RestScanRepository(_RestRepository, ScanRepository):
+    table = "scans"
+
+    async def get(self, scan_id: UUID) -> Optional[Row]:
+        return await self._get_by("id", scan_id)
+
+    async def create_with_result(self, scan: Row, result: Row) -> Tuple[Row, Row]:
+        # migrations/008_create_scan_with_result.sql
+        created = (await self.client.rpc(
+            "create_scan_with_result", {"scan": scan, "result": result}
+        ).execute()).data
+        return created["scan"], created["result"]
+
+    async def list_for_user(
+        self,
+        user_id: UUID,
+        limit: int,
+        after: Optional[Cursor] = None,
+        offset: int = 0,
+        include_answers: bool = True
+    ) -> List[Row]:
+        columns = SCAN_LIST_COLUMNS + (("answers",) if include_answers else ())
+        query = self._query().select(", ".join(columns)).eq("user_id", str(user_id))
+        query = paginate(query, limit, after)
+        if offset and not after:
+            query = query.offset(offset)
+        return (await query.execute()).data
+
+    async def export_page(self, user_id: UUID, limit: int, after: Optional[Cursor] = None) -> List[Row]:
+        return await self._owned_page(user_id, limit, after)
+
+    async def list_dual_session(self, session_id: UUID) -> List[Row]:
+        # One query on the indexed dual_scan_session_id, results embedded
+        columns = ", ".join(DUAL_SESSION_COLUMNS) + ", scan_results(*)"
+        rows = (await self._query().select(columns).eq(
+            "dual_scan_session_id", str(session_id)
+        ).execute()).data
+        for row in rows:
+            results = row.pop("scan_results", None) or []
+            if isinstance(results, dict):
+                results = [results]
+            row["result"] = max(results, key=lambda result: result.get("created_at") or "", default=None)
+        return rows
+
+    async def page_completed(self, after_id: Optional[str], limit: int) -> List[Row]:
+        query = self._query().select("*").eq("status", "completed")
+        if after_id:
+            query = query.gt("id", after_id)
+        return (await query.order("id").limit(limit).execute()).data or []
+
+
+class RestScanResultRepository(_RestRepository, ScanResultRepository):
+    table = "scan_results"
+
+    async def get_by_scan(self, scan_id: UUID) -> Optional[Row]:
+        return await self._get_by("scan_id", scan_id)
+
+    async def upsert(self, rows: List[Row]):
+        if rows:
+            await self._query().upsert(rows).execute()
+
+    async def list_versions_for_scans(self, scan_ids: Sequence[str]) -> List[Row]:
+        return await self._list_in("id,scan_id,ai_version,created_at", "scan_id", scan_ids)
+
+    async def list_for_user(
+        self,
+        user_id: UUID,
+        limit: int,
+        after: Optional[Cursor] = None,
+        offset: int = 0
+    ) -> List[Row]:
+        # One query: results joined to their scan and filtered by its owner
+        columns = ", ".join(RESULT_LIST_COLUMNS) + ", scans!inner(user_id)"
+        query = self._query().select(columns).eq("scans.user_id", str(user_id))
+        query = paginate(query, limit, after)
+        if offset and not after:
+            query = query.offset(offset)
+        rows = (await query.execute()).data
+        for row in rows:
+            row.pop("scans", None)
+        return rows
+
+    async def export_page(self, user_id: UUID, limit: int, after: Optional[Cursor] = None) -> List[Row]:
+        query = self._query().select("*, scans!inner(user_id)").eq("scans.user_id", str(user_id))
+        rows = (await paginate(query, limit, after).execute()).data
+        for row in rows:
+            row.pop("scans", None)  # owner join, not part of the record
+        return rows
+
+
+class RestRedFlagRepository(_RestRepository, RedFlagRepository):
+    table = "red_flags"
+
+    async def save(self, rows: List[Row]):
+        if rows:
+            await self._query().upsert(
+                rows,
+                on_conflict="scan_id,pattern_hash",
+                ignore_duplicates=True
+            ).execute()
+
+    async def prune(self, keep: Dict[str, List[str]]):
+        if not keep:
+            return
+        stored = await self._list_in(
+            "id,scan_id,pattern_hash", "scan_id", list(keep),
+            acknowledged_at=None, resolved_at=None
+        )
+        kept = {scan_id: set(hashes) for scan_id, hashes in keep.items()}
+        stale = [row["id"] for row in stored if row.get("pattern_hash") not in kept[row["scan_id"]]]
+        for start in range(0, len(stale), IN_FILTER_CHUNK):
+            # Checked again, so a flag acknowledged since the read is kept
+            await self._query().delete().in_("id", stale[start:start + IN_FILTER_CHUNK]) \
+                .is_("acknowledged_at", "null").is_("resolved_at", "null").execute()
+
+
+class RestPatternStatsRepository(_RestRepository, PatternStatsRepository):
+    async def merge(self, batch: List[Row]):
+        if batch:
+            await self.client.rpc("merge_pattern_stats", {"batch": batch}).execute()
+
+
+class RestRepositories(Repositories):
+    """PostgREST backend; the HTTP client's lifecycle belongs to app.database."""
+
+    def __init__(self, client):
+        super().__init__(
+            users=RestUserRepository(client),
+            blueprints=RestBlueprintRepository(client),
+            scans=RestScanRepository(client),
+            scan_results=RestScanResultRepository(client),
+            red_flags=RestRedFlagRepository(client),
+            pattern_stats=RestPatternStatsRepository(client),
+        )
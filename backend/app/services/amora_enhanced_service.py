@@ -7,51 +7,46 @@ from typing import Dict, Any, Optional, List, Tuple
 from uuid import UUID
 import logging
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 import random
 from datetime import datetime
-from dataclasses import dataclass
 
 from app.models.pydantic_models import CoachMode, CoachRequest, CoachResponse
 from app.database import get_supabase_client
+from app.services.conversation_state import EMOTIONS, INTENTS, THEMES, ConversationState
+from app.services.embedding_service import EMBEDDING_DIM, get_embedding_model, get_embedding_service
+from app.services.session_store import get_session_store
+from app.services.template_index import get_template_index
+from app.utils.keyword_matcher import KeywordMatcher
 
 logger = logging.getLogger(__name__)
 
 # Lazy imports for models
-_embedding_model = None
 _emotional_detector = None
 _intent_classifier = None
 
+# Rule-based signal vocabularies: signal -> (score when matched, keywords)
+EMOTION_KEYWORDS = {
+    "confusion": (0.8, ["confused", "dont know", "not sure", "uncertain", "unclear"]),
+    "anxiety": (0.7, ["anxious", "worried", "nervous", "scared", "afraid"]),
+    "sadness": (0.7, ["sad", "unhappy", "hurt", "pain", "depressed"]),
+    "overwhelm": (0.8, ["overwhelmed", "too much", "cant handle", "exhausted"]),
+    "hope": (0.6, ["hope", "hopeful", "want to", "trying", "better"]),
+    "frustration": (0.7, ["frustrated", "angry", "annoyed", "fed up"]),
+    "emotional_distance": (0.7, ["distant", "disconnected", "nothing", "numb"]),
+}
 
-def get_embedding_model():
-    """Lazy load sentence-transformers model."""
-    global _embedding_model
-    if _embedding_model is None:
-        from sentence_transformers import SentenceTransformer
-        _embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        logger.info("Loaded sentence-transformers model")
-    return _embedding_model
+INTENT_KEYWORDS = {
+    "greeting_testing": (0.9, ["hi", "hello", "hey", "who are you"]),
+    "venting": (0.7, ["just need to talk", "feeling", "im so"]),
+    "advice_seeking": (0.8, ["what should i", "how do i", "advice", "help me"]),
+    "decision_making": (0.7, ["should i", " or ", "choose", "decide"]),
+    "reassurance_seeking": (0.6, ["am i", "is it okay", "is this normal"]),
+}
 
-
-@dataclass
-class ConversationState:
-    """Track conversation state for adaptive responses."""
-    is_first_message: bool = True
-    turns_count: int = 0
-    confidence_history: List[str] = None
-    recent_themes: List[str] = None
-    emotional_patterns: Dict[str, float] = None
-    unresolved_questions: List[str] = None
-    
-    def __post_init__(self):
-        if self.confidence_history is None:
-            self.confidence_history = []
-        if self.recent_themes is None:
-            self.recent_themes = []
-        if self.emotional_patterns is None:
-            self.emotional_patterns = {}
-        if self.unresolved_questions is None:
-            self.unresolved_questions = []
+_SIGNAL_MATCHER = KeywordMatcher({
+    **{("emotion", name): keywords for name, (_, keywords) in EMOTION_KEYWORDS.items()},
+    **{("intent", name): keywords for name, (_, keywords) in INTENT_KEYWORDS.items()},
+})
 
 
 class EmotionalMirroringEngine:
@@ -188,12 +183,14 @@ class AmoraEnhancedService:
     def __init__(self):
         """Initialize enhanced Amora service."""
         self.embedding_model = get_embedding_model()
+        self.embedding_service = get_embedding_service()
         self.supabase = get_supabase_client()
+        self.template_index = get_template_index()
         self.emotional_mirror = EmotionalMirroringEngine()
         self.variability_engine = ResponseVariabilityEngine()
         
-        # Session storage (in-memory for now, should be Redis in production)
-        self._sessions = {}
+        # Session storage shared by all requests (in-memory LRU or Redis)
+        self.sessions = get_session_store()
     
     def get_response(
         self,
@@ -230,11 +227,8 @@ class AmoraEnhancedService:
             # Generate semantic embedding
             question_embedding = self._generate_embedding(question)
             
-            # Detect emotional signals
-            emotional_signals = self._detect_emotions(question, question_embedding)
-            
-            # Classify intent
-            intent_signals = self._classify_intent(question, question_embedding)
+            # Detect emotional signals and classify intent
+            emotional_signals, intent_signals = self._detect_signals(question)
             
             # Determine confidence level
             confidence_level = self._compute_confidence_level(emotional_signals, intent_signals)
@@ -343,7 +337,7 @@ class AmoraEnhancedService:
         # Mark first turn as complete and save to correct session
         conversation_state.is_first_message = False
         key = session_id if session_id else str(user_id)
-        self._sessions[key] = conversation_state
+        self.sessions.set(key, conversation_state)
         
         return CoachResponse(
             message=response,
@@ -591,90 +585,23 @@ class AmoraEnhancedService:
     def _generate_embedding(self, text: str) -> np.ndarray:
         """Generate semantic embedding."""
         try:
-            return self.embedding_model.encode(text, show_progress_bar=False)
+            return self.embedding_service.encode(text)
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
-            return np.zeros(384)
+            return np.zeros(EMBEDDING_DIM)
     
-    def _detect_emotions(self, text: str, embedding: np.ndarray) -> Dict[str, float]:
-        """Detect emotional signals (rule-based fallback)."""
-        text_lower = text.lower()
-        
+    def _detect_signals(self, text: str) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """Detect emotional and intent signals in one pass (rule-based fallback)."""
+        hits = _SIGNAL_MATCHER.match(text.lower())
         emotions = {
-            "confusion": 0.0,
-            "sadness": 0.0,
-            "anxiety": 0.0,
-            "frustration": 0.0,
-            "hope": 0.0,
-            "emotional_distance": 0.0,
-            "overwhelm": 0.0
+            emotion: EMOTION_KEYWORDS[emotion][0] if ("emotion", emotion) in hits else 0.0
+            for emotion in EMOTIONS
         }
-        
-        # Confusion
-        if any(w in text_lower for w in ["confused", "dont know", "not sure", "uncertain", "unclear"]):
-            emotions["confusion"] = 0.8
-        
-        # Anxiety
-        if any(w in text_lower for w in ["anxious", "worried", "nervous", "scared", "afraid"]):
-            emotions["anxiety"] = 0.7
-        
-        # Sadness
-        if any(w in text_lower for w in ["sad", "unhappy", "hurt", "pain", "depressed"]):
-            emotions["sadness"] = 0.7
-        
-        # Overwhelm
-        if any(w in text_lower for w in ["overwhelmed", "too much", "cant handle", "exhausted"]):
-            emotions["overwhelm"] = 0.8
-        
-        # Hope
-        if any(w in text_lower for w in ["hope", "hopeful", "want to", "trying", "better"]):
-            emotions["hope"] = 0.6
-        
-        # Frustration
-        if any(w in text_lower for w in ["frustrated", "angry", "annoyed", "fed up"]):
-            emotions["frustration"] = 0.7
-        
-        # Emotional distance
-        if any(w in text_lower for w in ["distant", "disconnected", "nothing", "numb"]):
-            emotions["emotional_distance"] = 0.7
-        
-        return emotions
-    
-    def _classify_intent(self, text: str, embedding: np.ndarray) -> Dict[str, float]:
-        """Classify user intent (rule-based fallback)."""
-        text_lower = text.lower()
-        
         intents = {
-            "greeting_testing": 0.0,
-            "venting": 0.0,
-            "reflection": 0.0,
-            "advice_seeking": 0.0,
-            "reassurance_seeking": 0.0,
-            "decision_making": 0.0,
-            "curiosity_learning": 0.0
+            intent: INTENT_KEYWORDS[intent][0] if ("intent", intent) in hits else 0.0
+            for intent in INTENTS
         }
-        
-        # Greeting
-        if any(w in text_lower for w in ["hi", "hello", "hey", "who are you"]):
-            intents["greeting_testing"] = 0.9
-        
-        # Venting
-        if any(w in text_lower for w in ["just need to talk", "feeling", "im so"]):
-            intents["venting"] = 0.7
-        
-        # Advice-seeking
-        if any(w in text_lower for w in ["what should i", "how do i", "advice", "help me"]):
-            intents["advice_seeking"] = 0.8
-        
-        # Decision-making
-        if any(w in text_lower for w in ["should i", " or ", "choose", "decide"]):
-            intents["decision_making"] = 0.7
-        
-        # Reassurance
-        if any(w in text_lower for w in ["am i", "is it okay", "is this normal"]):
-            intents["reassurance_seeking"] = 0.6
-        
-        return intents
+        return emotions, intents
     
     def _compute_confidence_level(
         self,
@@ -707,33 +634,12 @@ class AmoraEnhancedService:
     ) -> Optional[Dict[str, Any]]:
         """Find best matching template using semantic similarity."""
         try:
-            templates_response = self.supabase.table("amora_templates") \
-                .select("*") \
-                .eq("confidence_level", confidence_level) \
-                .eq("active", True) \
-                .execute()
+            matches = self.template_index.top_k(confidence_level, question_embedding, k=1)
             
-            if not templates_response.data:
+            if not matches:
                 return None
             
-            best_template = None
-            best_score = 0.0
-            
-            for template in templates_response.data:
-                template_embedding = np.array(template.get("embedding", []))
-                
-                if len(template_embedding) == 0:
-                    continue
-                
-                similarity = cosine_similarity(
-                    [question_embedding],
-                    [template_embedding]
-                )[0][0]
-                
-                if similarity > best_score:
-                    best_score = similarity
-                    best_template = template
-            
+            best_template, _ = matches[0]
             return best_template
             
         except Exception as e:
@@ -748,9 +654,10 @@ class AmoraEnhancedService:
         """Load conversation state for user + session."""
         # Use session_id if provided (from frontend), otherwise fall back to user_id
         key = session_id if session_id else str(user_id)
-        if key not in self._sessions:
-            self._sessions[key] = ConversationState()
-        return self._sessions[key]
+        state = self.sessions.get(key)
+        if state is None:
+            state = ConversationState()
+        return state
     
     def _update_conversation_state(
         self,
@@ -766,28 +673,23 @@ class AmoraEnhancedService:
         """Update conversation state after turn."""
         state.is_first_message = False
         state.turns_count += 1
-        state.confidence_history.append(confidence_level)
-        
-        # Extract themes (simple keyword extraction)
-        themes = ["trust", "communication", "love", "confusion", "decision"]
-        for theme in themes:
-            if theme in question.lower():
-                if theme not in state.recent_themes:
-                    state.recent_themes.append(theme)
+        state.record_confidence(confidence_level)
         
-        # Keep only last 3 themes
-        state.recent_themes = state.recent_themes[-3:]
+        # Extract themes (simple keyword extraction); the state keeps only the last 3
+        question_lower = question.lower()
+        new_themes = [
+            theme for theme in THEMES
+            if theme in question_lower and theme not in state.recent_themes
+        ]
+        for theme in new_themes:
+            state.add_theme(theme)
         
         # Update emotional patterns (rolling average)
-        for emotion, value in emotional_signals.items():
-            if emotion in state.emotional_patterns:
-                state.emotional_patterns[emotion] = (state.emotional_patterns[emotion] + value) / 2
-            else:
-                state.emotional_patterns[emotion] = value
+        state.update_emotions(emotional_signals)
         
         # Save to correct session (use session_id consistently)
         key = session_id if session_id else str(user_id)
-        self._sessions[key] = state
+        self.sessions.set(key, state)
     
     def _handle_empty_input(self, conversation_state: ConversationState) -> CoachResponse:
         """TASK 9: Handle empty input gracefully."""
@@ -818,3 +720,14 @@ class AmoraEnhancedService:
             confidence=0.5,
             referenced_data={"fallback": True}
         )
+
+
+_amora_service: Optional[AmoraEnhancedService] = None
+
+
+def get_amora_service() -> AmoraEnhancedService:
+    """Get the long-lived Amora service shared by all requests."""
+    global _amora_service
+    if _amora_service is None:
+        _amora_service = AmoraEnhancedService()
+    return _amora_service
@@ -0,0 +1,239 @@
+"""
+Conversation State - Per-session memory for Amora conversations.
+Compact, slotted representation: bounded ring buffers for history and
+themes, a float32 array for the emotion dimensions, and a small binary
+encoding for external session stores.
+"""
+from array import array
+from typing import Dict, Any, Iterable, List, Optional
+import math
+import struct
+
+CONFIDENCE_LEVELS = ("LOW", "MEDIUM", "HIGH")
+THEMES = ("trust", "communication", "love", "confusion", "decision")
+EMOTIONS = (
+    "confusion",
+    "sadness",
+    "anxiety",
+    "frustration",
+    "hope",
+    "emotional_distance",
+    "overwhelm",
+)
+INTENTS = (
+    "greeting_testing",
+    "venting",
+    "reflection",
+    "advice_seeking",
+    "reassurance_seeking",
+    "decision_making",
+    "curiosity_learning",
+)
+
+CONFIDENCE_HISTORY_SIZE = 16
+MAX_RECENT_THEMES = 3
+
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<BBIBB")
+_EMOTIONS = struct.Struct(f"<{len(EMOTIONS)}f")
+_QUESTION_LEN = struct.Struct("<H")
+
+
+class _RingBuffer:
+    """Fixed-capacity byte ring buffer; appending to a full buffer drops the oldest item."""
+
+    __slots__ = ("_buf", "_start", "_count")
+
+    def __init__(self, capacity: int, items: Iterable[int] = ()):
+        self._buf = bytearray(capacity)
+        self._start = 0
+        self._count = 0
+        for item in items:
+            self.append(item)
+
+    def append(self, item: int):
+        capacity = len(self._buf)
+        if self._count < capacity:
+            self._buf[(self._start + self._count) % capacity] = item
+            self._count += 1
+        else:
+            self._buf[self._start] = item
+            self._start = (self._start + 1) % capacity
+
+    def __iter__(self):
+        capacity = len(self._buf)
+        for i in range(self._count):
+            yield self._buf[(self._start + i) % capacity]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, item: int) -> bool:
+        return any(value == item for value in self)
+
+    def to_bytes(self) -> bytes:
+        return bytes(self)
+
+
+class ConversationState:
+    """Track conversation state for adaptive responses."""
+
+    __slots__ = (
+        "is_first_message",
+        "turns_count",
+        "_confidence",
+        "_themes",
+        "_emotions",
+        "unresolved_questions",
+    )
+
+    def __init__(
+        self,
+        is_first_message: bool = True,
+        turns_count: int = 0,
+        confidence_history: Optional[List[str]] = None,
+        recent_themes: Optional[List[str]] = None,
+        emotional_patterns: Optional[Dict[str, float]] = None,
+        unresolved_questions: Optional[List[str]] = None
+    ):
+        self.is_first_message = is_first_message
+        self.turns_count = turns_count
+        self._confidence = _RingBuffer(CONFIDENCE_HISTORY_SIZE)
+        self._themes = _RingBuffer(MAX_RECENT_THEMES)
+        # NaN marks an emotion that has not been observed yet
+        self._emotions = array("f", [math.nan] * len(EMOTIONS))
+        self.unresolved_questions = list(unresolved_questions or [])
+
+        for level in confidence_history or []:
+            self.record_confidence(level)
+        for theme in recent_themes or []:
+            self.add_theme(theme)
+        for emotion, value in (emotional_patterns or {}).items():
+            if emotion in EMOTIONS:
+                self._emotions[EMOTIONS.index(emotion)] = value
+
+    @property
+    def confidence_history(self) -> List[str]:
+        """Most recent confidence levels, oldest first."""
+        return [CONFIDENCE_LEVELS[code] for code in self._confidence]
+
+    @property
+    def recent_themes(self) -> List[str]:
+        """Up to MAX_RECENT_THEMES distinct themes, oldest first."""
+        return [THEMES[code] for code in self._themes]
+
+    @property
+    def emotional_patterns(self) -> Dict[str, float]:
+        """Rolling average per observed emotion."""
+        return {
+            emotion: value
+            for emotion, value in zip(EMOTIONS, self._emotions)
+            if not math.isnan(value)
+        }
+
+    def record_confidence(self, level: str):
+        if level in CONFIDENCE_LEVELS:
+            self._confidence.append(CONFIDENCE_LEVELS.index(level))
+
+    def add_theme(self, theme: str):
+        """Remember a theme unless it is already among the recent ones."""
+        if theme not in THEMES:
+            return
+        code = THEMES.index(theme)
+        if code not in self._themes:
+            self._themes.append(code)
+
+    def update_emotions(self, signals: Dict[str, float]):
+        """Fold one turn's emotion scores into the rolling averages."""
+        for i, emotion in enumerate(EMOTIONS):
+            value = signals.get(emotion)
+            if value is None:
+                continue
+            current = self._emotions[i]
+            self._emotions[i] = value if math.isnan(current) else (current + value) / 2
+
+    def to_bytes(self) -> bytes:
+        """Serialize to a compact binary form for external session stores."""
+        confidence = self._confidence.to_bytes()
+        themes = self._themes.to_bytes()
+        parts = [
+            _HEADER.pack(
+                _FORMAT_VERSION,
+                1 if self.is_first_message else 0,
+                min(self.turns_count, 0xFFFFFFFF),
+                len(confidence),
+                len(themes)
+            ),
+            confidence,
+            themes,
+            _EMOTIONS.pack(*self._emotions),
+            bytes([min(len(self.unresolved_questions), 255)]),
+        ]
+        for question in self.unresolved_questions[:255]:
+            encoded = question.encode("utf-8")
+            if len(encoded) > 0xFFFF:
+                # Cut on a character boundary so from_bytes can decode it
+                encoded = encoded[:0xFFFF].decode("utf-8", "ignore").encode("utf-8")
+            parts.append(_QUESTION_LEN.pack(len(encoded)))
+            parts.append(encoded)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ConversationState":
+        """Create ConversationState from to_bytes() output."""
+        version, flags, turns_count, confidence_len, themes_len = _HEADER.unpack_from(data, 0)
+        if version != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported conversation state version: {version}")
+
+        offset = _HEADER.size
+        state = cls(is_first_message=bool(flags & 1), turns_count=turns_count)
+
+        for code in data[offset:offset + confidence_len]:
+            state._confidence.append(code)
+        offset += confidence_len
+        for code in data[offset:offset + themes_len]:
+            state._themes.append(code)
+        offset += themes_len
+
+        state._emotions = array("f", _EMOTIONS.unpack_from(data, offset))
+        offset += _EMOTIONS.size
+
+        question_count = data[offset]
+        offset += 1
+        for _ in range(question_count):
+            (length,) = _QUESTION_LEN.unpack_from(data, offset)
+            offset += _QUESTION_LEN.size
+            state.unresolved_questions.append(data[offset:offset + length].decode("utf-8"))
+            offset += length
+
+        return state
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dict."""
+        return {
+            "is_first_message": self.is_first_message,
+            "turns_count": self.turns_count,
+            "confidence_history": self.confidence_history,
+            "recent_themes": self.recent_themes,
+            "emotional_patterns": self.emotional_patterns,
+            "unresolved_questions": list(self.unresolved_questions),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ConversationState":
+        """Create ConversationState from a to_dict() result."""
+        return cls(
+            is_first_message=data.get("is_first_message", True),
+            turns_count=data.get("turns_count", 0),
+            confidence_history=data.get("confidence_history"),
+            recent_themes=data.get("recent_themes"),
+            emotional_patterns=data.get("emotional_patterns"),
+            unresolved_questions=data.get("unresolved_questions"),
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"ConversationState(is_first_message={self.is_first_message}, "
+            f"turns_count={self.turns_count}, confidence_history={self.confidence_history}, "
+            f"recent_themes={self.recent_themes}, emotional_patterns={self.emotional_patterns})"
+        )
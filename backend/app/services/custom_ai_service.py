@@ -12,24 +12,35 @@ import os
 
 from app.models.pydantic_models import CoachMode, CoachRequest, CoachResponse
 from app.database import get_supabase_client
+from app.services.conversation_state import EMOTIONS, INTENTS
+from app.services.embedding_service import EMBEDDING_DIM, get_embedding_model, get_embedding_service
+from app.utils.keyword_matcher import KeywordMatcher
 
 logger = logging.getLogger(__name__)
 
 # Lazy import to avoid loading models at module import time
-_embedding_model = None
 _emotional_detector = None
 _intent_classifier = None
 
+# Rule-based fallback vocabularies: signal -> (score when matched, keywords)
+EMOTION_KEYWORDS = {
+    "confusion": (0.8, ["confused", "dont know", "not sure", "uncertain"]),
+    "anxiety": (0.7, ["anxious", "worried", "nervous", "scared"]),
+    "sadness": (0.7, ["sad", "unhappy", "depressed", "hurt"]),
+    "overwhelm": (0.8, ["overwhelmed", "too much", "cant handle"]),
+    "hope": (0.6, ["hope", "hopeful", "want to", "trying"]),
+}
 
-def get_embedding_model():
-    """Lazy load sentence-transformers model."""
-    global _embedding_model
-    if _embedding_model is None:
-        from sentence_transformers import SentenceTransformer
-        # Load lightweight model (80MB, runs on CPU)
-        _embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        logger.info("Loaded sentence-transformers model")
-    return _embedding_model
+INTENT_KEYWORDS = {
+    "greeting_testing": (0.9, ["hi", "hello", "hey", "what can you do", "who are you"]),
+    "venting": (0.7, ["just need to talk", "feeling", "im so", "i just"]),
+    "advice_seeking": (0.8, ["what should i", "how do i", "advice", "help me"]),
+    "decision_making": (0.7, ["should i", "or", "choose", "decide"]),
+    "reassurance_seeking": (0.6, ["am i", "is it okay", "is this normal"]),
+}
+
+_EMOTION_MATCHER = KeywordMatcher({name: keywords for name, (_, keywords) in EMOTION_KEYWORDS.items()})
+_INTENT_MATCHER = KeywordMatcher({name: keywords for name, (_, keywords) in INTENT_KEYWORDS.items()})
 
 
 def get_emotional_detector():
@@ -69,6 +80,7 @@ class CustomAIService:
     def __init__(self):
         """Initialize custom AI service."""
         self.embedding_model = get_embedding_model()
+        self.embedding_service = get_embedding_service()
         self.emotional_detector = get_emotional_detector()
         self.intent_classifier = get_intent_classifier()
         self.supabase = get_supabase_client()
@@ -147,11 +159,10 @@ class CustomAIService:
     def _generate_embedding(self, text: str) -> np.ndarray:
         """Convert text to 384-dimensional vector."""
         try:
-            embedding = self.embedding_model.encode(text, show_progress_bar=False)
-            return embedding
+            return self.embedding_service.encode(text)
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
-            return np.zeros(384)  # Fallback zero vector
+            return np.zeros(EMBEDDING_DIM)  # Fallback zero vector
     
     def _detect_emotions(self, text: str, embedding: np.ndarray) -> Dict[str, float]:
         """
@@ -178,40 +189,11 @@ class CustomAIService:
     
     def _rule_based_emotion_detection(self, text: str) -> Dict[str, float]:
         """Fallback rule-based emotion detection."""
-        text_lower = text.lower()
-        
-        # Simple keyword-based detection
-        emotions = {
-            "confusion": 0.0,
-            "sadness": 0.0,
-            "anxiety": 0.0,
-            "frustration": 0.0,
-            "hope": 0.0,
-            "emotional_distance": 0.0,
-            "overwhelm": 0.0
+        hits = _EMOTION_MATCHER.match(text.lower())
+        return {
+            emotion: EMOTION_KEYWORDS[emotion][0] if emotion in hits else 0.0
+            for emotion in EMOTIONS
         }
-        
-        # Confusion indicators
-        if any(w in text_lower for w in ["confused", "dont know", "not sure", "uncertain"]):
-            emotions["confusion"] = 0.8
-        
-        # Anxiety indicators
-        if any(w in text_lower for w in ["anxious", "worried", "nervous", "scared"]):
-            emotions["anxiety"] = 0.7
-        
-        # Sadness indicators
-        if any(w in text_lower for w in ["sad", "unhappy", "depressed", "hurt"]):
-            emotions["sadness"] = 0.7
-        
-        # Overwhelm indicators
-        if any(w in text_lower for w in ["overwhelmed", "too much", "cant handle"]):
-            emotions["overwhelm"] = 0.8
-        
-        # Hope indicators
-        if any(w in text_lower for w in ["hope", "hopeful", "want to", "trying"]):
-            emotions["hope"] = 0.6
-        
-        return emotions
     
     def _classify_intent(self, text: str, embedding: np.ndarray) -> Dict[str, float]:
         """
@@ -238,39 +220,11 @@ class CustomAIService:
     
     def _rule_based_intent_classification(self, text: str) -> Dict[str, float]:
         """Fallback rule-based intent classification."""
-        text_lower = text.lower()
-        
-        intents = {
-            "greeting_testing": 0.0,
-            "venting": 0.0,
-            "reflection": 0.0,
-            "advice_seeking": 0.0,
-            "reassurance_seeking": 0.0,
-            "decision_making": 0.0,
-            "curiosity_learning": 0.0
+        hits = _INTENT_MATCHER.match(text.lower())
+        return {
+            intent: INTENT_KEYWORDS[intent][0] if intent in hits else 0.0
+            for intent in INTENTS
         }
-        
-        # Greeting patterns
-        if any(w in text_lower for w in ["hi", "hello", "hey", "what can you do", "who are you"]):
-            intents["greeting_testing"] = 0.9
-        
-        # Venting patterns
-        if any(w in text_lower for w in ["just need to talk", "feeling", "im so", "i just"]):
-            intents["venting"] = 0.7
-        
-        # Advice-seeking patterns
-        if any(w in text_lower for w in ["what should i", "how do i", "advice", "help me"]):
-            intents["advice_seeking"] = 0.8
-        
-        # Decision-making patterns
-        if any(w in text_lower for w in ["should i", "or", "choose", "decide"]):
-            intents["decision_making"] = 0.7
-        
-        # Reassurance-seeking patterns
-        if any(w in text_lower for w in ["am i", "is it okay", "is this normal"]):
-            intents["reassurance_seeking"] = 0.6
-        
-        return intents
     
     def _compute_confidence_level(
         self,
@@ -0,0 +1,152 @@
+"""
+Dual Scan Session - Resolves both scans of a dual scan session and their
+mutual alignment.
+
+A session is resolved with one repository query on the indexed
+`dual_scan_session_id` that returns each scan with its latest scan result.
+Two caches sit in front of it:
+    sessions    session id -> participants and alignment; partners polling
+                for each other's completion are served from memory until
+                the assessment endpoint saves a scan of the session and
+                calls `invalidate`. The cache is per worker, so a scan
+                saved by another worker (or a rescore run) shows up within
+                DUAL_SCAN_SESSION_TTL_SECONDS
+    alignments  (result id, ai_version, scored fields) of both sides ->
+                DualScanEngine output, so repeated views of a comparison
+                never recompute it; the rescore job keeps result ids, so
+                the id alone would serve alignments of the old scores
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+import json
+import logging
+
+from app.config import settings
+from app.models.db_models import Scan, ScanResult
+from app.repositories import ScanRepository, get_repositories
+from app.services.dual_scan_engine import DualScanEngine
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def alignment_key(result: Dict[str, Any]) -> Tuple[str, Optional[str], str]:
+    """Cache key of one side: the result id plus every field the engine reads."""
+    scored = [
+        result.get("overall_score"),
+        result.get("category_scores") or {},
+        [flag.get("category") for flag in result.get("red_flags") or []],
+    ]
+    return result["id"], result.get("ai_version"), json.dumps(scored, default=str)
+
+
+class DualScanSessionService:
+    """Cached resolution of dual scan sessions."""
+
+    def __init__(
+        self,
+        scans: Optional[ScanRepository] = None,
+        engine: Optional[DualScanEngine] = None,
+        max_entries: Optional[int] = None,
+        session_ttl_seconds: Optional[float] = None,
+        alignment_ttl_seconds: Optional[float] = None
+    ):
+        self._scans = scans
+        self.engine = engine or DualScanEngine()
+        max_entries = settings.DUAL_SCAN_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.session_ttl_seconds = (
+            settings.DUAL_SCAN_SESSION_TTL_SECONDS
+            if session_ttl_seconds is None else session_ttl_seconds
+        )
+        alignment_ttl_seconds = (
+            settings.DUAL_SCAN_ALIGNMENT_TTL_SECONDS
+            if alignment_ttl_seconds is None else alignment_ttl_seconds
+        )
+        self.sessions = TTLCache(max_entries, self.session_ttl_seconds, name="dual_scan_sessions")
+        self.alignments = TTLCache(max_entries, alignment_ttl_seconds, name="dual_scan_alignments")
+
+    @property
+    def scans(self) -> ScanRepository:
+        if self._scans is None:
+            self._scans = get_repositories().scans
+        return self._scans
+
+    async def get_session(self, session_id: UUID) -> Optional[Dict[str, Any]]:
+        """
+        Session status, participants and (once both results exist) the
+        mutual alignment. Returns None for an unknown session; raises
+        ValueError if the session has more than two scans.
+        """
+        key = str(session_id)
+        session = self.sessions.get(key, _MISSING)
+        if session is not _MISSING:
+            return session
+
+        session = await self._resolve(key)
+        # A zero TTL means "no expiry" to TTLCache; here it means "don't cache"
+        if self.session_ttl_seconds and self.session_ttl_seconds > 0:
+            self.sessions.set(key, session)
+        return session
+
+    def invalidate(self, session_id: UUID):
+        """Forget a session; called when one of its scans is saved."""
+        self.sessions.delete(str(session_id))
+
+    async def _resolve(self, key: str) -> Optional[Dict[str, Any]]:
+        rows = await self.scans.list_dual_session(key)
+
+        if not rows:
+            return None
+        if len(rows) > 2:
+            raise ValueError(f"Dual scan session {key} has {len(rows)} scans")
+
+        rows = sorted(rows, key=lambda row: (row.get("dual_scan_role") or "", row["id"]))
+        results = [row.get("result") for row in rows]
+        participants = [
+            {
+                "scan_id": row["id"],
+                "role": row.get("dual_scan_role"),
+                "completed": result is not None,
+            }
+            for row, result in zip(rows, results)
+        ]
+
+        if len(rows) < 2 or any(result is None for result in results):
+            return {"session_id": key, "status": "pending", "participants": participants, "result_ids": None}
+
+        result_ids: Tuple[str, str] = (results[0]["id"], results[1]["id"])
+        cache_key = (alignment_key(results[0]), alignment_key(results[1]))
+        alignment = self.alignments.get(cache_key)
+        if alignment is None:
+            scans: List[Scan] = [Scan.from_dict(row) for row in rows]
+            alignment = self.engine.calculate_mutual_alignment(
+                scans[0],
+                scans[1],
+                ScanResult.from_dict(results[0]),
+                ScanResult.from_dict(results[1])
+            )
+            self.alignments.set(cache_key, alignment)
+            logger.info(f"Computed mutual alignment for dual scan session {key}")
+        return {
+            "session_id": key,
+            "status": "complete",
+            "participants": participants,
+            "result_ids": result_ids,
+            "alignment": alignment,
+        }
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [self.sessions.stats(), self.alignments.stats()]
+
+
+_dual_scan_sessions: Optional[DualScanSessionService] = None
+
+
+def get_dual_scan_session_service() -> DualScanSessionService:
+    """Get the process-wide dual scan session service."""
+    global _dual_scan_sessions
+    if _dual_scan_sessions is None:
+        _dual_scan_sessions = DualScanSessionService()
+    return _dual_scan_sessions
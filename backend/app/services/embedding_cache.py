@@ -0,0 +1,281 @@
+"""
+Embedding Cache - Bounded LRU/TTL cache of question embeddings.
+Keys are question texts normalized the same way CoachService matches them,
+so trivially different phrasings of common openers share one entry.
+Optionally spills to a memory-mapped float32 store that survives restarts.
+"""
+from typing import Optional, Dict, Any
+from contextlib import contextmanager
+import fcntl
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+from app.config import settings
+from app.services.coach_service import normalize_question
+from app.services.embedding_service import EMBEDDING_DIM, EMBEDDING_MODEL_NAME
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class DiskEmbeddingStore:
+    """
+    Fixed-capacity float32 matrix on disk (np.memmap) plus an append-only key log.
+
+    Slots are reused round-robin once the store is full, so the file size is
+    bounded by `capacity * dim * 4` bytes. Several processes (server workers)
+    may share one path: an flock on LOCK_FILE serializes writers, and each
+    process applies the log lines written by the others before reading or
+    allocating a slot. A vector is flushed before its key is logged, and a
+    reused slot is first logged as empty, so a crash mid-write never maps a
+    key to another key's vector.
+    """
+
+    VECTORS_FILE = "vectors.f32"
+    KEYS_FILE = "keys.log"
+    META_FILE = "meta.json"
+    LOCK_FILE = "lock"
+
+    def __init__(self, path: str, dim: int = EMBEDDING_DIM, capacity: int = 50000):
+        self.path = path
+        self.dim = dim
+        self.capacity = max(1, capacity)
+        self._lock = threading.Lock()
+        self._key_to_slot: Dict[str, int] = {}
+        self._slot_to_key: Dict[int, str] = {}
+        self._next_slot = 0
+        self._log = None
+        self._log_inode = None
+        self._log_offset = 0
+        self._log_lines = 0
+
+        os.makedirs(path, exist_ok=True)
+        self._log_path = os.path.join(path, self.KEYS_FILE)
+        self._lock_file = open(os.path.join(path, self.LOCK_FILE), "a+")
+
+        with self._file_lock(fcntl.LOCK_EX):
+            self._reset_if_incompatible()
+
+            vectors_path = os.path.join(path, self.VECTORS_FILE)
+            mode = "r+" if os.path.exists(vectors_path) else "w+"
+            self._vectors = np.memmap(vectors_path, dtype=np.float32, mode=mode, shape=(self.capacity, dim))
+
+            self._sync()
+            self._compact_if_large()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock, self._file_lock(fcntl.LOCK_SH):
+            self._sync()
+            slot = self._key_to_slot.get(key)
+            if slot is None:
+                return None
+            return np.array(self._vectors[slot])
+
+    def put(self, key: str, vector: np.ndarray):
+        with self._lock, self._file_lock(fcntl.LOCK_EX):
+            self._sync()
+            slot = self._key_to_slot.get(key)
+            if slot is not None:
+                # Same key, same embedding: rewriting in place is safe
+                self._vectors[slot] = vector
+                self._vectors.flush()
+                return
+
+            slot = self._next_slot
+            if slot in self._slot_to_key:
+                self._append(slot, "")
+            self._vectors[slot] = vector
+            self._vectors.flush()
+            self._append(slot, key)
+
+    def __len__(self) -> int:
+        return len(self._key_to_slot)
+
+    def close(self):
+        with self._lock:
+            self._vectors.flush()
+            self._log.close()
+            self._lock_file.close()
+
+    @contextmanager
+    def _file_lock(self, mode: int):
+        fcntl.flock(self._lock_file, mode)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _append(self, slot: int, key: str):
+        """Log a slot assignment (an empty key frees the slot). Caller holds both locks."""
+        line = f"{slot}\t{key}\n".encode("utf-8")
+        self._log.write(line)
+        self._log.flush()
+        self._log_offset += len(line)
+        self._log_lines += 1
+        self._apply(slot, key)
+
+    def _apply(self, slot: int, key: str):
+        old_key = self._slot_to_key.pop(slot, None)
+        if old_key is not None:
+            self._key_to_slot.pop(old_key, None)
+        if key:
+            self._slot_to_key[slot] = key
+            self._key_to_slot[key] = slot
+            self._next_slot = (slot + 1) % self.capacity
+
+    def _sync(self):
+        """Apply log lines appended since the last sync, by this or any other process."""
+        try:
+            stat = os.stat(self._log_path)
+        except FileNotFoundError:
+            stat = None
+
+        if stat is None or stat.st_ino != self._log_inode:
+            # First load, or the log was replaced (compacted): start over
+            if self._log is not None:
+                self._log.close()
+            self._log = open(self._log_path, "ab")
+            self._log_inode = os.fstat(self._log.fileno()).st_ino
+            self._log_offset = 0
+            self._log_lines = 0
+            self._key_to_slot.clear()
+            self._slot_to_key.clear()
+            self._next_slot = 0
+        elif stat.st_size == self._log_offset:
+            return
+
+        with open(self._log_path, "rb") as f:
+            f.seek(self._log_offset)
+            data = f.read()
+
+        complete = data[:data.rfind(b"\n") + 1]  # a writer may be mid-line
+        self._log_offset += len(complete)
+        for raw in complete.splitlines():
+            self._log_lines += 1
+            slot, sep, key = raw.decode("utf-8", "replace").partition("\t")
+            if not sep or not slot.isdigit() or int(slot) >= self.capacity:
+                continue
+            self._apply(int(slot), key)
+
+    def _compact_if_large(self):
+        """Rewrite the log when it has grown well past capacity. Caller holds the file lock."""
+        if self._log_lines <= 2 * self.capacity:
+            return
+
+        # The last written slot goes last so the round-robin position survives
+        ordered = sorted(self._slot_to_key.items(), key=lambda item: (item[0] - self._next_slot) % self.capacity)
+        tmp_path = self._log_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for slot, key in ordered:
+                f.write(f"{slot}\t{key}\n")
+        os.replace(tmp_path, self._log_path)
+        self._sync()
+
+    def _reset_if_incompatible(self):
+        """Discard stored vectors produced by a different model or shape."""
+        meta = {"model": EMBEDDING_MODEL_NAME, "dim": self.dim, "capacity": self.capacity}
+        meta_path = os.path.join(self.path, self.META_FILE)
+
+        if os.path.exists(meta_path):
+            try:
+                with open(meta_path) as f:
+                    if json.load(f) == meta:
+                        return
+            except ValueError:
+                pass
+            logger.warning(f"Embedding store at {self.path} is incompatible, resetting it")
+
+        for name in (self.VECTORS_FILE, self.KEYS_FILE):
+            file_path = os.path.join(self.path, name)
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        with open(meta_path, "w") as f:
+            json.dump(meta, f)
+
+
+class EmbeddingCache:
+    """Two-level embedding cache: in-memory LRU/TTL in front of an optional disk store."""
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        disk_store: Optional[DiskEmbeddingStore] = None
+    ):
+        self.memory = TTLCache(
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds,
+            max_bytes=max_bytes,
+            sizeof=lambda vector: vector.nbytes,
+            name="embeddings"
+        )
+        self.disk = disk_store
+        self.disk_hits = 0
+
+    @classmethod
+    def from_settings(cls) -> "EmbeddingCache":
+        disk_store = None
+        if settings.EMBEDDING_CACHE_PATH:
+            try:
+                disk_store = DiskEmbeddingStore(
+                    settings.EMBEDDING_CACHE_PATH,
+                    capacity=settings.EMBEDDING_CACHE_DISK_CAPACITY
+                )
+            except OSError as e:
+                logger.error(f"Embedding disk cache disabled: {e}")
+
+        return cls(
+            max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+            max_bytes=settings.EMBEDDING_CACHE_MAX_BYTES,
+            ttl_seconds=settings.EMBEDDING_CACHE_TTL_SECONDS,
+            disk_store=disk_store
+        )
+
+    @staticmethod
+    def key(text: str) -> str:
+        return normalize_question(text)
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        key = self.key(text)
+        if not key:
+            return None
+
+        vector = self.memory.get(key)
+        if vector is not None:
+            return vector
+
+        if self.disk is not None:
+            vector = self.disk.get(key)
+            if vector is not None:
+                self.disk_hits += 1
+                vector.flags.writeable = False
+                self.memory.set(key, vector)
+                return vector
+
+        return None
+
+    def put(self, text: str, vector: np.ndarray):
+        key = self.key(text)
+        if not key:
+            return
+
+        vector = np.array(vector, dtype=np.float32)
+        vector.flags.writeable = False
+        self.memory.set(key, vector)
+
+        if self.disk is not None:
+            try:
+                self.disk.put(key, vector)
+            except (OSError, ValueError) as e:
+                logger.error(f"Error writing embedding to disk cache: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.memory.stats()
+        stats["disk_hits"] = self.disk_hits
+        stats["disk_entries"] = len(self.disk) if self.disk is not None else 0
+        return stats
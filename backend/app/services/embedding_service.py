@@ -0,0 +1,195 @@
+"""
+Embedding Service - Shared sentence-transformers encoder with micro-batching.
+Concurrent requests arriving within a short window are coalesced into a
+single encode([...]) call and each caller receives its own row back.
+Repeated questions are answered from an optional embedding cache.
+"""
+from concurrent.futures import Future
+from typing import Optional, List, Tuple
+import logging
+import queue
+import threading
+import time
+
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+EMBEDDING_DIM = 384
+
+# Lazy import to avoid loading models at module import time
+_embedding_model = None
+
+_STOP = object()
+
+
+class EmbeddingServiceClosedError(RuntimeError):
+    """Raised for requests made to, or left queued in, a closed EmbeddingService."""
+
+
+def get_embedding_model():
+    """Lazy load sentence-transformers model."""
+    global _embedding_model
+    if _embedding_model is None:
+        from sentence_transformers import SentenceTransformer
+        # Load lightweight model (80MB, runs on CPU)
+        _embedding_model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+        logger.info("Loaded sentence-transformers model")
+    return _embedding_model
+
+
+class EmbeddingService:
+    """
+    Micro-batching front end for the embedding model.
+
+    Callers block on `encode()` while a single background thread drains the
+    request queue, waiting at most `max_wait_ms` after the first request for
+    up to `max_batch_size` requests before running one forward pass.
+    """
+
+    def __init__(
+        self,
+        model=None,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        cache=None
+    ):
+        self._model = model
+        self.cache = cache
+        self.max_batch_size = max(1, max_batch_size or settings.EMBEDDING_BATCH_MAX_SIZE)
+        wait_ms = settings.EMBEDDING_BATCH_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms
+        self.max_wait = max(0.0, wait_ms) / 1000.0
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = get_embedding_model()
+        return self._model
+
+    def encode(self, text: str, timeout: Optional[float] = None) -> np.ndarray:
+        """Embed one text, sharing a forward pass with concurrent callers."""
+        if self.cache is not None:
+            cached = self.cache.get(text)
+            if cached is not None:
+                return cached
+
+        vector = self.submit(text).result(timeout=timeout)
+
+        if self.cache is not None:
+            self.cache.put(text, vector)
+        return vector
+
+    def submit(self, text: str) -> Future:
+        """Queue a text for the next batch and return a future for its embedding."""
+        future: Future = Future()
+        # Under the lock, so nothing can be queued behind close()'s stop marker
+        with self._lock:
+            if self._closed:
+                raise EmbeddingServiceClosedError("Embedding service is shut down")
+            self._ensure_worker()
+            self._queue.put((text, future))
+        return future
+
+    def close(self):
+        """Stop the background worker after it drains queued requests; later calls are rejected."""
+        with self._lock:
+            self._closed = True
+            worker = self._worker
+            self._worker = None
+            if worker is not None:
+                self._queue.put(_STOP)
+        if worker is not None:
+            worker.join()
+        self._fail_pending()
+
+    def _fail_pending(self):
+        """Fail anything still queued once the worker is gone, so no caller waits forever."""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(EmbeddingServiceClosedError("Embedding service is shut down"))
+
+    def _ensure_worker(self):
+        """Start the worker if it is not running. Caller holds the lock."""
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._run,
+                name="embedding-batcher",
+                daemon=True
+            )
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            batch, stop = self._collect_batch(item)
+            self._encode_batch(batch)
+
+            if stop:
+                return
+
+    def _collect_batch(self, first) -> Tuple[List[Tuple[str, Future]], bool]:
+        """Gather requests until the batch is full or the wait window closes."""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+
+        return batch, False
+
+    def _encode_batch(self, batch: List[Tuple[str, Future]]):
+        live = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+        if not live:
+            return
+
+        try:
+            vectors = self.model.encode(
+                [text for text, _ in live],
+                batch_size=len(live),
+                show_progress_bar=False
+            )
+        except Exception as e:
+            logger.error(f"Error encoding embedding batch of {len(live)}: {e}")
+            for _, future in live:
+                future.set_exception(e)
+            return
+
+        for (_, future), vector in zip(live, vectors):
+            future.set_result(np.asarray(vector))
+
+
+_embedding_service: Optional[EmbeddingService] = None
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Get the process-wide embedding service."""
+    global _embedding_service
+    if _embedding_service is None:
+        cache = None
+        if settings.EMBEDDING_CACHE_ENABLED:
+            from app.services.embedding_cache import EmbeddingCache
+            cache = EmbeddingCache.from_settings()
+        _embedding_service = EmbeddingService(cache=cache)
+    return _embedding_service
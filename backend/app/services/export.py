@@ -0,0 +1,78 @@
+"""
+Export - Streams a user's full history as NDJSON.
+
+Each line is {"type": <record type>, "data": <row>}; blueprints come
+first, then scans, then scan results. A final "export_complete" line
+carries the record counts so consumers can tell a finished export from a
+truncated one; a failure mid-stream ends with an "export_error" line.
+Rows are read in keyset pages on (created_at, id) through the configured
+repositories, so at most one page is held in memory whatever the history
+size.
+"""
+from typing import Any, AsyncIterator, Dict, Optional
+from uuid import UUID
+import json
+import logging
+import zlib
+
+from app.config import settings
+from app.repositories import Repositories
+from app.utils.pagination import row_cursor
+
+logger = logging.getLogger(__name__)
+
+# (record type, repository attribute), in export order
+EXPORT_SOURCES = (
+    ("blueprint", "blueprints"),
+    ("scan", "scans"),
+    ("scan_result", "scan_results"),
+)
+
+
+def _line(record_type: str, data: Dict[str, Any]) -> bytes:
+    return (json.dumps({"type": record_type, "data": data}, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+
+
+async def iter_user_export(
+    repos: Repositories,
+    user_id: UUID,
+    page_size: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    """Yield the user's export as NDJSON chunks, one chunk per page."""
+    page_size = page_size or settings.EXPORT_PAGE_SIZE
+    counts = {}
+
+    try:
+        for record_type, attribute in EXPORT_SOURCES:
+            repository = getattr(repos, attribute)
+            counts[record_type] = 0
+            after = None
+            while True:
+                rows = await repository.export_page(user_id, page_size, after)
+                if not rows:
+                    break
+
+                counts[record_type] += len(rows)
+                yield b"".join(_line(record_type, row) for row in rows)
+
+                if len(rows) < page_size:
+                    break
+                after = row_cursor(rows[-1])
+    except Exception as e:
+        # Headers are already sent; end the stream with an explicit marker
+        logger.error(f"Error exporting history for user {user_id}: {e}")
+        yield _line("export_error", {"detail": str(e), "counts": counts})
+        return
+
+    yield _line("export_complete", counts)
+    logger.info(f"Exported history for user {user_id}: {counts}")
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Gzip-compress an async byte stream chunk by chunk."""
+    compressor = zlib.compressobj(wbits=31)  # 31: gzip container
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,246 @@
+"""
+Pattern Aggregator - Incremental pattern_knowledge_base statistics.
+
+Every scan result is folded into per-pattern running statistics as it is
+produced: occurrence count, Welford mean / M2 of the overall score, flag
+count, mean confidence and the outcome (classification) distribution.
+Statistics are buffered in memory and flushed in one batched call (through
+PatternStatsRepository) to the `merge_pattern_stats` database function,
+which merges them into the stored rows with Chan's parallel formula, so no
+full-table recomputation is needed and concurrent workers can flush
+independently.
+
+Patterns observed per result:
+    red_flag       one per distinct red flag pattern_hash in the result
+    score_profile  the result's category scores, bucketed into SCORE_BANDS
+A result is "flagged" when it carries a high or critical red flag.
+"""
+from typing import Any, Dict, List, Optional
+import asyncio
+import hashlib
+import json
+import logging
+import time
+
+from app.config import settings
+from app.models.db_models import ScanResult
+from app.repositories import PatternStatsRepository, get_repositories
+from app.services.red_flag_engine import compute_pattern_hash
+
+logger = logging.getLogger(__name__)
+
+FLAGGED_SEVERITIES = ("high", "critical")
+SCORE_BAND_WIDTH = 20
+
+
+class PatternStats:
+    """Running statistics for one pattern; mergeable in any order."""
+
+    __slots__ = (
+        "pattern_type",
+        "pattern_data",
+        "count",
+        "mean",
+        "m2",
+        "flag_count",
+        "confidence_mean",
+        "outcomes",
+    )
+
+    def __init__(self, pattern_type: str, pattern_data: Dict[str, Any]):
+        self.pattern_type = pattern_type
+        self.pattern_data = pattern_data
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.flag_count = 0
+        self.confidence_mean = 0.0
+        self.outcomes: Dict[str, int] = {}
+
+    def add(self, score: float, flagged: bool, confidence: float, outcome: Optional[str]):
+        """Welford update with one observation."""
+        self.count += 1
+        delta = score - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (score - self.mean)
+        self.confidence_mean += (confidence - self.confidence_mean) / self.count
+        if flagged:
+            self.flag_count += 1
+        if outcome:
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+    def merge(self, other: "PatternStats"):
+        """Combine with statistics gathered separately (Chan et al.)."""
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.confidence_mean += (other.confidence_mean - self.confidence_mean) * other.count / total
+        self.count = total
+        self.flag_count += other.flag_count
+        for outcome, n in other.outcomes.items():
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + n
+
+    @property
+    def variance(self) -> float:
+        """Sample variance of the score (0 with fewer than two observations)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def flag_rate(self) -> float:
+        return self.flag_count / self.count if self.count else 0.0
+
+    def to_payload(self, pattern_hash: str) -> Dict[str, Any]:
+        return {
+            "pattern_hash": pattern_hash,
+            "pattern_type": self.pattern_type,
+            "pattern_data": self.pattern_data,
+            "occurrence_count": self.count,
+            "avg_score": self.mean,
+            "score_m2": self.m2,
+            "flag_count": self.flag_count,
+            "avg_confidence": self.confidence_mean,
+            "outcome_distribution": self.outcomes,
+        }
+
+
+def _hash(data: Dict[str, Any]) -> str:
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def extract_patterns(result: ScanResult) -> Dict[str, tuple]:
+    """pattern_hash -> (pattern_type, pattern_data) for one scan result."""
+    patterns: Dict[str, tuple] = {}
+
+    for flag in result.red_flags or []:
+        if "signal" not in flag:
+            continue
+        pattern_hash = flag.get("pattern_hash") or compute_pattern_hash(flag)
+        patterns.setdefault(pattern_hash, ("red_flag", {
+            "severity": flag.get("severity"),
+            "category": flag.get("category"),
+            "signal": flag.get("signal"),
+        }))
+
+    if result.category_scores:
+        bands = {
+            str(category): min(int(score) // SCORE_BAND_WIDTH * SCORE_BAND_WIDTH, 100 - SCORE_BAND_WIDTH)
+            for category, score in result.category_scores.items()
+        }
+        data = {"category_bands": bands}
+        patterns[_hash({"type": "score_profile", **data})] = ("score_profile", data)
+
+    return patterns
+
+
+class PatternAggregator:
+    """
+    In-memory buffer of PatternStats, flushed in batches.
+
+    A flush happens when `max_pending` patterns are buffered or
+    `flush_interval` seconds have passed since the last one. `observe()`
+    only buffers; a due flush runs as a task on the event loop so callers
+    never wait for the database, and at most one such task runs at a time.
+    A failed flush merges its batch back into the buffer so nothing is
+    lost. Used from the event loop only.
+    """
+
+    def __init__(
+        self,
+        repository: Optional[PatternStatsRepository] = None,
+        max_pending: Optional[int] = None,
+        flush_interval: Optional[float] = None
+    ):
+        self._repository = repository
+        self.max_pending = (
+            settings.PATTERN_AGGREGATOR_MAX_PENDING
+            if max_pending is None else max_pending
+        )
+        self.flush_interval = (
+            settings.PATTERN_AGGREGATOR_FLUSH_SECONDS
+            if flush_interval is None else flush_interval
+        )
+        self._pending: Dict[str, PatternStats] = {}
+        self._last_flush = time.monotonic()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @property
+    def repository(self) -> PatternStatsRepository:
+        if self._repository is None:
+            self._repository = get_repositories().pattern_stats
+        return self._repository
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def observe(self, result: ScanResult):
+        """Fold one scan result into the buffer; a due flush is started in the background."""
+        confidence = float((result.ai_analysis or {}).get("confidence_score") or 0.0)
+        flagged = any(
+            flag.get("severity") in FLAGGED_SEVERITIES
+            for flag in result.red_flags or []
+        )
+        score = float(result.overall_score)
+
+        for pattern_hash, (pattern_type, pattern_data) in extract_patterns(result).items():
+            stats = self._pending.get(pattern_hash)
+            if stats is None:
+                stats = self._pending[pattern_hash] = PatternStats(pattern_type, pattern_data)
+            stats.add(score, flagged, confidence, result.category)
+
+        if self._flush_due() and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+    async def flush(self) -> int:
+        """Send all buffered statistics in one batch; returns the number of patterns sent."""
+        batch, self._pending = self._pending, {}
+        self._last_flush = time.monotonic()
+        if not batch:
+            return 0
+
+        try:
+            await self.repository.merge([stats.to_payload(h) for h, stats in batch.items()])
+        except Exception as e:
+            logger.error(f"Error flushing {len(batch)} pattern stats, keeping them buffered: {e}")
+            for pattern_hash, stats in batch.items():
+                newer = self._pending.get(pattern_hash)
+                if newer is not None:
+                    stats.merge(newer)
+                self._pending[pattern_hash] = stats
+            return 0
+
+        logger.info(f"Flushed stats for {len(batch)} patterns")
+        return len(batch)
+
+    async def close(self) -> int:
+        """Wait for a running background flush, then flush the rest."""
+        if self._flush_task is not None:
+            await self._flush_task
+            self._flush_task = None
+        return await self.flush()
+
+    def _flush_due(self) -> bool:
+        return (
+            len(self._pending) >= self.max_pending
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        )
+
+
+_pattern_aggregator: Optional[PatternAggregator] = None
+
+
+def get_pattern_aggregator() -> PatternAggregator:
+    """Get the process-wide pattern aggregator."""
+    global _pattern_aggregator
+    if _pattern_aggregator is None:
+        _pattern_aggregator = PatternAggregator()
+    return _pattern_aggregator
+
+
+async def flush_pattern_aggregator():
+    """Flush buffered statistics, if the aggregator was used (called on shutdown)."""
+    if _pattern_aggregator is not None:
+        await _pattern_aggregator.close()
@@ -0,0 +1,192 @@
+"""
+Profile Cache - Read-through cache of each user's profile and active blueprint.
+
+Assessments score against the user row and the active blueprint (whose
+profile_summary is computed once, when the blueprint is written), and both
+change rarely, so a user running several scans in a row loads them once.
+Entries are rows, so each caller gets its own model objects; the user row
+is cut down to the columns User reads, so credentials (password_hash) and
+other columns never reach the cache.
+create_blueprint / update_blueprint invalidate the user's entry.
+
+Backends:
+    memory  per-process LRU/TTL cache (default). An invalidation only
+            reaches the worker that made the change; other gunicorn
+            workers keep serving their entry until it expires, so entries
+            live just PROFILE_CACHE_MEMORY_TTL_SECONDS and a blueprint
+            change can take that long to reach every worker
+    redis   shared by all workers (redis.asyncio, so lookups never block
+            the event loop); invalidations apply everywhere and entries
+            live PROFILE_CACHE_TTL_SECONDS
+"""
+from dataclasses import fields
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+import json
+import logging
+
+from app.config import settings
+from app.models.db_models import Blueprint, User
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# (user row, active blueprint row or None)
+Snapshot = Tuple[Dict[str, Any], Optional[Dict[str, Any]]]
+
+# The only user columns cached
+USER_COLUMNS = tuple(f.name for f in fields(User))
+
+
+class ProfileCache:
+    """Interface for profile snapshot storage keyed by user id."""
+
+    async def get(self, user_id: UUID) -> Optional[Snapshot]:
+        raise NotImplementedError
+
+    async def set(self, user_id: UUID, snapshot: Snapshot):
+        raise NotImplementedError
+
+    async def invalidate(self, user_id: UUID):
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    async def close(self):
+        """Release backend connections (called on shutdown)."""
+
+    async def load(self, repos, user_id: UUID) -> Tuple[Optional[User], Optional[Blueprint]]:
+        """User and active blueprint, from the cache or one repository query."""
+        snapshot = await self.get(user_id)
+        if snapshot is None:
+            user_row, blueprint_row = await repos.users.get_with_active_blueprint(user_id)
+            if user_row is None:
+                # Not cached: the user may be created at any moment
+                return None, None
+            user_row = {column: user_row[column] for column in USER_COLUMNS if column in user_row}
+            snapshot = (user_row, blueprint_row)
+            await self.set(user_id, snapshot)
+
+        user_row, blueprint_row = snapshot
+        blueprint = Blueprint.from_dict(blueprint_row) if blueprint_row else None
+        return User.from_dict(user_row), blueprint
+
+
+class InMemoryProfileCache(ProfileCache):
+    """Process-local cache; least recently used users are evicted first."""
+
+    def __init__(self, max_entries: int, ttl_seconds: Optional[float] = None):
+        self._cache = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds, name="profiles")
+
+    async def get(self, user_id: UUID) -> Optional[Snapshot]:
+        return self._cache.get(str(user_id))
+
+    async def set(self, user_id: UUID, snapshot: Snapshot):
+        self._cache.set(str(user_id), snapshot)
+
+    async def invalidate(self, user_id: UUID):
+        self._cache.delete(str(user_id))
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+class RedisProfileCache(ProfileCache):
+    """
+    Cache backed by an async Redis-compatible client exposing awaitable
+    get/set(ex=)/delete (redis.asyncio). Redis errors are logged and treated
+    as misses, so an outage slows assessments down instead of failing them.
+    """
+
+    KEY_PREFIX = "matchiq:profile:"
+
+    def __init__(self, client, ttl_seconds: Optional[int] = None):
+        self.client = client
+        self.ttl_seconds = int(ttl_seconds) if ttl_seconds else None
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, user_id: UUID) -> Optional[Snapshot]:
+        try:
+            raw = await self.client.get(self.KEY_PREFIX + str(user_id))
+        except Exception as e:
+            logger.error(f"Error reading profile cache for {user_id}: {e}")
+            raw = None
+        if raw is None:
+            self.misses += 1
+            return None
+        try:
+            user_row, blueprint_row = json.loads(raw)
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Discarding unreadable profile cache entry for {user_id}: {e}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        return user_row, blueprint_row
+
+    async def set(self, user_id: UUID, snapshot: Snapshot):
+        try:
+            await self.client.set(
+                self.KEY_PREFIX + str(user_id),
+                json.dumps(list(snapshot), default=str),
+                ex=self.ttl_seconds
+            )
+        except Exception as e:
+            logger.error(f"Error writing profile cache for {user_id}: {e}")
+
+    async def invalidate(self, user_id: UUID):
+        try:
+            await self.client.delete(self.KEY_PREFIX + str(user_id))
+        except Exception as e:
+            # Other workers serve the old entry until its TTL runs out
+            logger.error(f"Error invalidating profile cache for {user_id}: {e}")
+
+    async def close(self):
+        await self.client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "name": "profiles",
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_profile_cache: Optional[ProfileCache] = None
+
+
+def get_profile_cache() -> ProfileCache:
+    """Get the configured process-wide profile cache."""
+    global _profile_cache
+    if _profile_cache is None:
+        _profile_cache = _create_profile_cache()
+    return _profile_cache
+
+
+async def close_profile_cache():
+    """Close the cache's connections, if it was used (called on shutdown)."""
+    global _profile_cache
+    if _profile_cache is not None:
+        await _profile_cache.close()
+        _profile_cache = None
+
+
+def _create_profile_cache() -> ProfileCache:
+    if settings.PROFILE_CACHE_BACKEND == "redis":
+        try:
+            # Connects on first use, inside the worker's event loop
+            from redis import asyncio as redis_asyncio
+            client = redis_asyncio.Redis.from_url(settings.REDIS_URL)
+            logger.info("Using Redis profile cache")
+            return RedisProfileCache(client, ttl_seconds=settings.PROFILE_CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.error(f"Redis profile cache unavailable, falling back to memory: {e}")
+
+    return InMemoryProfileCache(
+        max_entries=settings.PROFILE_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.PROFILE_CACHE_MEMORY_TTL_SECONDS
+    )
@@ -1,42 +1,83 @@
 """
 Red Flag Engine - Detects safety concerns and deal-breakers.
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
+import hashlib
+import json
 
 from app.models.db_models import Scan, Blueprint, User
+from app.services.red_flag_rules import DEFAULT_RULE_SET, RedFlagRuleSet
+from app.services.scan_features import FLAG_RATINGS, POSITIVE_RATINGS, ScanFeatures
+
+
+def compute_pattern_hash(flag: Dict[str, Any]) -> str:
+    """
+    SHA-256 hex digest of a flag's signature: severity, category, signal
+    and the sorted evidence ids. Timestamps and ordering do not affect it.
+    """
+    signature = {
+        "severity": flag.get("severity"),
+        "category": flag.get("category"),
+        "signal": flag.get("signal"),
+        "evidence": sorted(str(item) for item in flag.get("evidence") or []),
+    }
+    encoded = json.dumps(signature, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
 
 
 class RedFlagEngine:
     """Detects red flags and safety concerns in scans."""
     
+    def __init__(self, rules: Optional[RedFlagRuleSet] = None):
+        # Threshold rules; callers pass the active version's rules from
+        # get_red_flag_rule_store(), otherwise the built-in defaults apply
+        self.rules = rules or DEFAULT_RULE_SET
+    
     def detect_all(
         self,
         scan: Scan,
         blueprint: Blueprint,
-        user_profile: User
+        user_profile: User,
+        features: Optional[ScanFeatures] = None
     ) -> List[Dict[str, Any]]:
-        """Detect all types of red flags."""
+        """
+        Detect all types of red flags.
+        
+        Every flag has severity, category, signal and evidence, matching the
+        red_flags table, plus its pattern_hash. Mixed signals are not red
+        flags; use detect_inconsistencies for those.
+        """
         flags = []
+        features = features or ScanFeatures.from_scan(scan)
         
         # Check for deal-breaker violations
-        flags.extend(self._detect_deal_breaker_violations(scan, blueprint))
+        flags.extend(self._detect_deal_breaker_violations(scan, blueprint, features))
         
         # Check for safety patterns
-        flags.extend(self._detect_safety_patterns(scan))
-        
-        # Check for inconsistencies
-        flags.extend(self._detect_inconsistencies(scan))
+        flags.extend(self._detect_safety_patterns(scan, features))
         
         # Check profile alignment
         flags.extend(self._detect_profile_mismatches(scan, user_profile))
         
+        for flag in flags:
+            flag["pattern_hash"] = compute_pattern_hash(flag)
+        
         return flags
     
+    def detect_inconsistencies(
+        self,
+        scan: Scan,
+        features: Optional[ScanFeatures] = None
+    ) -> List[Dict[str, Any]]:
+        """Detect mixed signals within categories (stored as scan_results.inconsistencies)."""
+        return self._detect_inconsistencies(scan, features)
+    
     def _detect_deal_breaker_violations(
         self,
         scan: Scan,
-        blueprint: Blueprint
+        blueprint: Blueprint,
+        features: Optional[ScanFeatures] = None
     ) -> List[Dict[str, Any]]:
         """Check if scan responses violate blueprint deal-breakers."""
         flags = []
@@ -45,99 +86,56 @@ class RedFlagEngine:
             return flags
         
         deal_breakers = blueprint.profile_summary.get("deal_breakers", [])
+        if not deal_breakers:
+            return flags
+        features = features or ScanFeatures.from_scan(scan)
         
         for deal_breaker in deal_breakers:
             category = deal_breaker.get("category")
             question_id = deal_breaker.get("question_id")
             expected_response = deal_breaker.get("response")
             
-            # Find matching answer in scan
-            for answer in scan.answers:
-                if (answer.get("category") == category and 
-                    answer.get("question_id") == question_id):
-                    
-                    rating = answer.get("rating", "")
-                    # If rating is yellow-flag or red-flag, it's a violation
-                    if rating in ["yellow-flag", "red-flag"]:
-                        flags.append({
-                            "severity": "high" if rating == "red-flag" else "medium",
-                            "category": category,
-                            "signal": f"Deal-breaker violation: {expected_response}",
-                            "evidence": [question_id],
-                            "detected_at": datetime.now().isoformat()
-                        })
+            # Find matching answers in scan
+            for answer in features.by_key.get((category, question_id), ()):
+                rating = answer.get("rating", "")
+                # If rating is yellow-flag or red-flag, it's a violation
+                if rating in FLAG_RATINGS:
+                    flags.append({
+                        "severity": "high" if rating == "red-flag" else "medium",
+                        "category": category,
+                        "signal": f"Deal-breaker violation: {expected_response}",
+                        "evidence": [question_id],
+                        "detected_at": datetime.now().isoformat()
+                    })
         
         return flags
     
-    def _detect_safety_patterns(self, scan: Scan) -> List[Dict[str, Any]]:
-        """Detect safety-related red flags."""
-        flags = []
-        
-        # Count red flags in answers
-        red_flag_count = sum(
-            1 for answer in scan.answers
-            if answer.get("rating") == "red-flag"
-        )
-        
-        # If more than 3 red flags, it's a critical concern
-        if red_flag_count >= 3:
-            flags.append({
-                "severity": "critical",
-                "category": "safety",
-                "signal": f"Multiple red flags detected ({red_flag_count})",
-                "evidence": [
-                    answer.get("question_id")
-                    for answer in scan.answers
-                    if answer.get("rating") == "red-flag"
-                ],
-                "detected_at": datetime.now().isoformat()
-            })
-        
-        # Check for patterns in specific categories
-        category_flags = {}
-        for answer in scan.answers:
-            if answer.get("rating") in ["yellow-flag", "red-flag"]:
-                cat = answer.get("category", "unknown")
-                category_flags[cat] = category_flags.get(cat, 0) + 1
-        
-        # If a category has 2+ flags, it's a concern
-        for category, count in category_flags.items():
-            if count >= 2:
-                flags.append({
-                    "severity": "high",
-                    "category": category,
-                    "signal": f"Multiple concerns in {category} category",
-                    "evidence": [
-                        answer.get("question_id")
-                        for answer in scan.answers
-                        if (answer.get("category") == category and
-                            answer.get("rating") in ["yellow-flag", "red-flag"])
-                    ],
-                    "detected_at": datetime.now().isoformat()
-                })
-        
-        return flags
+    def _detect_safety_patterns(
+        self,
+        scan: Scan,
+        features: Optional[ScanFeatures] = None
+    ) -> List[Dict[str, Any]]:
+        """Detect safety-related red flags using the configured rules."""
+        features = features or ScanFeatures.from_scan(scan)
+        return self.rules.evaluate(features)
     
-    def _detect_inconsistencies(self, scan: Scan) -> List[Dict[str, Any]]:
+    def _detect_inconsistencies(
+        self,
+        scan: Scan,
+        features: Optional[ScanFeatures] = None
+    ) -> List[Dict[str, Any]]:
         """Detect inconsistent responses."""
         inconsistencies = []
-        
-        # Group answers by category
-        category_answers = {}
-        for answer in scan.answers:
-            cat = answer.get("category", "unknown")
-            if cat not in category_answers:
-                category_answers[cat] = []
-            category_answers[cat].append(answer)
+        features = features or ScanFeatures.from_scan(scan)
         
         # Check for mixed signals within categories
-        for category, answers in category_answers.items():
+        for category, answers in features.by_category.items():
             if len(answers) < 2:
                 continue
             
-            ratings = [a.get("rating", "") for a in answers]
-            has_positive = any(r in ["strong-match", "good"] for r in ratings)
-            has_negative = any(r in ["yellow-flag", "red-flag"] for r in ratings)
+            histogram = features.rating_histograms[category]
+            has_positive = any(rating in histogram for rating in POSITIVE_RATINGS)
+            has_negative = any(rating in histogram for rating in FLAG_RATINGS)
             
             if has_positive and has_negative:
                 inconsistencies.append({
@@ -0,0 +1,354 @@
+"""
+Red Flag Rules - Declarative, hot-reloadable red flag thresholds.
+
+Rules live in `ai_logic_versions.scoring_config["red_flag_rules"]` of the
+active version and are compiled into plain closures over a scan's rating
+histograms, so evaluation cost depends on the rule set, not on the answers.
+
+Rule format:
+
+    {
+        "name": "category_concerns",
+        "scope": "category",                  # "scan" or "category"
+        "when": {"count": ["yellow-flag", "red-flag"], "gte": 2},
+        "severity": "high",
+        "category": "safety",                 # scan scope only; defaults to "general"
+        "signal": "Multiple concerns in {category} category",
+        "evidence": ["yellow-flag", "red-flag"]   # optional
+    }
+
+`when` is a predicate:
+    {"count": [ratings], <op>: n}     answers in scope with one of the ratings
+    {"share": [ratings], <op>: x}     the same as a fraction of answers in scope
+    {"all": [predicates]} / {"any": [predicates]} / {"not": predicate}
+with <op> one of gte, gt, lte, lt, eq (several may be combined).
+
+Evidence lists the question ids of answers in scope whose rating is in
+`evidence`, which defaults to every rating counted by the predicate.
+Signals may use {count} (evidence answers), {total} (answers in scope)
+and {category}. Category-scope flags are emitted in the order their first
+evidence answer appears.
+"""
+from datetime import datetime
+from heapq import merge
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+import operator
+import threading
+import time
+
+from app.config import settings
+from app.database import get_supabase_client
+from app.services.scan_features import ScanFeatures
+
+logger = logging.getLogger(__name__)
+
+SCOPES = ("scan", "category")
+SEVERITIES = ("low", "medium", "high", "critical")
+_COMPARISONS = {
+    "gte": operator.ge,
+    "gt": operator.gt,
+    "lte": operator.le,
+    "lt": operator.lt,
+    "eq": operator.eq,
+}
+
+# Rules used when the active version defines none; these are the original
+# hard-coded thresholds
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    {
+        "name": "multiple_red_flags",
+        "scope": "scan",
+        "when": {"count": ["red-flag"], "gte": 3},
+        "severity": "critical",
+        "category": "safety",
+        "signal": "Multiple red flags detected ({count})",
+    },
+    {
+        "name": "category_concerns",
+        "scope": "category",
+        "when": {"count": ["yellow-flag", "red-flag"], "gte": 2},
+        "severity": "high",
+        "signal": "Multiple concerns in {category} category",
+    },
+]
+
+# (histogram, answers in scope) -> matched
+Predicate = Callable[[Dict[str, int], int], bool]
+
+
+def _compile_predicate(spec: Any, ratings: set) -> Predicate:
+    """Compile one `when` clause, collecting the ratings it counts into `ratings`."""
+    if not isinstance(spec, dict):
+        raise ValueError(f"Predicate must be an object, got {spec!r}")
+
+    if "all" in spec or "any" in spec:
+        key = "all" if "all" in spec else "any"
+        parts = spec[key]
+        if not isinstance(parts, list) or not parts:
+            raise ValueError(f"'{key}' needs a non-empty list of predicates")
+        compiled = [_compile_predicate(part, ratings) for part in parts]
+        if key == "all":
+            return lambda histogram, total: all(p(histogram, total) for p in compiled)
+        return lambda histogram, total: any(p(histogram, total) for p in compiled)
+
+    if "not" in spec:
+        # Ratings under a negation are not evidence of the flag
+        inner = _compile_predicate(spec["not"], set())
+        return lambda histogram, total: not inner(histogram, total)
+
+    kind = "count" if "count" in spec else "share" if "share" in spec else None
+    if kind is None:
+        raise ValueError(f"Unknown predicate {spec!r}")
+    counted = spec[kind]
+    if isinstance(counted, str):
+        counted = [counted]
+    if not counted:
+        raise ValueError(f"'{kind}' needs at least one rating")
+    counted = tuple(counted)
+    ratings.update(counted)
+
+    checks = []
+    for name, compare in _COMPARISONS.items():
+        if name in spec:
+            threshold = spec[name]
+            if isinstance(threshold, bool) or not isinstance(threshold, (int, float)):
+                raise ValueError(f"'{name}' must be a number, got {threshold!r}")
+            checks.append((compare, threshold))
+    if not checks:
+        raise ValueError(f"Predicate {spec!r} has no comparison")
+
+    if kind == "count":
+        def predicate(histogram: Dict[str, int], total: int) -> bool:
+            value = sum(histogram.get(rating, 0) for rating in counted)
+            return all(compare(value, threshold) for compare, threshold in checks)
+    else:
+        def predicate(histogram: Dict[str, int], total: int) -> bool:
+            if not total:
+                return False
+            value = sum(histogram.get(rating, 0) for rating in counted) / total
+            return all(compare(value, threshold) for compare, threshold in checks)
+    return predicate
+
+
+class CompiledRule:
+    """One validated rule with its predicate compiled."""
+
+    __slots__ = ("name", "scope", "predicate", "severity", "category", "signal", "evidence")
+
+    def __init__(self, spec: Dict[str, Any]):
+        if not isinstance(spec, dict):
+            raise ValueError(f"Rule must be an object, got {spec!r}")
+        self.name = spec.get("name") or "unnamed"
+        self.scope = spec.get("scope", "scan")
+        if self.scope not in SCOPES:
+            raise ValueError(f"Rule {self.name}: unknown scope {self.scope!r}")
+        self.severity = spec.get("severity", "medium")
+        if self.severity not in SEVERITIES:
+            raise ValueError(f"Rule {self.name}: unknown severity {self.severity!r}")
+        if "when" not in spec:
+            raise ValueError(f"Rule {self.name}: missing 'when'")
+        if not spec.get("signal"):
+            raise ValueError(f"Rule {self.name}: missing 'signal'")
+
+        counted: set = set()
+        self.predicate = _compile_predicate(spec["when"], counted)
+        evidence = spec.get("evidence")
+        if isinstance(evidence, str):
+            evidence = [evidence]
+        self.evidence: Tuple[str, ...] = tuple(evidence) if evidence else tuple(sorted(counted))
+        self.category = spec.get("category", "general")
+        self.signal = spec["signal"]
+        try:
+            self.signal.format(count=0, total=0, category="")
+        except (KeyError, IndexError, ValueError) as e:
+            raise ValueError(f"Rule {self.name}: bad signal template: {e}")
+
+    def _flag(self, category: Any, evidence: List[Any], total: int) -> Dict[str, Any]:
+        return {
+            "severity": self.severity,
+            "category": category,
+            "signal": self.signal.format(count=len(evidence), total=total, category=category),
+            "evidence": evidence,
+            "detected_at": datetime.now().isoformat()
+        }
+
+    def evaluate(self, features: ScanFeatures) -> List[Dict[str, Any]]:
+        if self.scope == "scan":
+            total = len(features.answers)
+            if not self.predicate(features.rating_counts, total):
+                return []
+            if len(self.evidence) == 1:
+                matched = features.by_rating.get(self.evidence[0], [])
+            else:
+                evidence = set(self.evidence)
+                matched = [a for a in features.answers if a.get("rating", "neutral") in evidence]
+            return [self._flag(self.category, [a.get("question_id") for a in matched], total)]
+
+        fired = []
+        for category, histogram in features.rating_histograms.items():
+            total = len(features.by_category[category])
+            if not self.predicate(histogram, total):
+                continue
+            by_rating = features.rating_positions[category]
+            positions = list(merge(*(by_rating.get(r, []) for r in self.evidence)))
+            fired.append((positions[0] if positions else len(features.answers), category, positions, total))
+
+        fired.sort(key=lambda item: item[0])
+        answers = features.answers
+        return [
+            self._flag(category, [answers[p].get("question_id") for p in positions], total)
+            for _, category, positions, total in fired
+        ]
+
+
+class RedFlagRuleSet:
+    """An ordered, compiled rule set; flags come out in rule order."""
+
+    def __init__(self, rules: List[Dict[str, Any]], version: Optional[str] = None):
+        self.config = rules
+        self.version = version
+        self.rules = [CompiledRule(spec) for spec in rules]
+
+    def evaluate(self, features: ScanFeatures) -> List[Dict[str, Any]]:
+        flags = []
+        for rule in self.rules:
+            flags.extend(rule.evaluate(features))
+        return flags
+
+    @classmethod
+    def from_scoring_config(
+        cls,
+        scoring_config: Optional[Dict[str, Any]],
+        version: Optional[str] = None
+    ) -> "RedFlagRuleSet":
+        """Build from an ai_logic_versions.scoring_config; defaults when it has no rules."""
+        rules = (scoring_config or {}).get("red_flag_rules")
+        if rules is None:
+            return cls(DEFAULT_RULES, version)
+        if not isinstance(rules, list):
+            raise ValueError("red_flag_rules must be a list")
+        return cls(rules, version)
+
+
+DEFAULT_RULE_SET = RedFlagRuleSet(DEFAULT_RULES)
+
+
+class RedFlagRuleStore:
+    """
+    Process-local cache of the rule set of the active `ai_logic_versions` row.
+
+    The active version is checked at most once every `refresh_interval`
+    seconds; when it changes, the new rules are compiled and swapped in
+    with a single reference assignment, so in-flight evaluations keep the
+    rule set they started with. Invalid configs are logged and the previous
+    rule set stays in use. Request handlers use `snapshot()`, which never
+    waits for the database: a due check runs on a background thread.
+    For the same reason, and because the rules are preloaded in the gunicorn
+    master before fork, the store reads over the sync REST client rather
+    than the loop-bound async repositories.
+    """
+
+    def __init__(self, supabase=None, refresh_interval: Optional[float] = None):
+        self._supabase = supabase
+        self.refresh_interval = (
+            settings.RED_FLAG_RULES_REFRESH_SECONDS
+            if refresh_interval is None else refresh_interval
+        )
+        self._rule_set = DEFAULT_RULE_SET
+        self._watermark: Optional[Tuple[Optional[str], Optional[str]]] = None
+        self._last_checked: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._refreshing_lock = threading.Lock()
+
+    @property
+    def supabase(self):
+        # Not pinned, so a worker forked after preloading uses its own client
+        if self._supabase is None:
+            return get_supabase_client()
+        return self._supabase
+
+    def current(self) -> RedFlagRuleSet:
+        """Return the active rule set, refreshing it first if due."""
+        self.ensure_fresh()
+        return self._rule_set
+
+    def snapshot(self) -> RedFlagRuleSet:
+        """Return the loaded rule set at once; a due refresh runs in the background."""
+        if self._due():
+            self._refresh_in_background()
+        return self._rule_set
+
+    def ensure_fresh(self, force: bool = False):
+        """Reload the rules if a different ai_logic_versions row became active."""
+        if not force and not self._due():
+            return
+
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            if not force and not self._due():
+                return
+
+            try:
+                row = self._fetch_active_version()
+                watermark = (row.get("version"), row.get("activated_at")) if row else (None, None)
+                if force or watermark != self._watermark:
+                    if row:
+                        rule_set = RedFlagRuleSet.from_scoring_config(
+                            row.get("scoring_config"), row.get("version")
+                        )
+                    else:
+                        rule_set = DEFAULT_RULE_SET
+                    self._rule_set = rule_set
+                    self._watermark = watermark
+                    logger.info(
+                        f"Loaded {len(rule_set.rules)} red flag rules "
+                        f"from ai_logic_version {rule_set.version or 'default'}"
+                    )
+            except Exception as e:
+                # Keep serving the previous rule set if the refresh fails
+                logger.error(f"Error refreshing red flag rules: {e}")
+            finally:
+                self._last_checked = time.monotonic()
+
+    def invalidate(self):
+        """Force a version check on the next lookup."""
+        self._last_checked = None
+
+    def _refresh_in_background(self):
+        with self._refreshing_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def refresh():
+            try:
+                self.ensure_fresh()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=refresh, name="red-flag-rules-refresh", daemon=True).start()
+
+    def _due(self) -> bool:
+        return self._last_checked is None or time.monotonic() - self._last_checked >= self.refresh_interval
+
+    def _fetch_active_version(self) -> Optional[Dict[str, Any]]:
+        response = self.supabase.table("ai_logic_versions") \
+            .select("version,scoring_config,activated_at") \
+            .eq("is_active", True) \
+            .order("activated_at", desc=True) \
+            .limit(1) \
+            .execute()
+        return response.data[0] if response.data else None
+
+
+_rule_store: Optional[RedFlagRuleStore] = None
+
+
+def get_red_flag_rule_store() -> RedFlagRuleStore:
+    """Get the process-wide red flag rule store."""
+    global _rule_store
+    if _rule_store is None:
+        _rule_store = RedFlagRuleStore()
+    return _rule_store
@@ -0,0 +1,47 @@
+"""
+Red Flag Store - Builds red_flags rows from RedFlagEngine output.
+Rows carry the flag's pattern_hash, so repeated patterns are deduplicated
+per scan and countable with an indexed query. RedFlagRepository.save
+writes them.
+"""
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from app.services.red_flag_engine import compute_pattern_hash
+
+# Column limits from migrations/001_create_tables.sql
+_SEVERITY_MAX = 20
+_CATEGORY_MAX = 50
+
+
+def build_red_flag_rows(
+    flags: List[Dict[str, Any]],
+    scan_id: UUID,
+    user_id: UUID,
+    scan_result_id: Optional[UUID] = None
+) -> List[Dict[str, Any]]:
+    """Convert engine flags into red_flags rows, one per distinct pattern."""
+    rows = []
+    seen = set()
+    for flag in flags:
+        pattern_hash = flag.get("pattern_hash") or compute_pattern_hash(flag)
+        if pattern_hash in seen:
+            continue
+        seen.add(pattern_hash)
+
+        row = {
+            "scan_id": str(scan_id),
+            "user_id": str(user_id),
+            "severity": str(flag.get("severity") or "medium")[:_SEVERITY_MAX],
+            "category": str(flag.get("category") or "general")[:_CATEGORY_MAX],
+            "signal": str(flag.get("signal") or ""),
+            "evidence": [str(item) for item in flag.get("evidence") or []],
+            "pattern_hash": pattern_hash,
+        }
+        if scan_result_id:
+            row["scan_result_id"] = str(scan_result_id)
+        if flag.get("detected_at"):
+            row["detected_at"] = flag["detected_at"]
+        rows.append(row)
+    return rows
+
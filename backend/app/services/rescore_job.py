@@ -0,0 +1,279 @@
+"""
+Rescore Job - Recompute scan_results after an AI version or weight change.
+Streams completed scans in keyset-paginated pages, scores each page with
+ScoringEngine.score_batch and RedFlagEngine (optionally in worker
+processes), and upserts the results in bulk with a resumable checkpoint.
+All reads and writes go through the async repositories on one event loop;
+only the red flag rules come from RedFlagRuleStore, which reads them over
+the sync REST client (see red_flag_rules).
+"""
+from collections import deque
+import asyncio
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import json
+import logging
+import os
+import time
+
+from app.database import close_async_rest_client
+from app.models.db_models import Blueprint, Scan, User
+from app.repositories import Repositories, close_repositories, get_repositories
+from app.services.red_flag_engine import RedFlagEngine
+from app.services.red_flag_rules import RedFlagRuleSet, RedFlagRuleStore
+from app.services.red_flag_store import build_red_flag_rows
+from app.services.scan_features import ScanFeatures
+from app.services.scoring_engine import ScoringEngine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 500
+
+
+def score_page(
+    ai_version: str,
+    scan_rows: List[Dict[str, Any]],
+    blueprint_rows: List[Dict[str, Any]],
+    user_rows: List[Dict[str, Any]],
+    red_flag_rules: Optional[List[Dict[str, Any]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Score one page of aligned scan / blueprint / user rows.
+    Module-level and row-in, row-out so it can run in a worker process;
+    `red_flag_rules` is the raw rule config, compiled here.
+    """
+    scans = [Scan.from_dict(row) for row in scan_rows]
+    blueprints = [Blueprint.from_dict(row) for row in blueprint_rows]
+    users = [User.from_dict(row) for row in user_rows]
+
+    results = ScoringEngine(ai_version=ai_version).score_batch(scans, blueprints)
+    flag_engine = RedFlagEngine(
+        rules=RedFlagRuleSet(red_flag_rules) if red_flag_rules is not None else None
+    )
+    rows = []
+    for scan, blueprint, user, result in zip(scans, blueprints, users, results):
+        features = ScanFeatures.from_scan(scan)
+        result.red_flags = flag_engine.detect_all(scan, blueprint, user, features)
+        result.inconsistencies = flag_engine.detect_inconsistencies(scan, features)
+        rows.append(result.to_dict())
+    return rows
+
+
+@dataclass
+class RescoreStats:
+    """Progress counters, persisted with the checkpoint."""
+    pages: int = 0
+    scanned: int = 0
+    rescored: int = 0
+    skipped_current: int = 0
+    skipped_missing: int = 0  # no active blueprint or user row
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rescored / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+@dataclass
+class _Page:
+    last_scan_id: str
+    rows: int
+    existing_ids: Dict[str, str] = field(default_factory=dict)
+    user_ids: Dict[str, str] = field(default_factory=dict)
+    # Counted into the stats only once the page is written
+    skipped_current: int = 0
+    skipped_missing: int = 0
+
+
+class RescoreJob:
+    """
+    Resumable bulk rescoring of completed scans.
+
+    Scans are read in `id` order (keyset pagination, no OFFSET). For each
+    page, active blueprints, users and the latest existing result per scan
+    are loaded with batched `in` filters. Scans whose latest result is
+    already on `ai_version` are skipped unless `force` is set. New results
+    reuse the existing result id, so the upsert replaces it in place.
+
+    Each page's red flags are re-saved to the red_flags table with the
+    results: patterns already stored for a scan are kept as they are, so
+    acknowledgements survive a rescore, and unacknowledged patterns the new
+    scoring no longer produces are deleted.
+
+    The checkpoint records the last scan id whose page has been written,
+    so an interrupted run resumes from the next page.
+    """
+
+    def __init__(
+        self,
+        ai_version: str,
+        repositories: Optional[Repositories] = None,
+        rule_store: Optional[RedFlagRuleStore] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        workers: int = 0,
+        checkpoint_path: Optional[str] = None,
+        force: bool = False,
+        dry_run: bool = False
+    ):
+        # Without repositories the job uses (and on exit closes) the process-wide ones
+        self.repos = repositories
+        self.rule_store = rule_store or RedFlagRuleStore()
+        self.ai_version = ai_version
+        self.page_size = max(1, page_size)
+        self.workers = max(0, workers)
+        self.checkpoint_path = checkpoint_path
+        self.force = force
+        self.dry_run = dry_run
+        self.last_scan_id: Optional[str] = None
+        self.stats = RescoreStats()
+        self._load_checkpoint()
+
+    def run(self, max_pages: Optional[int] = None) -> RescoreStats:
+        """Rescore until all scans are processed or `max_pages` pages are written."""
+        red_flag_rules = self.rule_store.current().config
+        return asyncio.run(self._run(max_pages, red_flag_rules))
+
+    async def _run(self, max_pages: Optional[int], red_flag_rules: List[Dict[str, Any]]) -> RescoreStats:
+        started = time.monotonic() - self.stats.elapsed_seconds
+        owns_repositories = self.repos is None
+        if owns_repositories:
+            self.repos = get_repositories()
+        executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers else None
+        # Pages in flight, written strictly in order so the checkpoint never skips one
+        pending: Deque[Tuple[_Page, Future]] = deque()
+        cursor = self.last_scan_id
+        pages_started = 0
+
+        try:
+            while max_pages is None or pages_started < max_pages:
+                scan_rows = await self.repos.scans.page_completed(cursor, self.page_size)
+                if not scan_rows:
+                    break
+                cursor = scan_rows[-1]["id"]
+                pages_started += 1
+
+                page, work = await self._prepare_page(scan_rows)
+                if executor is not None:
+                    future = executor.submit(score_page, self.ai_version, *work, red_flag_rules)
+                else:
+                    future = Future()
+                    future.set_result(score_page(self.ai_version, *work, red_flag_rules))
+                pending.append((page, future))
+
+                while pending and (len(pending) > self.workers or pending[0][1].done()):
+                    await self._write_page(*pending.popleft(), started)
+
+            while pending:
+                await self._write_page(*pending.popleft(), started)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+            if owns_repositories:
+                # The job owns the process, as the app lifespan does for the server
+                await close_repositories()
+                await close_async_rest_client()
+                self.repos = None
+
+        return self.stats
+
+    async def _prepare_page(self, scan_rows: List[Dict[str, Any]]) -> Tuple[_Page, Tuple[list, list, list]]:
+        scan_ids = [row["id"] for row in scan_rows]
+        user_ids = list({row["user_id"] for row in scan_rows})
+
+        existing = await self._fetch_latest_results(scan_ids)
+        blueprints = {
+            row["user_id"]: row
+            for row in await self.repos.blueprints.list_active_for_users(user_ids)
+        }
+        users = {row["id"]: row for row in await self.repos.users.list_by_ids(user_ids)}
+
+        page = _Page(last_scan_id=scan_ids[-1], rows=len(scan_rows))
+        work_scans, work_blueprints, work_users = [], [], []
+        for row in scan_rows:
+            previous = existing.get(row["id"])
+            if previous and previous["ai_version"] == self.ai_version and not self.force:
+                page.skipped_current += 1
+                continue
+            blueprint = blueprints.get(row["user_id"])
+            user = users.get(row["user_id"])
+            if blueprint is None or user is None:
+                page.skipped_missing += 1
+                continue
+            if previous:
+                page.existing_ids[row["id"]] = previous["id"]
+            page.user_ids[row["id"]] = row["user_id"]
+            work_scans.append(row)
+            work_blueprints.append(blueprint)
+            work_users.append(user)
+
+        return page, (work_scans, work_blueprints, work_users)
+
+    async def _write_page(self, page: _Page, future: Future, started: float):
+        rows = await asyncio.wrap_future(future)
+        for row in rows:
+            existing_id = page.existing_ids.get(row["scan_id"])
+            if existing_id:
+                row["id"] = existing_id
+
+        if rows and not self.dry_run:
+            await self.repos.scan_results.upsert(rows)
+            # After the results, which the flag rows reference
+            flag_rows, keep = [], {}
+            for row in rows:
+                scan_flags = build_red_flag_rows(
+                    row["red_flags"], row["scan_id"], page.user_ids[row["scan_id"]], row["id"]
+                )
+                flag_rows.extend(scan_flags)
+                keep[row["scan_id"]] = [flag_row["pattern_hash"] for flag_row in scan_flags]
+            await self.repos.red_flags.save(flag_rows)
+            await self.repos.red_flags.prune(keep)
+
+        self.stats.pages += 1
+        self.stats.scanned += page.rows
+        self.stats.rescored += len(rows)
+        self.stats.skipped_current += page.skipped_current
+        self.stats.skipped_missing += page.skipped_missing
+        self.stats.elapsed_seconds = time.monotonic() - started
+        self.last_scan_id = page.last_scan_id
+        self._save_checkpoint()
+
+        logger.info(
+            f"Rescore page {self.stats.pages}: {len(rows)}/{page.rows} rescored, "
+            f"{self.stats.rescored} total, {self.stats.rows_per_second:.0f} rows/s"
+        )
+
+    async def _fetch_latest_results(self, scan_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        latest: Dict[str, Dict[str, Any]] = {}
+        for row in await self.repos.scan_results.list_versions_for_scans(scan_ids):
+            current = latest.get(row["scan_id"])
+            if current is None or (row.get("created_at") or "") > (current.get("created_at") or ""):
+                latest[row["scan_id"]] = row
+        return latest
+
+    def _load_checkpoint(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return
+        with open(self.checkpoint_path) as f:
+            data = json.load(f)
+        if data.get("ai_version") != self.ai_version:
+            logger.warning(
+                f"Ignoring checkpoint for ai_version {data.get('ai_version')}, "
+                f"rescoring to {self.ai_version}"
+            )
+            return
+        self.last_scan_id = data.get("last_scan_id")
+        self.stats = RescoreStats(**data.get("stats", {}))
+        logger.info(f"Resuming rescore after scan {self.last_scan_id}")
+
+    def _save_checkpoint(self):
+        if not self.checkpoint_path or self.dry_run:
+            return
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "ai_version": self.ai_version,
+                "last_scan_id": self.last_scan_id,
+                "stats": asdict(self.stats),
+            }, f)
+        os.replace(tmp_path, self.checkpoint_path)
@@ -0,0 +1,112 @@
+"""
+Scan Features - Per-scan answer features shared by the assessment pipeline.
+Computed once per scan and consumed by ScoringEngine, RedFlagEngine and the
+assessments API instead of each regrouping scan.answers on its own.
+"""
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+from app.models.db_models import Scan
+
+
+# Rating to numeric score mapping
+RATING_SCORES = {
+    'strong-match': 100,
+    'good': 75,
+    'neutral': 50,
+    'yellow-flag': 25,
+    'red-flag': 0
+}
+# Score for ratings missing from RATING_SCORES
+DEFAULT_RATING_SCORE = 50
+
+POSITIVE_RATINGS = ("strong-match", "good")
+FLAG_RATINGS = ("yellow-flag", "red-flag")
+
+
+class ScanFeatures:
+    """
+    Answer groupings and rating statistics for one scan, built in a single
+    pass. Lists keep the original answer order and dicts keep categories
+    in first-appearance order.
+
+    Answers without a category are grouped under "unknown"; answers
+    without a rating count as "neutral" in the rating histograms.
+    """
+
+    __slots__ = (
+        "answers",
+        "by_key",
+        "by_category",
+        "by_rating",
+        "rating_histograms",
+        "rating_positions",
+        "flagged_question_ids",
+        "_rating_vector",
+    )
+
+    def __init__(self, answers: List[Dict[str, Any]]):
+        self.answers = answers
+        # (category, question_id) -> answers, raw values as used for deal-breaker matching
+        self.by_key: Dict[tuple, List[Dict[str, Any]]] = {}
+        # category -> answers
+        self.by_category: Dict[Any, List[Dict[str, Any]]] = {}
+        # rating -> answers
+        self.by_rating: Dict[Any, List[Dict[str, Any]]] = {}
+        # category -> rating -> count
+        self.rating_histograms: Dict[Any, Dict[str, int]] = {}
+        # category -> rating -> answer positions, ascending
+        self.rating_positions: Dict[Any, Dict[str, List[int]]] = {}
+        self.flagged_question_ids: List[Any] = []
+        self._rating_vector: Optional[np.ndarray] = None
+
+        for position, answer in enumerate(answers):
+            category = answer.get("category", "unknown")
+            rating = answer.get("rating", "neutral")
+
+            self.by_key.setdefault((answer.get("category"), answer.get("question_id")), []).append(answer)
+            self.by_category.setdefault(category, []).append(answer)
+            self.by_rating.setdefault(rating, []).append(answer)
+
+            histogram = self.rating_histograms.setdefault(category, {})
+            histogram[rating] = histogram.get(rating, 0) + 1
+            self.rating_positions.setdefault(category, {}).setdefault(rating, []).append(position)
+
+            if rating in FLAG_RATINGS:
+                self.flagged_question_ids.append(answer.get("question_id"))
+
+    @classmethod
+    def from_scan(cls, scan: Scan) -> "ScanFeatures":
+        return cls(scan.answers)
+
+    @property
+    def categories(self) -> List[Any]:
+        """Answered categories in first-appearance order."""
+        return list(self.by_category)
+
+    @property
+    def rating_counts(self) -> Dict[Any, int]:
+        """Scan-wide rating histogram."""
+        return {rating: len(answers) for rating, answers in self.by_rating.items()}
+
+    @property
+    def rating_vector(self) -> np.ndarray:
+        """Numeric score of every answer, in answer order (computed on first use)."""
+        if self._rating_vector is None:
+            self._rating_vector = np.array(
+                [
+                    RATING_SCORES.get(answer.get("rating", "neutral"), DEFAULT_RATING_SCORE)
+                    for answer in self.answers
+                ],
+                dtype=np.int64
+            )
+        return self._rating_vector
+
+    def category_score_totals(self, category: Any) -> tuple:
+        """(sum of rating scores, answer count) for one category."""
+        total = 0
+        count = 0
+        for rating, n in self.rating_histograms.get(category, {}).items():
+            total += RATING_SCORES.get(rating, DEFAULT_RATING_SCORE) * n
+            count += n
+        return total, count
@@ -2,21 +2,38 @@
 Scoring Engine - Calculates compatibility scores based on scan responses.
 Deterministic, transparent, and explainable scoring logic.
 """
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Sequence
 from uuid import uuid4
 from datetime import datetime
+from array import array
+from itertools import chain
+import numpy as np
 
 from app.models.db_models import Scan, Blueprint, User, ScanResult
+from app.services.scan_features import DEFAULT_RATING_SCORE, RATING_SCORES, ScanFeatures
 
 
-# Rating to numeric score mapping
-RATING_SCORES = {
-    'strong-match': 100,
-    'good': 75,
-    'neutral': 50,
-    'yellow-flag': 25,
-    'red-flag': 0
-}
+# Compact rating codes for batch scoring; unknown ratings score DEFAULT_RATING_SCORE
+RATING_CODES = {rating: code for code, rating in enumerate(RATING_SCORES)}
+UNKNOWN_RATING_CODE = len(RATING_SCORES)
+_CODE_SCORES = np.array(list(RATING_SCORES.values()) + [DEFAULT_RATING_SCORE], dtype=np.int64)
+
+# Lower bounds of each classification, highest first
+CATEGORY_THRESHOLDS = (
+    (80, "high-potential"),
+    (65, "worth-exploring"),
+    (50, "mixed-signals"),
+    (35, "caution"),
+)
+LOWEST_CATEGORY = "high-risk"
+
+
+class _IdMap(dict):
+    """Assigns consecutive integer ids to keys on first lookup."""
+    
+    def __missing__(self, key):
+        value = self[key] = len(self)
+        return value
 
 
 class ScoringEngine:
@@ -29,16 +46,20 @@ class ScoringEngine:
         self,
         scan: Scan,
         blueprint: Blueprint,
-        user_profile: User
+        user_profile: User,
+        features: Optional[ScanFeatures] = None
     ) -> ScanResult:
         """
         Process a scan and calculate compatibility scores.
         
+        Args:
+            features: Precomputed ScanFeatures for the scan, if the caller has them
+        
         Returns:
             ScanResult with calculated scores and analysis
         """
         # Calculate category scores
-        category_scores = self._calculate_category_scores(scan, blueprint)
+        category_scores = self._calculate_category_scores(scan, blueprint, features)
         
         # Calculate overall score (weighted average)
         overall_score = self._calculate_overall_score(category_scores, blueprint)
@@ -46,6 +67,129 @@ class ScoringEngine:
         # Determine category classification
         category = self._classify_category(overall_score, category_scores)
         
+        return self._build_result(scan, blueprint, category_scores, overall_score, category)
+    
+    def score_batch(
+        self,
+        scans: Sequence[Scan],
+        blueprints: Sequence[Blueprint]
+    ) -> List[ScanResult]:
+        """
+        Score many scans at once; blueprints[i] is the blueprint for scans[i].
+        
+        Answers are read once into category ids and int8 rating codes; category
+        means, weighted overall scores and classifications for the whole batch
+        then come out of a few NumPy operations. Results are identical to
+        calling process_scan on each scan in turn.
+        """
+        if len(scans) != len(blueprints):
+            raise ValueError("scans and blueprints must have the same length")
+        if not scans:
+            return []
+        
+        # Encode every answer as (category id, int8 rating code); per scan,
+        # remember category ids in first-appearance order, which is the dict
+        # order of _calculate_category_scores
+        n = len(scans)
+        category_ids = _IdMap()
+        rating_code = RATING_CODES.get
+        category_codes = array("q")
+        rating_codes = array("b")
+        lengths = []
+        scan_slots: List[List[int]] = []
+        for scan in scans:
+            answers = scan.answers
+            ids = [category_ids[answer.get("category", "unknown")] for answer in answers]
+            category_codes.extend(ids)
+            rating_codes.extend([rating_code(answer.get("rating", "neutral"), UNKNOWN_RATING_CODE) for answer in answers])
+            lengths.append(len(ids))
+            scan_slots.append(list(dict.fromkeys(ids)))
+        
+        # Sum and count ratings per (scan, category id); categories are a
+        # small fixed vocabulary so this table stays n x a handful of columns
+        n_ids = max(1, len(category_ids))
+        rows = np.repeat(np.arange(n, dtype=np.int64), lengths)
+        cells = rows * n_ids + np.frombuffer(category_codes, dtype=np.int64)
+        scores = _CODE_SCORES[np.frombuffer(rating_codes, dtype=np.int8)]
+        sums = np.bincount(cells, weights=scores, minlength=n * n_ids)
+        counts = np.bincount(cells, minlength=n * n_ids)
+        
+        # Gather into slot order: column j of row i is scan i's j-th category
+        per_scan = [len(slots) for slots in scan_slots]
+        width = max(1, max(per_scan))
+        slot_ids = np.frombuffer(array("q", chain.from_iterable(scan_slots)), dtype=np.int64)
+        slot_rows = np.repeat(np.arange(n, dtype=np.int64), per_scan)
+        starts = np.cumsum(per_scan) - per_scan
+        positions = slot_rows * width + (np.arange(len(slot_ids), dtype=np.int64) - starts[slot_rows])
+        source = slot_rows * n_ids + slot_ids
+        
+        # Category score = int(mean); ratings are non-negative so truncation is a floor
+        category_matrix = np.zeros(n * width, dtype=np.int64)
+        category_matrix[positions] = (sums[source] / counts[source]).astype(np.int64)
+        category_matrix = category_matrix.reshape(n, width)
+        n_categories = np.array(per_scan, dtype=np.int64)
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            equal_overall = np.where(
+                n_categories > 0,
+                category_matrix.sum(axis=1) / np.maximum(n_categories, 1),
+                0.0
+            )
+        
+        weighted = []
+        weight_positions: List[int] = []
+        weight_values: List[float] = []
+        categories = list(category_ids)
+        scan_categories = [[categories[cat_id] for cat_id in slots] for slots in scan_slots]
+        for i, (cats, blueprint) in enumerate(zip(scan_categories, blueprints)):
+            category_weights = blueprint.profile_summary.get("category_weights") if blueprint.profile_summary else None
+            weighted.append(bool(category_weights))
+            if category_weights and cats:
+                default_weight = 1.0 / len(cats)
+                weight_positions.extend(range(i * width, i * width + len(cats)))
+                weight_values.extend([float(category_weights.get(cat, default_weight)) for cat in cats])
+        weight_matrix = np.zeros(n * width, dtype=np.float64)
+        weight_matrix[weight_positions] = weight_values
+        weight_matrix = weight_matrix.reshape(n, width)
+        
+        # Accumulate column by column so floating-point sums match the
+        # sequential per-scan loop exactly
+        weighted_sum = np.zeros(n, dtype=np.float64)
+        total_weight = np.zeros(n, dtype=np.float64)
+        for j in range(width):
+            weighted_sum += category_matrix[:, j] * weight_matrix[:, j]
+            total_weight += weight_matrix[:, j]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weighted_overall = np.where(total_weight == 0, 0.0, weighted_sum / total_weight)
+        
+        overall = np.where(np.array(weighted, dtype=bool), weighted_overall, equal_overall)
+        classification = np.select(
+            [overall >= threshold for threshold, _ in CATEGORY_THRESHOLDS],
+            [label for _, label in CATEGORY_THRESHOLDS],
+            default=LOWEST_CATEGORY
+        )
+        
+        return [
+            self._build_result(scan, blueprint, dict(zip(cats, row)), overall_score, category)
+            for scan, blueprint, cats, row, overall_score, category in zip(
+                scans,
+                blueprints,
+                scan_categories,
+                category_matrix.tolist(),
+                overall.tolist(),
+                classification.tolist()
+            )
+        ]
+    
+    def _build_result(
+        self,
+        scan: Scan,
+        blueprint: Blueprint,
+        category_scores: Dict[str, int],
+        overall_score: float,
+        category: str
+    ) -> ScanResult:
+        """Assemble the ScanResult shared by process_scan and score_batch."""
         # Generate AI analysis
         ai_analysis = self._generate_ai_analysis(
             overall_score,
@@ -81,35 +225,16 @@ class ScoringEngine:
     def _calculate_category_scores(
         self,
         scan: Scan,
-        blueprint: Blueprint
+        blueprint: Blueprint,
+        features: Optional[ScanFeatures] = None
     ) -> Dict[str, int]:
         """Calculate score for each category."""
         category_scores = {}
+        features = features or ScanFeatures.from_scan(scan)
         
-        # Group scan answers by category
-        category_answers = {}
-        for answer in scan.answers:
-            cat = answer.get("category", "unknown")
-            if cat not in category_answers:
-                category_answers[cat] = []
-            category_answers[cat].append(answer)
-        
-        # Calculate score for each category
-        for category, answers in category_answers.items():
-            if not answers:
-                category_scores[category] = 0
-                continue
-            
-            total_score = 0
-            count = 0
-            
-            for answer in answers:
-                rating = answer.get("rating", "neutral")
-                score = RATING_SCORES.get(rating, 50)
-                total_score += score
-                count += 1
-            
-            # Average score for category
+        # Average rating score per category, from the rating histograms
+        for category in features.rating_histograms:
+            total_score, count = features.category_score_totals(category)
             avg_score = total_score / count if count > 0 else 0
             category_scores[category] = int(avg_score)
         
@@ -155,16 +280,10 @@ class ScoringEngine:
         category_scores: Dict[str, int]
     ) -> str:
         """Classify the relationship category based on scores."""
-        if overall_score >= 80:
-            return "high-potential"
-        elif overall_score >= 65:
-            return "worth-exploring"
-        elif overall_score >= 50:
-            return "mixed-signals"
-        elif overall_score >= 35:
-            return "caution"
-        else:
-            return "high-risk"
+        for threshold, label in CATEGORY_THRESHOLDS:
+            if overall_score >= threshold:
+                return label
+        return LOWEST_CATEGORY
     
     def _generate_ai_analysis(
         self,
@@ -0,0 +1,110 @@
+"""
+Session Store - Shared, bounded storage for Amora conversation state.
+In-memory LRU/TTL backend by default; Redis backend for multi-worker deployments.
+"""
+from typing import Optional
+import logging
+import struct
+
+from app.config import settings
+from app.services.conversation_state import ConversationState
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore:
+    """Interface for conversation state storage keyed by session id."""
+
+    def get(self, key: str) -> Optional[ConversationState]:
+        raise NotImplementedError
+
+    def set(self, key: str, state: ConversationState):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local store; least recently active sessions are evicted first."""
+
+    def __init__(self, max_sessions: int, ttl_seconds: Optional[float] = None):
+        self._cache = TTLCache(max_entries=max_sessions, ttl_seconds=ttl_seconds, name="sessions")
+
+    def get(self, key: str) -> Optional[ConversationState]:
+        return self._cache.get(key)
+
+    def set(self, key: str, state: ConversationState):
+        self._cache.set(key, state)
+
+    def delete(self, key: str):
+        self._cache.delete(key)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def stats(self):
+        return self._cache.stats()
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Store backed by any Redis-compatible client exposing get/set(ex=)/delete.
+    States are stored in ConversationState's binary encoding and every
+    write refreshes the session TTL.
+    """
+
+    KEY_PREFIX = "amora:session:"
+
+    def __init__(self, client, ttl_seconds: Optional[int] = None):
+        self.client = client
+        self.ttl_seconds = int(ttl_seconds) if ttl_seconds else None
+
+    def get(self, key: str) -> Optional[ConversationState]:
+        raw = self.client.get(self.KEY_PREFIX + key)
+        if raw is None:
+            return None
+        try:
+            return ConversationState.from_bytes(raw)
+        except (ValueError, TypeError, IndexError, struct.error) as e:
+            logger.warning(f"Discarding unreadable session {key}: {e}")
+            return None
+
+    def set(self, key: str, state: ConversationState):
+        self.client.set(
+            self.KEY_PREFIX + key,
+            state.to_bytes(),
+            ex=self.ttl_seconds
+        )
+
+    def delete(self, key: str):
+        self.client.delete(self.KEY_PREFIX + key)
+
+
+_session_store: Optional[SessionStore] = None
+
+
+def get_session_store() -> SessionStore:
+    """Get the configured process-wide session store."""
+    global _session_store
+    if _session_store is None:
+        _session_store = _create_session_store()
+    return _session_store
+
+
+def _create_session_store() -> SessionStore:
+    if settings.SESSION_STORE_BACKEND == "redis":
+        try:
+            import redis
+            client = redis.Redis.from_url(settings.REDIS_URL)
+            client.ping()
+            logger.info("Using Redis session store")
+            return RedisSessionStore(client, ttl_seconds=settings.CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.error(f"Redis session store unavailable, falling back to memory: {e}")
+
+    return InMemorySessionStore(
+        max_sessions=settings.SESSION_STORE_MAX_SESSIONS,
+        ttl_seconds=settings.CACHE_TTL_SECONDS
+    )
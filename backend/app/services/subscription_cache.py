@@ -0,0 +1,92 @@
+"""
+Subscription Cache - Short-lived cache of users' premium entitlement.
+
+The coach checks the subscription on every chat message; caching the
+answer per user takes that database round trip off the hot path. Premium
+answers are kept for SUBSCRIPTION_CACHE_TTL_SECONDS. Non-premium answers,
+unknown users and failed lookups are cached too (negative caching) for
+SUBSCRIPTION_CACHE_NEGATIVE_TTL_SECONDS, so upgrades show up quickly.
+
+Nothing in this service changes users.subscription_status; whatever does
+(billing webhooks, admin tools) should call invalidate_subscription() to
+apply the change at once. That reaches the calling process only; other
+workers see it when their entry expires.
+"""
+from typing import Any, Dict, Optional
+from uuid import UUID
+import logging
+
+from app.config import settings
+from app.repositories import UserRepository, get_repositories
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriptionCache:
+    """Cached premium lookups keyed by user id."""
+
+    def __init__(
+        self,
+        users: Optional[UserRepository] = None,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        negative_ttl_seconds: Optional[float] = None
+    ):
+        self._users = users
+        max_entries = settings.SUBSCRIPTION_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.ttl_seconds = settings.SUBSCRIPTION_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.negative_ttl_seconds = (
+            settings.SUBSCRIPTION_CACHE_NEGATIVE_TTL_SECONDS
+            if negative_ttl_seconds is None else negative_ttl_seconds
+        )
+        self._cache = TTLCache(max_entries, self.ttl_seconds, name="subscriptions")
+
+    @property
+    def users(self) -> UserRepository:
+        if self._users is None:
+            self._users = get_repositories().users
+        return self._users
+
+    async def is_premium(self, user_id: UUID) -> bool:
+        key = str(user_id)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        premium = await self._lookup(user_id)
+        ttl = self.ttl_seconds if premium else self.negative_ttl_seconds
+        if ttl > 0:  # TTLCache reads 0 as "no expiry"; here it means "don't cache"
+            self._cache.set(key, premium, ttl_seconds=ttl)
+        return premium
+
+    async def _lookup(self, user_id: UUID) -> bool:
+        try:
+            return await self.users.get_subscription_status(user_id) == "premium"
+        except Exception as e:
+            logger.error(f"Error checking subscription: {e}")
+            return False
+
+    def invalidate(self, user_id: UUID):
+        """Drop a user's cached entitlement, e.g. after a plan change."""
+        self._cache.delete(str(user_id))
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+_subscription_cache: Optional[SubscriptionCache] = None
+
+
+def get_subscription_cache() -> SubscriptionCache:
+    """Get the process-wide subscription cache."""
+    global _subscription_cache
+    if _subscription_cache is None:
+        _subscription_cache = SubscriptionCache()
+    return _subscription_cache
+
+
+def invalidate_subscription(user_id: UUID):
+    """Drop a user's cached entitlement after their subscription_status changed."""
+    if _subscription_cache is not None:
+        _subscription_cache.invalidate(user_id)
@@ -0,0 +1,215 @@
+"""
+Template Index - Process-local vector index over active Amora templates.
+Loads templates once into pre-normalized matrices and answers similarity
+queries with a single matrix-vector product per request.
+"""
+from typing import Dict, Any, Optional, List, Tuple
+import json
+import logging
+import threading
+import time
+
+import numpy as np
+
+from app.config import settings
+from app.database import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+CONFIDENCE_LEVELS = ("LOW", "MEDIUM", "HIGH")
+
+
+class _Partition:
+    """Templates for one confidence level with a row-normalized embedding matrix."""
+
+    __slots__ = ("templates", "matrix")
+
+    def __init__(self, templates: List[Dict[str, Any]], matrix: np.ndarray):
+        self.templates = templates
+        self.matrix = matrix
+
+
+class TemplateIndex:
+    """
+    In-memory index of active `amora_templates` rows partitioned by confidence level.
+
+    The index is rebuilt only when the table watermark (latest `updated_at`
+    plus active row count) changes, and the watermark itself is checked at
+    most once every `refresh_interval` seconds. Reads use the sync REST
+    client rather than the async repositories: the index is built in the
+    gunicorn master before fork and queried from the coach's executor
+    threads, where no event loop is available.
+    """
+
+    def __init__(self, supabase=None, refresh_interval: Optional[float] = None):
+        self._supabase = supabase
+        self.refresh_interval = (
+            settings.TEMPLATE_INDEX_REFRESH_SECONDS
+            if refresh_interval is None else refresh_interval
+        )
+        self._partitions: Dict[str, _Partition] = {}
+        self._watermark: Optional[Tuple[Optional[str], int]] = None
+        self._last_checked = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def supabase(self):
+        # Not pinned, so a worker forked after preloading uses its own client
+        if self._supabase is None:
+            return get_supabase_client()
+        return self._supabase
+
+    def top_k(
+        self,
+        confidence_level: str,
+        query_embedding: np.ndarray,
+        k: int = 1
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Return up to k (template, cosine similarity) pairs, best first.
+        Only templates with positive similarity are returned.
+        """
+        self.ensure_fresh()
+        partition = self._partitions.get(confidence_level)
+        if partition is None or not partition.templates:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        if query.shape[0] != partition.matrix.shape[1]:
+            logger.warning(
+                f"Query embedding has {query.shape[0]} dims, index has {partition.matrix.shape[1]}"
+            )
+            return []
+
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+
+        scores = partition.matrix @ (query / norm)
+
+        k = min(k, scores.shape[0])
+        if k == 1:
+            candidates = [int(np.argmax(scores))]
+        else:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+            candidates = sorted(candidates, key=lambda i: -scores[i])
+
+        return [
+            (partition.templates[i], float(scores[i]))
+            for i in candidates
+            if scores[i] > 0
+        ]
+
+    def ensure_fresh(self, force: bool = False):
+        """Reload the index if the table watermark moved since the last load."""
+        now = time.monotonic()
+        if not force and self._watermark is not None and now - self._last_checked < self.refresh_interval:
+            return
+
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            if not force and self._watermark is not None and time.monotonic() - self._last_checked < self.refresh_interval:
+                return
+
+            try:
+                watermark = self._fetch_watermark()
+                if force or watermark != self._watermark:
+                    self._load(watermark)
+            except Exception as e:
+                # Keep serving the previous snapshot if the refresh fails
+                logger.error(f"Error refreshing template index: {e}")
+            finally:
+                self._last_checked = time.monotonic()
+
+    def invalidate(self):
+        """Force a watermark check on the next query."""
+        self._last_checked = 0.0
+        self._watermark = None
+
+    def _fetch_watermark(self) -> Tuple[Optional[str], int]:
+        """Latest updated_at among active templates plus the active row count."""
+        response = self.supabase.table("amora_templates") \
+            .select("updated_at", count="exact") \
+            .eq("active", True) \
+            .order("updated_at", desc=True) \
+            .limit(1) \
+            .execute()
+
+        latest = response.data[0].get("updated_at") if response.data else None
+        return latest, response.count or 0
+
+    def _load(self, watermark: Tuple[Optional[str], int]):
+        """Fetch all active templates and rebuild the per-level matrices."""
+        response = self.supabase.table("amora_templates") \
+            .select("*") \
+            .eq("active", True) \
+            .execute()
+
+        self._partitions = self.build_partitions(response.data or [])
+        self._watermark = watermark
+        logger.info(
+            "Loaded template index: "
+            + ", ".join(f"{level}={len(p.templates)}" for level, p in self._partitions.items())
+        )
+
+    @staticmethod
+    def build_partitions(rows: List[Dict[str, Any]]) -> Dict[str, _Partition]:
+        """Group rows by confidence level into row-normalized float32 matrices."""
+        grouped: Dict[str, Tuple[List[Dict[str, Any]], List[np.ndarray]]] = {}
+
+        for row in rows:
+            embedding = _parse_embedding(row.get("embedding"))
+            if embedding is None:
+                continue
+
+            norm = np.linalg.norm(embedding)
+            if norm == 0:
+                continue
+
+            templates, vectors = grouped.setdefault(row.get("confidence_level"), ([], []))
+            templates.append(row)
+            vectors.append(embedding / norm)
+
+        partitions = {}
+        for level, (templates, vectors) in grouped.items():
+            dims = {v.shape[0] for v in vectors}
+            if len(dims) > 1:
+                logger.warning(f"Mixed embedding sizes for {level} templates: {sorted(dims)}")
+                dim = max(dims, key=lambda d: sum(1 for v in vectors if v.shape[0] == d))
+                keep = [i for i, v in enumerate(vectors) if v.shape[0] == dim]
+                templates = [templates[i] for i in keep]
+                vectors = [vectors[i] for i in keep]
+
+            partitions[level] = _Partition(
+                templates,
+                np.ascontiguousarray(np.vstack(vectors), dtype=np.float32)
+            )
+
+        return partitions
+
+
+def _parse_embedding(value: Any) -> Optional[np.ndarray]:
+    """Parse a pgvector column, returned by PostgREST as a list or a '[...]' string."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None
+
+    embedding = np.asarray(value, dtype=np.float32).ravel()
+    if embedding.size == 0:
+        return None
+    return embedding
+
+
+_template_index: Optional[TemplateIndex] = None
+
+
+def get_template_index() -> TemplateIndex:
+    """Get the process-wide template index."""
+    global _template_index
+    if _template_index is None:
+        _template_index = TemplateIndex()
+    return _template_index
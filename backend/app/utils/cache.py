@@ -0,0 +1,133 @@
+"""In-process caching utilities."""
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+import threading
+import time
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with per-entry TTL and optional byte budget.
+
+    Entries are evicted least-recently-used first when either `max_entries`
+    or `max_bytes` is exceeded. `None` is a valid cached value, so callers
+    can use the cache for negative lookups.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+        name: str = "cache"
+    ):
+        self.name = name
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds if ttl_seconds and ttl_seconds > 0 else None
+        self.max_bytes = max_bytes if max_bytes and max_bytes > 0 else None
+        self._sizeof = sizeof or (lambda value: 0)
+
+        # key -> (value, expires_at, size)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or `default` on a miss or expired entry."""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at, size = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return False
+            expires_at = entry[1]
+            return expires_at is None or expires_at > time.monotonic()
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        """Store a value, optionally overriding the default TTL for this entry."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl else None
+        size = self._sizeof(value)
+
+        with self._lock:
+            previous = self._entries.pop(key, _MISSING)
+            if previous is not _MISSING:
+                self._bytes -= previous[2]
+
+            if self.max_bytes is not None and size > self.max_bytes:
+                # Never cache a single entry larger than the whole budget
+                return
+
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            self._evict()
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove a key. Returns True if it was cached."""
+        with self._lock:
+            entry = self._entries.pop(key, _MISSING)
+            if entry is _MISSING:
+                return False
+            self._bytes -= entry[2]
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _evict(self):
+        """Drop least-recently-used entries until within limits. Caller holds the lock."""
+        while self._entries and (
+            len(self._entries) > self.max_entries or
+            (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
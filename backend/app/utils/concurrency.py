@@ -0,0 +1,77 @@
+"""Helpers for running blocking work from async request handlers."""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+import asyncio
+import functools
+import logging
+import threading
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when a bounded executor has no free worker or queue slot."""
+
+
+class BoundedExecutor:
+    """
+    Thread pool with a hard cap on in-flight work.
+
+    At most `max_workers` calls run at once and at most `queue_depth` more
+    wait for a worker; anything beyond that is rejected immediately with
+    ExecutorSaturatedError instead of piling up behind slow requests.
+    """
+
+    def __init__(self, max_workers: int, queue_depth: int, name: str = "executor"):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.queue_depth = max(0, queue_depth)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix=name
+        )
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.queue_depth)
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run `fn(*args, **kwargs)` on the pool and await its result."""
+        if not self._slots.acquire(blocking=False):
+            raise ExecutorSaturatedError(f"{self.name} is at capacity")
+
+        try:
+            future = self._executor.submit(functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self._slots.release()
+            raise
+
+        # Release the slot when the work actually finishes, even if the
+        # awaiting request is cancelled first
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_coach_executor: Optional[BoundedExecutor] = None
+
+
+def get_coach_executor() -> BoundedExecutor:
+    """Get the executor for CPU-bound coach inference."""
+    global _coach_executor
+    if _coach_executor is None:
+        _coach_executor = BoundedExecutor(
+            max_workers=settings.COACH_EXECUTOR_MAX_WORKERS,
+            queue_depth=settings.COACH_EXECUTOR_QUEUE_DEPTH,
+            name="coach"
+        )
+    return _coach_executor
+
+
+def shutdown_executors():
+    """Stop executor threads on application shutdown."""
+    global _coach_executor
+    if _coach_executor is not None:
+        _coach_executor.shutdown(wait=False)
+        _coach_executor = None
@@ -0,0 +1,73 @@
+"""
+Precompiled keyword matcher for rule-based signal detection.
+
+A table of label -> keywords is compiled once into a single regex whose
+alternation is factored into a prefix trie. One left-to-right scan finds
+every position where some keyword starts (each search resumes one
+character after the previous match start, so overlapping keywords are
+not skipped); since the longest keyword at a position wins and every
+shorter keyword matching there is a prefix of it, each hit is expanded
+to the labels of all its prefixes.
+The result is exactly the set of labels for which
+`any(keyword in text for keyword in keywords)` holds.
+"""
+from typing import Dict, FrozenSet, Hashable, Iterable, Mapping, Set
+import re
+
+
+def _trie_pattern(node: Dict[str, dict]) -> str:
+    terminal = "" in node
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    if len(branches) == 1:
+        return f"(?:{branches[0]})?" if terminal else branches[0]
+    body = "(?:" + "|".join(branches) + ")"
+    return body + "?" if terminal else body
+
+
+class KeywordMatcher:
+    """Match many literal keywords against a text in one pass."""
+
+    def __init__(self, table: Mapping[Hashable, Iterable[str]]):
+        labels_by_keyword: Dict[str, Set[Hashable]] = {}
+        for label, keywords in table.items():
+            for keyword in keywords:
+                if not keyword:
+                    raise ValueError(f"Empty keyword for label {label!r}")
+                labels_by_keyword.setdefault(keyword, set()).add(label)
+
+        # A match on a keyword implies a match on every keyword that is a prefix of it
+        self._labels: Dict[str, FrozenSet[Hashable]] = {}
+        for keyword in labels_by_keyword:
+            labels = set()
+            for i in range(1, len(keyword) + 1):
+                labels |= labels_by_keyword.get(keyword[:i], set())
+            self._labels[keyword] = frozenset(labels)
+
+        self.labels = frozenset(label for labels in self._labels.values() for label in labels)
+
+        trie: Dict[str, dict] = {}
+        for keyword in labels_by_keyword:
+            node = trie
+            for ch in keyword:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+        # No lookahead wrapper: it would disable the engine's first-character prefilter
+        self._pattern = re.compile(_trie_pattern(trie)) if trie else None
+
+    def match(self, text: str) -> Set[Hashable]:
+        """Return the labels with at least one keyword occurring in `text`."""
+        hits: Set[Hashable] = set()
+        if self._pattern is None:
+            return hits
+        search = self._pattern.search
+        total = len(self.labels)
+        pos = 0
+        while len(hits) < total:
+            m = search(text, pos)
+            if m is None:
+                break
+            hits |= self._labels[m.group()]
+            pos = m.start() + 1
+        return hits
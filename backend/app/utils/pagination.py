@@ -0,0 +1,68 @@
+"""Keyset (cursor) pagination over (created_at, id), newest first."""
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+from uuid import UUID
+import base64
+import json
+
+Cursor = Tuple[str, str]
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def row_cursor(row: Dict[str, Any], column: str = "created_at") -> Cursor:
+    """(sort value, id) of a row."""
+    return str(row[column]), str(row["id"])
+
+
+def encode_cursor(row: Dict[str, Any], column: str = "created_at") -> str:
+    """Opaque cursor pointing just past `row`."""
+    raw = json.dumps(list(row_cursor(row, column)), separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """(sort value, id) from a cursor; ValueError if it was not produced by encode_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, row_id = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    # Both parts end up inside a PostgREST filter, so accept only the
+    # shapes encode_cursor produces: an ISO timestamp and a UUID
+    try:
+        datetime.fromisoformat(value)
+        row_id = str(UUID(row_id))
+    except (ValueError, TypeError, AttributeError) as e:
+        raise ValueError("Invalid cursor") from e
+    return value, row_id
+
+
+def next_cursor(rows: List[Dict[str, Any]], limit: int, column: str = "created_at") -> Optional[str]:
+    """Cursor for the following page, or None when this page was the last."""
+    if not rows or len(rows) < limit:
+        return None
+    return encode_cursor(rows[-1], column)
+
+
+def paginate(query, limit: int, after: Optional[Cursor] = None, column: str = "created_at"):
+    """
+    Order a PostgREST query by (column, id) descending and restrict it to the
+    page after the decoded cursor `after`. Both keys go in a single `order`
+    parameter, since PostgREST keeps only one per resource.
+    """
+    if after:
+        value, row_id = after
+        value = json.dumps(value)  # quoted: timestamps contain reserved characters
+        query = _or(query, f"{column}.lt.{value},and({column}.eq.{value},id.lt.{row_id})")
+    query.params = query.params.add("order", f"{column}.desc,id.desc")
+    return query.limit(limit)
+
+
+def _or(query, filters: str):
+    # postgrest-py only grew or_() after 0.13; set the parameter directly there
+    if hasattr(query, "or_"):
+        return query.or_(filters)
+    query.params = query.params.add("or", f"({filters})")
+    return query
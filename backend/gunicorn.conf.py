@@ -0,0 +1,45 @@
+"""
+Production server: gunicorn master with uvicorn workers.
+
+Run with: gunicorn app.main:app -c gunicorn.conf.py
+
+The app and its read-only state (embedding model, template index, red flag
+rules) are loaded once in the master and shared copy-on-write by the
+forked workers. Set WEB_CONCURRENCY to choose the worker count.
+
+Per-process caches are not shared between workers: with more than one
+worker, set PROFILE_CACHE_BACKEND=redis, or accept that a blueprint change
+can take PROFILE_CACHE_MEMORY_TTL_SECONDS to reach every worker.
+"""
+import multiprocessing
+import os
+
+from app.config import settings
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = settings.WEB_CONCURRENCY or multiprocessing.cpu_count()
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import the app in the master so workers inherit it
+preload_app = True
+
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"
+
+
+def when_ready(server):
+    from app.preload import preload
+    preload()
+    if workers > 1 and settings.PROFILE_CACHE_BACKEND != "redis":
+        server.log.warning(
+            f"{workers} workers with the in-memory profile cache: blueprint changes "
+            f"reach other workers within {settings.PROFILE_CACHE_MEMORY_TTL_SECONDS}s"
+        )
+
+
+def post_fork(server, worker):
+    from app.preload import reset_after_fork
+    reset_after_fork()
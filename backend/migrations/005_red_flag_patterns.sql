@@ -0,0 +1,18 @@
+-- Red flag rows written by the API
+-- Run this in your Supabase SQL Editor
+
+-- Drop duplicate (scan, pattern) rows before adding the unique index
+DELETE FROM red_flags a
+USING red_flags b
+WHERE a.scan_id = b.scan_id
+  AND a.pattern_hash = b.pattern_hash
+  AND a.ctid > b.ctid;
+
+-- One row per pattern per scan; bulk inserts upsert on this with ignore-duplicates
+CREATE UNIQUE INDEX IF NOT EXISTS idx_red_flags_scan_pattern ON red_flags(scan_id, pattern_hash);
+
+-- Allow users to record red flags for their own scans
+DROP POLICY IF EXISTS "Users can insert own red flags" ON red_flags;
+CREATE POLICY "Users can insert own red flags" ON red_flags
+    FOR INSERT
+    WITH CHECK (auth.uid()::text = user_id::text);
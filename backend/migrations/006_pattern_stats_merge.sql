@@ -0,0 +1,81 @@
+-- Incremental pattern_knowledge_base statistics
+-- Run this in your Supabase SQL Editor
+
+-- Exact running state for merging batches; avg_score / score_std_dev /
+-- flag_rate stay as the readable summaries
+ALTER TABLE pattern_knowledge_base ADD COLUMN IF NOT EXISTS score_m2 DOUBLE PRECISION DEFAULT 0;
+ALTER TABLE pattern_knowledge_base ADD COLUMN IF NOT EXISTS flag_count INTEGER DEFAULT 0;
+
+-- Merge a batch of per-pattern statistics (Chan's parallel mean/variance).
+-- batch: [{pattern_hash, pattern_type, pattern_data, occurrence_count,
+--          avg_score, score_m2, flag_count, avg_confidence, outcome_distribution}]
+CREATE OR REPLACE FUNCTION merge_pattern_stats(batch JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    item JSONB;
+    existing pattern_knowledge_base%ROWTYPE;
+    n_a DOUBLE PRECISION;
+    n_b DOUBLE PRECISION;
+    mean_a DOUBLE PRECISION;
+    mean_b DOUBLE PRECISION;
+    delta DOUBLE PRECISION;
+    total DOUBLE PRECISION;
+    m2 DOUBLE PRECISION;
+    flags INTEGER;
+    outcomes JSONB;
+    merged INTEGER := 0;
+BEGIN
+    FOR item IN SELECT * FROM jsonb_array_elements(batch) LOOP
+        INSERT INTO pattern_knowledge_base (pattern_hash, pattern_type, pattern_data, occurrence_count, score_m2, flag_count)
+        VALUES (item->>'pattern_hash', item->>'pattern_type', item->'pattern_data', 0, 0, 0)
+        ON CONFLICT (pattern_hash) DO NOTHING;
+
+        SELECT * INTO existing FROM pattern_knowledge_base
+        WHERE pattern_hash = item->>'pattern_hash'
+        FOR UPDATE;
+
+        n_a := COALESCE(existing.occurrence_count, 0);
+        mean_a := COALESCE(existing.avg_score, 0);
+        n_b := (item->>'occurrence_count')::DOUBLE PRECISION;
+        mean_b := (item->>'avg_score')::DOUBLE PRECISION;
+        total := n_a + n_b;
+        IF n_b <= 0 THEN
+            CONTINUE;
+        END IF;
+
+        delta := mean_b - mean_a;
+        m2 := COALESCE(existing.score_m2, 0) + (item->>'score_m2')::DOUBLE PRECISION
+            + delta * delta * n_a * n_b / total;
+        flags := COALESCE(existing.flag_count, 0) + (item->>'flag_count')::INTEGER;
+
+        SELECT COALESCE(jsonb_object_agg(key, count), '{}'::JSONB) INTO outcomes
+        FROM (
+            SELECT key, SUM(value::INTEGER) AS count
+            FROM (
+                SELECT * FROM jsonb_each_text(COALESCE(existing.outcome_distribution, '{}'::JSONB))
+                UNION ALL
+                SELECT * FROM jsonb_each_text(COALESCE(item->'outcome_distribution', '{}'::JSONB))
+            ) AS combined
+            GROUP BY key
+        ) AS summed;
+
+        UPDATE pattern_knowledge_base SET
+            occurrence_count = total,
+            avg_score = mean_a + delta * n_b / total,
+            score_m2 = m2,
+            score_std_dev = CASE WHEN total > 1 THEN sqrt(m2 / (total - 1)) ELSE 0 END,
+            flag_count = flags,
+            flag_rate = flags / total,
+            avg_confidence = COALESCE(existing.avg_confidence, 0)
+                + ((item->>'avg_confidence')::DOUBLE PRECISION - COALESCE(existing.avg_confidence, 0)) * n_b / total,
+            outcome_distribution = outcomes,
+            last_seen_at = NOW()
+        WHERE pattern_hash = item->>'pattern_hash';
+
+        merged := merged + 1;
+    END LOOP;
+    RETURN merged;
+END;
+$$;
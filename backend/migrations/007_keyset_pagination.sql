@@ -0,0 +1,11 @@
+-- Keyset pagination for assessment and result listings
+-- Run this in your Supabase SQL Editor
+
+-- Lists page with ORDER BY created_at DESC, id DESC and a (created_at, id)
+-- cursor. idx_scans_created orders all scans but still has to skip other
+-- users' rows; leading with user_id lets each page stop after LIMIT rows.
+CREATE INDEX IF NOT EXISTS idx_scans_user_created ON scans(user_id, created_at DESC, id DESC);
+
+-- Results are joined to scans for the owner filter and paged on their own
+-- (created_at, id)
+CREATE INDEX IF NOT EXISTS idx_scan_results_created ON scan_results(created_at DESC, id DESC);
@@ -0,0 +1,42 @@
+-- Create a scan and its result in one transaction (one round trip from the API)
+-- Run this in your Supabase SQL Editor
+
+-- scan / result: row objects shaped like the API's inserts. The result's
+-- scan_id is taken from the new scan. Returns {"scan": {...}, "result": {...}}.
+CREATE OR REPLACE FUNCTION create_scan_with_result(scan JSONB, result JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    new_scan scans%ROWTYPE;
+    new_result scan_results%ROWTYPE;
+BEGIN
+    INSERT INTO scans (
+        id, user_id, scan_type, person_name, interaction_type, answers,
+        reflection_notes, categories_completed, status,
+        dual_scan_session_id, dual_scan_role, partner_scan_id, is_unified
+    )
+    SELECT
+        COALESCE(s.id, gen_random_uuid()), s.user_id, s.scan_type, s.person_name,
+        s.interaction_type, COALESCE(s.answers, '[]'::jsonb), s.reflection_notes,
+        s.categories_completed, COALESCE(s.status, 'in_progress'),
+        s.dual_scan_session_id, s.dual_scan_role, s.partner_scan_id,
+        COALESCE(s.is_unified, FALSE)
+    FROM jsonb_populate_record(NULL::scans, scan) AS s
+    RETURNING * INTO new_scan;
+
+    INSERT INTO scan_results (
+        id, scan_id, ai_version, overall_score, category, category_scores,
+        ai_analysis, red_flags, inconsistencies, profile_mismatches, explanation_metadata
+    )
+    SELECT
+        COALESCE(r.id, gen_random_uuid()), new_scan.id, r.ai_version, r.overall_score,
+        r.category, r.category_scores, r.ai_analysis,
+        COALESCE(r.red_flags, '[]'::jsonb), COALESCE(r.inconsistencies, '[]'::jsonb),
+        COALESCE(r.profile_mismatches, '[]'::jsonb), r.explanation_metadata
+    FROM jsonb_populate_record(NULL::scan_results, result) AS r
+    RETURNING * INTO new_result;
+
+    RETURN jsonb_build_object('scan', to_jsonb(new_scan), 'result', to_jsonb(new_result));
+END;
+$$;
@@ -0,0 +1,55 @@
+"""
+Recompute scan_results for completed scans after AI_VERSION or scoring weights change.
+Safe to interrupt: progress is checkpointed after every page and the next run resumes.
+
+Usage:
+    python scripts/rescore_scan_results.py --workers 4
+    python scripts/rescore_scan_results.py --ai-version 1.1.0 --force --restart
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+
+from app.config import settings
+from app.services.rescore_job import DEFAULT_PAGE_SIZE, RescoreJob
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk re-score scan_results")
+    parser.add_argument("--ai-version", default=settings.AI_VERSION, help="Target ai_version (default: settings.AI_VERSION)")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="Scans per page")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Scoring worker processes (0 = inline)")
+    parser.add_argument("--checkpoint", default=".rescore_checkpoint.json", help="Checkpoint file path")
+    parser.add_argument("--restart", action="store_true", help="Ignore any existing checkpoint")
+    parser.add_argument("--force", action="store_true", help="Rescore scans already on the target ai_version")
+    parser.add_argument("--max-pages", type=int, default=None, help="Stop after this many pages")
+    parser.add_argument("--dry-run", action="store_true", help="Score without writing results or checkpoints")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    job = RescoreJob(
+        ai_version=args.ai_version,
+        page_size=args.page_size,
+        workers=args.workers,
+        checkpoint_path=args.checkpoint,
+        force=args.force,
+        dry_run=args.dry_run
+    )
+    stats = job.run(max_pages=args.max_pages)
+
+    print(
+        f"\n✅ Rescored {stats.rescored} of {stats.scanned} scans "
+        f"({stats.skipped_current} already current, {stats.skipped_missing} missing blueprint/user) "
+        f"in {stats.elapsed_seconds:.1f}s, {stats.rows_per_second:.0f} rows/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
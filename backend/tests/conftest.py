@@ -0,0 +1,363 @@
+"""
+Shared test fixtures.
+"""
+from types import SimpleNamespace
+from typing import Any, Dict, List
+import copy
+import json
+import uuid
+
+import pytest
+
+
+def _split_columns(columns: str) -> List[str]:
+    """Split a select list on top-level commas."""
+    parts, depth, current = [], 0, ""
+    for char in columns:
+        if char == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+            continue
+        depth += (char == "(") - (char == ")")
+        current += char
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+_OPERATORS = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "lt": lambda a, b: a is not None and a < b,
+    "lte": lambda a, b: a is not None and a <= b,
+    "gt": lambda a, b: a is not None and a > b,
+    "gte": lambda a, b: a is not None and a >= b,
+}
+
+
+def _parse_logic(expression: str):
+    """Predicate for a PostgREST logic tree such as "a.lt.1,and(a.eq.1,id.lt.x)"."""
+    terms = []
+    for term in _split_columns(expression):
+        if term.startswith(("and(", "or(")):
+            combine, inner = term[:-1].split("(", 1)
+            terms.append((combine, _parse_logic(inner)))
+            continue
+        column, operator, value = term.split(".", 2)
+        if value.startswith('"'):
+            value = json.loads(value)
+        terms.append(("term", (column, _OPERATORS[operator], value)))
+
+    def predicate(row, combine="or"):
+        results = []
+        for kind, spec in terms:
+            if kind == "term":
+                column, compare, value = spec
+                results.append(compare(row.get(column), value))
+            else:
+                results.append(spec(row, kind))
+        return any(results) if combine == "or" else all(results)
+    return predicate
+
+
+class FakeParams:
+    """Query parameters set directly on the builder ("order", "or")."""
+
+    def __init__(self, query: "FakeQuery"):
+        self.query = query
+
+    def add(self, key: str, value: str) -> "FakeParams":
+        if key == "order":
+            for term in value.split(","):
+                column, _, direction = term.partition(".")
+                self.query.orders.append((column, direction.startswith("desc")))
+        elif key == "or":
+            self.query.filters.append(_parse_logic(value[1:-1]))
+        else:
+            raise NotImplementedError(key)
+        return self
+
+
+class FakeQuery:
+    """Subset of the postgrest query builder used by the app, over in-memory rows."""
+
+    def __init__(self, client: "FakeSupabaseClient", table: str):
+        self.client = client
+        self.table = table
+        self.filters = []
+        self.orders = []
+        self.limit_count = None
+        self.offset_count = 0
+        self.embedded_filters = {}
+        self.embedded_limits = {}
+        self.params = FakeParams(self)
+        self.columns = "*"
+        self.count = None
+        self.action = "select"
+        self.payload = None
+        self.on_conflict = "id"
+        self.ignore_duplicates = False
+        self.single_row = False
+
+    # Query construction
+
+    def select(self, columns: str = "*", count=None):
+        self.columns = columns
+        self.count = count
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, lambda a: a == value)
+
+    def neq(self, column, value):
+        return self._filter(column, lambda a: a != value)
+
+    def gt(self, column, value):
+        return self._filter(column, lambda a: a is not None and a > value)
+
+    def gte(self, column, value):
+        return self._filter(column, lambda a: a is not None and a >= value)
+
+    def lt(self, column, value):
+        return self._filter(column, lambda a: a is not None and a < value)
+
+    def lte(self, column, value):
+        return self._filter(column, lambda a: a is not None and a <= value)
+
+    def is_(self, column, value):
+        expected = None if value == "null" else value
+        return self._filter(column, lambda a: a is expected if expected is None else a == expected)
+
+    def in_(self, column, values):
+        values = set(values)
+        return self._filter(column, lambda a: a in values)
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, count, foreign_table=None):
+        if foreign_table:
+            self.embedded_limits[foreign_table] = count
+        else:
+            self.limit_count = count
+        return self
+
+    def offset(self, count):
+        self.offset_count = count
+        return self
+
+    def range(self, start, end):
+        self.offset_count = start
+        self.limit_count = end - start + 1
+        return self
+
+    def single(self):
+        self.single_row = True
+        return self
+
+    def insert(self, rows):
+        self.action = "insert"
+        self.payload = rows
+        return self
+
+    def upsert(self, rows, on_conflict="id", ignore_duplicates=False):
+        self.action = "upsert"
+        self.payload = rows
+        self.on_conflict = on_conflict
+        self.ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, values):
+        self.action = "update"
+        self.payload = values
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    # Execution
+
+    def execute(self):
+        self.client.calls.append((self.table, self.action))
+        rows = self.client.tables.setdefault(self.table, [])
+        if self.action in ("insert", "upsert"):
+            return SimpleNamespace(data=self._write(self.payload), count=None)
+        matched = [row for row in rows if all(f(row) for f in self.filters)]
+        if self.action == "update":
+            for row in matched:
+                row.update(self.payload)
+            return SimpleNamespace(data=copy.deepcopy(matched), count=None)
+        if self.action == "delete":
+            self.client.tables[self.table] = [row for row in rows if row not in matched]
+            return SimpleNamespace(data=copy.deepcopy(matched), count=None)
+
+        total = len(matched)
+        for column, desc in reversed(self.orders):
+            matched.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        matched = matched[self.offset_count:]
+        if self.limit_count is not None:
+            matched = matched[:self.limit_count]
+        data = [self._project(row) for row in matched]
+        if self.single_row:
+            if len(data) != 1:
+                # postgrest answers 406 when single() does not match exactly one row
+                raise ValueError("JSON object requested, multiple (or no) rows returned")
+            data = data[0]
+        return SimpleNamespace(data=data, count=total if self.count else None)
+
+    def _filter(self, column: str, compare):
+        """
+        A filter on "table.column" narrows the embedded rows, as in PostgREST,
+        unless the resource is embedded with !inner, which filters the parent.
+        """
+        name = column.split(".", 1)[0]
+        if "." in column and f"{name}!inner(" not in self.columns.replace(" ", ""):
+            field = column.split(".", 1)[1]
+            self.embedded_filters.setdefault(name, []).append(lambda row: compare(row.get(field)))
+        else:
+            self.filters.append(lambda row: compare(self._value(row, column)))
+        return self
+
+    def _value(self, row: Dict[str, Any], column: str) -> Any:
+        """Column value; "table.column" reads through an embedded resource."""
+        if "." not in column:
+            return row.get(column)
+        name, field = column.split(".", 1)
+        embedded = self.client.project(self.table, row, f"{name}({field})")[name]
+        if isinstance(embedded, list):
+            embedded = embedded[0] if embedded else None
+        return None if embedded is None else embedded.get(field)
+
+    def _write(self, payload) -> List[Dict[str, Any]]:
+        rows = self.client.tables[self.table]
+        written = []
+        keys = [key.strip() for key in self.on_conflict.split(",")]
+        for item in payload if isinstance(payload, list) else [payload]:
+            item = copy.deepcopy(item)
+            item.setdefault("id", str(uuid.uuid4()))
+            existing = None
+            if self.action == "upsert":
+                existing = next(
+                    (row for row in rows if all(row.get(k) == item.get(k) for k in keys)),
+                    None
+                )
+            if existing is not None:
+                if self.ignore_duplicates:
+                    continue
+                existing.update(item)
+                written.append(copy.deepcopy(existing))
+            else:
+                rows.append(item)
+                written.append(copy.deepcopy(item))
+        return written
+
+    def _project(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        projected = self.client.project(self.table, row, self.columns)
+        for name, value in projected.items():
+            if isinstance(value, list) and name in self.embedded_filters:
+                value = [child for child in value if all(f(child) for f in self.embedded_filters[name])]
+            if isinstance(value, list) and name in self.embedded_limits:
+                value = value[:self.embedded_limits[name]]
+            projected[name] = value
+        return projected
+
+
+class FakeSupabaseClient:
+    """In-memory stand-in for supabase.Client; tables are lists of row dicts."""
+
+    def __init__(self, tables: Dict[str, List[Dict[str, Any]]] = None):
+        self.tables = tables or {}
+        self.calls = []
+        self.rpc_calls = []
+        self.rpc_error = None
+        self.rpc_handlers = {}
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def project(self, table: str, row: Dict[str, Any], columns: str) -> Dict[str, Any]:
+        """
+        Apply a select list, including embedded resources such as
+        "id, scan_results(*)". Relations follow the `<singular table>_id`
+        foreign key convention: a row holding `scan_id` embeds one `scans`
+        row, a `scans` row embeds the list of rows that point back at it.
+        """
+        projected = {}
+        for column in _split_columns(columns):
+            if "(" not in column:
+                if column == "*":
+                    projected.update(copy.deepcopy(row))
+                else:
+                    projected[column] = copy.deepcopy(row.get(column))
+                continue
+            name, inner = column[:-1].split("(", 1)
+            name = name.split("!")[0].strip()
+            children = self.tables.get(name, [])
+            foreign_key = name[:-1] + "_id"
+            if foreign_key in row:
+                parent = next((child for child in children if child.get("id") == row[foreign_key]), None)
+                projected[name] = None if parent is None else self.project(name, parent, inner)
+            else:
+                back_key = table[:-1] + "_id"
+                projected[name] = [
+                    self.project(name, child, inner)
+                    for child in children if child.get(back_key) == row.get("id")
+                ]
+        return projected
+
+    def rpc(self, name: str, params: Dict[str, Any] = None):
+        """
+        Record the call; tests inspect `rpc_calls` or set `rpc_error`, and may
+        register a Python version of the function in `rpc_handlers`.
+        """
+        def execute():
+            self.calls.append((name, "rpc"))
+            if self.rpc_error is not None:
+                raise self.rpc_error
+            self.rpc_calls.append((name, copy.deepcopy(params)))
+            handler = self.rpc_handlers.get(name)
+            data = handler(self, **copy.deepcopy(params or {})) if handler else None
+            return SimpleNamespace(data=data, count=None)
+        return SimpleNamespace(execute=execute)
+
+
+class AsyncFakeClient:
+    """Async facade over FakeSupabaseClient, like the async PostgREST client."""
+
+    def __init__(self, fake: FakeSupabaseClient):
+        self.fake = fake
+
+    def table(self, name: str) -> FakeQuery:
+        query = self.fake.table(name)
+        execute = query.execute
+
+        async def async_execute():
+            return execute()
+        query.execute = async_execute
+        return query
+
+    def rpc(self, name: str, params: Dict[str, Any] = None):
+        call = self.fake.rpc(name, params)
+
+        async def async_execute():
+            return call.execute()
+        return SimpleNamespace(execute=async_execute)
+
+
+@pytest.fixture
+def fake_supabase():
+    return FakeSupabaseClient()
+
+
+@pytest.fixture
+def async_fake_supabase(fake_supabase):
+    return AsyncFakeClient(fake_supabase)
+
+
+@pytest.fixture
+def fake_repositories(async_fake_supabase):
+    """REST repositories over the fake client."""
+    from app.repositories.rest import RestRepositories
+    return RestRepositories(async_fake_supabase)
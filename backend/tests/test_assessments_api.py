@@ -0,0 +1,118 @@
+"""
+Tests for assessment creation.
+Run with: pytest backend/tests/test_assessments_api.py -v
+"""
+import asyncio
+from types import SimpleNamespace
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import assessments
+from app.models.pydantic_models import CreateScanRequest
+from app.services.dual_scan_session import DualScanSessionService
+from app.services.profile_cache import InMemoryProfileCache
+from app.services.red_flag_rules import RedFlagRuleStore
+
+
+def create_scan_with_result(client, scan, result):
+    """Python version of migrations/008_create_scan_with_result.sql."""
+    scan_row = client.table("scans").insert(scan).execute().data[0]
+    result_row = client.table("scan_results").insert({**result, "scan_id": scan_row["id"]}).execute().data[0]
+    return {"scan": scan_row, "result": result_row}
+
+
+@pytest.fixture
+def user_id(fake_supabase, fake_repositories, monkeypatch):
+    user_id = str(uuid4())
+    fake_supabase.tables = {
+        "users": [{"id": user_id, "email": "a@example.com", "profile": {}}],
+        "blueprints": [
+            {"id": str(uuid4()), "user_id": user_id, "answers": [], "is_active": False},
+            {"id": str(uuid4()), "user_id": user_id, "answers": [], "is_active": True},
+        ],
+        "scans": [],
+        "scan_results": [],
+        "red_flags": [],
+    }
+    fake_supabase.rpc_handlers["create_scan_with_result"] = create_scan_with_result
+    monkeypatch.setattr(assessments, "get_repositories", lambda: fake_repositories)
+    monkeypatch.setattr(assessments, "get_pattern_aggregator", lambda: SimpleNamespace(observe=lambda result: None))
+    rule_store = RedFlagRuleStore(fake_supabase, refresh_interval=3600)
+    rule_store._last_checked = float("inf")
+    monkeypatch.setattr(assessments, "get_red_flag_rule_store", lambda: rule_store)
+    profile_cache = InMemoryProfileCache(max_entries=10, ttl_seconds=60)
+    monkeypatch.setattr(assessments, "get_profile_cache", lambda: profile_cache)
+    dual_scan_sessions = DualScanSessionService(fake_repositories.scans, session_ttl_seconds=60)
+    monkeypatch.setattr(assessments, "get_dual_scan_session_service", lambda: dual_scan_sessions)
+    return UUID(user_id)
+
+
+def make_request(**fields):
+    return CreateScanRequest(
+        scan_type=fields.pop("scan_type", "single"),
+        person_name="Sam",
+        answers=[{"question_id": "q1", "category": "trust", "rating": "good"}],
+        **fields
+    )
+
+
+def test_create_assessment_one_read_one_write(fake_supabase, user_id):
+    """Test: user and blueprint load in one query; scan and result are written by one call"""
+    response = asyncio.run(assessments.create_assessment(make_request(), user_id=user_id))
+
+    reads = [call for call in fake_supabase.calls if call[1] == "select"]
+    assert reads == [("users", "select")]
+    # Nothing is written before the combined call
+    assert fake_supabase.calls[:2] == [("users", "select"), ("create_scan_with_result", "rpc")]
+    scan, = fake_supabase.tables["scans"]
+    assert str(response.scan_id) == scan["id"]
+    assert scan["status"] == "completed"
+    assert scan["categories_completed"] == ["trust"]
+
+
+def test_create_assessment_scoring_failure_writes_nothing(fake_supabase, user_id, monkeypatch):
+    """Test: a scoring error leaves no orphaned scan behind"""
+    def fail(*args, **kwargs):
+        raise RuntimeError("scoring failed")
+    monkeypatch.setattr(assessments.ScoringEngine, "process_scan", fail)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(assessments.create_assessment(make_request(), user_id=user_id))
+
+    assert error.value.status_code == 500
+    assert fake_supabase.tables["scans"] == []
+    assert fake_supabase.rpc_calls == []
+
+
+def test_create_assessment_requires_active_blueprint(fake_supabase, user_id):
+    """Test: no active blueprint is a 400, unknown user a 404"""
+    fake_supabase.tables["blueprints"] = [
+        row for row in fake_supabase.tables["blueprints"] if not row["is_active"]
+    ]
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(assessments.create_assessment(make_request(), user_id=user_id))
+    assert error.value.status_code == 400
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(assessments.create_assessment(make_request(), user_id=uuid4()))
+    assert error.value.status_code == 404
+
+
+def test_create_dual_scan_invalidates_session(fake_supabase, fake_repositories, user_id):
+    """Test: a polled, pending session is served from cache until a scan of it is saved"""
+    session_id = uuid4()
+    service = assessments.get_dual_scan_session_service()
+    assert asyncio.run(service.get_session(session_id)) is None
+    assert asyncio.run(service.get_session(session_id)) is None
+    assert [call for call in fake_supabase.calls if call[0] == "scans"] == [("scans", "select")]
+
+    request = make_request(scan_type="dual", dual_scan_session_id=session_id, dual_scan_role="A")
+    asyncio.run(assessments.create_assessment(request, user_id=user_id))
+
+    scan, = fake_supabase.tables["scans"]
+    assert scan["dual_scan_session_id"] == str(session_id)
+    session = asyncio.run(service.get_session(session_id))
+    assert session["status"] == "pending"
+    assert [(p["role"], p["completed"]) for p in session["participants"]] == [("A", True)]
@@ -3,7 +3,7 @@ Tests for Amora coach pattern matching.
 Run with: pytest backend/tests/test_coach_patterns.py -v
 """
 import pytest
-from app.services.coach_service import CoachService
+from app.services.coach_service import CoachService, normalize_question
 from app.models.pydantic_models import CoachMode, CoachRequest
 from uuid import UUID
 
@@ -156,3 +156,19 @@ def test_pattern_matching_table(coach_service, test_user_id, question, expected_
     # Check that response is NOT the generic fallback
     generic_fallback = "i'm here to help you explore relationship topics"
     assert generic_fallback not in response.message.lower()[:100]
+
+
+def test_normalize_curly_apostrophes():
+    """Test: curly apostrophes normalize the same as straight ones"""
+    assert normalize_question("I\u2019m confused\u2014don\u2019t know!") == "im confused dont know"
+    assert normalize_question("I'm confused—don't know!") == "im confused dont know"
+
+
+def test_rule_priority_order(coach_service):
+    """Test: earlier rules win when several keyword groups match"""
+    ready_and_married = coach_service._answer_question("should i commit or get married")
+    married = coach_service._answer_question("should i get married")
+
+    assert ready_and_married.startswith("Readiness")
+    assert married.startswith("Deciding whether to marry")
+    assert coach_service._answer_question("i feel unsure about trust").startswith("Feeling confused")
@@ -0,0 +1,90 @@
+"""
+Tests for the bounded coach executor.
+Run with: pytest backend/tests/test_concurrency.py -v
+"""
+import asyncio
+import threading
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import coach_enhanced
+from app.models.pydantic_models import CoachRequest
+from app.utils import concurrency
+from app.utils.concurrency import BoundedExecutor, ExecutorSaturatedError
+
+
+def test_saturated_coach_executor_returns_503(monkeypatch):
+    """Test: with every worker and queue slot taken, the next coach request gets a 503"""
+    executor = BoundedExecutor(max_workers=1, queue_depth=1, name="test")
+    release = threading.Event()
+
+    async def scenario():
+        busy = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.run(lambda: None)
+
+        async def paid(user_id):
+            return False
+        monkeypatch.setattr(coach_enhanced, "check_subscription_status", paid)
+        monkeypatch.setattr(coach_enhanced, "get_coach_executor", lambda: executor)
+        with pytest.raises(HTTPException) as error:
+            await coach_enhanced.get_coach_response(
+                CoachRequest(mode="LEARN", specific_question="hi"), user_id=uuid4()
+            )
+
+        release.set()
+        await asyncio.gather(*busy)
+        return error.value
+
+    try:
+        error = asyncio.run(scenario())
+    finally:
+        release.set()
+        executor.shutdown()
+
+    assert error.status_code == 503
+    assert error.headers == {"Retry-After": "1"}
+
+
+def test_permits_released_after_success_and_error():
+    """Test: a finished call frees its slot whether it returned or raised"""
+    executor = BoundedExecutor(max_workers=1, queue_depth=0, name="test")
+
+    def fail():
+        raise ValueError("boom")
+
+    async def scenario():
+        assert await executor.run(lambda: 1) == 1
+        with pytest.raises(ValueError):
+            await executor.run(fail)
+        # Only one permit exists; this would be rejected if either call leaked it
+        return await executor.run(lambda: 2)
+
+    try:
+        assert asyncio.run(scenario()) == 2
+    finally:
+        executor.shutdown()
+
+
+def test_shutdown_executors_replaces_the_coach_executor(monkeypatch):
+    """Test: shutdown stops the shared executor and the next lookup builds a fresh one"""
+    monkeypatch.setattr(concurrency, "_coach_executor", None)
+    executor = concurrency.get_coach_executor()
+    assert concurrency.get_coach_executor() is executor
+
+    concurrency.shutdown_executors()
+    assert concurrency._coach_executor is None
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(executor.run(lambda: None))
+
+    fresh = concurrency.get_coach_executor()
+    try:
+        assert fresh is not executor
+        assert asyncio.run(fresh.run(lambda: 3)) == 3
+    finally:
+        concurrency.shutdown_executors()
@@ -0,0 +1,118 @@
+"""
+Tests for dual scan session resolution and caching.
+Run with: pytest backend/tests/test_dual_scan_session.py -v
+"""
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from app.models.db_models import ScanResult
+from app.services.dual_scan_engine import DualScanEngine
+from app.services.dual_scan_session import DualScanSessionService
+
+
+class CountingEngine(DualScanEngine):
+    def __init__(self):
+        self.computed = 0
+
+    def calculate_mutual_alignment(self, *args):
+        self.computed += 1
+        return super().calculate_mutual_alignment(*args)
+
+
+def make_scan(session_id, role):
+    return {
+        "id": str(uuid4()),
+        "user_id": str(uuid4()),
+        "scan_type": "dual",
+        "status": "completed",
+        "dual_scan_session_id": session_id,
+        "dual_scan_role": role,
+    }
+
+
+def make_result(scan, score, category_scores, created_at="2026-01-01T00:00:00"):
+    return {
+        "id": str(uuid4()),
+        "scan_id": scan["id"],
+        "overall_score": score,
+        "category": "mixed-signals",
+        "category_scores": category_scores,
+        "ai_analysis": {},
+        "red_flags": [{"category": "trust", "severity": "high", "signal": "x", "evidence": []}],
+        "created_at": created_at,
+    }
+
+
+@pytest.fixture
+def session(fake_supabase):
+    session_id = str(uuid4())
+    scan_b, scan_a = make_scan(session_id, "B"), make_scan(session_id, "A")
+    fake_supabase.tables["scans"] = [scan_b, scan_a, make_scan(str(uuid4()), "A")]
+    fake_supabase.tables["scan_results"] = [make_result(scan_a, 64, {"trust": 80, "values": 50})]
+    return session_id, scan_a, scan_b
+
+
+def get_session(service, session_id):
+    return asyncio.run(service.get_session(session_id))
+
+
+def test_pending_session_is_served_from_cache(fake_supabase, fake_repositories, session):
+    """Test: polling a pending session hits the database once per session TTL"""
+    session_id, scan_a, scan_b = session
+    service = DualScanSessionService(fake_repositories.scans, session_ttl_seconds=60)
+
+    first = get_session(service, session_id)
+    second = get_session(service, session_id)
+
+    assert first["status"] == "pending"
+    assert [(p["role"], p["completed"]) for p in first["participants"]] == [("A", True), ("B", False)]
+    assert second is first
+    assert fake_supabase.calls == [("scans", "select")]
+    assert get_session(service, uuid4()) is None
+
+
+def test_complete_session_computes_alignment_once(fake_supabase, fake_repositories, session):
+    """Test: alignment matches the engine, uses the latest result and is cached by result ids"""
+    session_id, scan_a, scan_b = session
+    fake_supabase.tables["scan_results"] += [
+        make_result(scan_b, 20, {"trust": 10}, created_at="2026-01-01T00:00:00"),
+        make_result(scan_b, 81, {"trust": 20, "values": 90}, created_at="2026-01-02T00:00:00"),
+    ]
+    engine = CountingEngine()
+    service = DualScanSessionService(fake_repositories.scans, engine=engine, session_ttl_seconds=60)
+
+    session_data = get_session(service, session_id)
+    result_a, _, result_b = [ScanResult.from_dict(row) for row in fake_supabase.tables["scan_results"]]
+    assert session_data["status"] == "complete"
+    assert session_data["result_ids"] == (str(result_a.id), str(result_b.id))
+    assert session_data["alignment"] == DualScanEngine().calculate_mutual_alignment(None, None, result_a, result_b)
+
+    # Repeat views: no queries, no recomputation
+    assert get_session(service, session_id) == session_data
+    assert fake_supabase.calls == [("scans", "select")]
+
+    # A re-resolved session with the same results reuses the cached alignment
+    service.invalidate(session_id)
+    get_session(service, session_id)
+    assert engine.computed == 1
+
+    # Rescoring keeps the result id; the new scores must not hit the old alignment
+    rescored = fake_supabase.tables["scan_results"][0]
+    rescored.update({"overall_score": 90, "category_scores": {"trust": 95, "values": 90}, "ai_version": "2.0.0"})
+    service.invalidate(session_id)
+    session_data = get_session(service, session_id)
+    assert engine.computed == 2
+    assert session_data["alignment"] == DualScanEngine().calculate_mutual_alignment(
+        None, None, ScanResult.from_dict(rescored), result_b
+    )
+
+
+def test_session_with_extra_scans_is_rejected(fake_supabase, fake_repositories, session):
+    """Test: a session can hold at most two scans"""
+    session_id, _, _ = session
+    fake_supabase.tables["scans"].append(make_scan(session_id, "A"))
+
+    with pytest.raises(ValueError):
+        get_session(DualScanSessionService(fake_repositories.scans), session_id)
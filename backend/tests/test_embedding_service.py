@@ -0,0 +1,202 @@
+"""
+Tests for the embedding micro-batcher and embedding cache.
+Run with: pytest backend/tests/test_embedding_service.py -v
+"""
+from concurrent.futures import Future
+import threading
+
+import numpy as np
+import pytest
+
+from app.services.embedding_cache import DiskEmbeddingStore, EmbeddingCache
+from app.services.embedding_service import EmbeddingService, EmbeddingServiceClosedError
+
+
+class FakeModel:
+    """Stand-in for SentenceTransformer that records batch sizes."""
+
+    def __init__(self):
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False):
+        with self._lock:
+            self.batches.append(list(texts))
+        return np.array([[len(t), i] for i, t in enumerate(texts)], dtype=np.float32)
+
+
+@pytest.fixture
+def fake_model():
+    return FakeModel()
+
+
+def test_single_request_returns_its_row(fake_model):
+    """Test: one caller gets its own embedding back"""
+    service = EmbeddingService(model=fake_model, max_batch_size=8, max_wait_ms=1)
+    try:
+        vector = service.encode("hello")
+    finally:
+        service.close()
+
+    assert vector[0] == len("hello")
+    assert fake_model.batches == [["hello"]]
+
+
+def test_concurrent_requests_are_coalesced(fake_model):
+    """Test: requests within the wait window share one encode call"""
+    service = EmbeddingService(model=fake_model, max_batch_size=16, max_wait_ms=200)
+    texts = [f"message {'x' * i}" for i in range(8)]
+    results = {}
+    barrier = threading.Barrier(len(texts))
+
+    def worker(text):
+        barrier.wait()
+        results[text] = service.encode(text, timeout=5)
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in texts]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        service.close()
+
+    assert len(fake_model.batches) < len(texts)
+    for text in texts:
+        assert results[text][0] == len(text)
+
+
+def test_batch_size_is_capped(fake_model):
+    """Test: no batch exceeds max_batch_size"""
+    service = EmbeddingService(model=fake_model, max_batch_size=3, max_wait_ms=50)
+    try:
+        futures = [service.submit(f"text {i}") for i in range(10)]
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        service.close()
+
+    assert all(len(batch) <= 3 for batch in fake_model.batches)
+    assert sum(len(batch) for batch in fake_model.batches) == 10
+
+
+def test_model_errors_propagate_to_callers():
+    """Test: an encode failure is raised in every waiting caller"""
+    class BrokenModel:
+        def encode(self, texts, **kwargs):
+            raise RuntimeError("model unavailable")
+
+    service = EmbeddingService(model=BrokenModel(), max_batch_size=4, max_wait_ms=1)
+    try:
+        with pytest.raises(RuntimeError):
+            service.encode("hi", timeout=5)
+    finally:
+        service.close()
+
+
+def test_closed_service_fails_fast(fake_model):
+    """Test: encode() after close() raises, and requests left queued are failed rather than hung"""
+    service = EmbeddingService(model=fake_model, max_batch_size=4, max_wait_ms=1)
+
+    # A request that reached the queue with no worker left to pick it up
+    stranded = Future()
+    service._queue.put(("late", stranded))
+    service.close()
+
+    with pytest.raises(EmbeddingServiceClosedError):
+        stranded.result(timeout=1)
+    with pytest.raises(EmbeddingServiceClosedError):
+        service.encode("after", timeout=1)
+
+
+def test_cache_serves_normalized_repeats(fake_model):
+    """Test: 'I'm confused' and 'im confused!' are embedded once"""
+    cache = EmbeddingCache(max_entries=10)
+    service = EmbeddingService(model=fake_model, max_batch_size=4, max_wait_ms=1, cache=cache)
+    try:
+        first = service.encode("I'm confused")
+        second = service.encode("im confused!")
+    finally:
+        service.close()
+
+    assert len(fake_model.batches) == 1
+    assert np.array_equal(first, second)
+    assert cache.stats()["hits"] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    """Test: byte budget evicts the oldest entries first"""
+    vector = np.zeros(4, dtype=np.float32)
+    cache = EmbeddingCache(max_entries=100, max_bytes=2 * vector.nbytes)
+
+    cache.put("first question", vector)
+    cache.put("second question", vector)
+    cache.get("first question")
+    cache.put("third question", vector)
+
+    assert cache.get("first question") is not None
+    assert cache.get("second question") is None
+    assert cache.get("third question") is not None
+
+
+def test_disk_store_survives_restart(tmp_path):
+    """Test: vectors written to the disk store are readable by a new instance"""
+    store = DiskEmbeddingStore(str(tmp_path), dim=4, capacity=8)
+    store.put("am i ready for a relationship", np.arange(4, dtype=np.float32))
+    store.close()
+
+    cache = EmbeddingCache(max_entries=10, disk_store=DiskEmbeddingStore(str(tmp_path), dim=4, capacity=8))
+    vector = cache.get("Am I ready for a relationship?")
+
+    assert vector is not None
+    assert vector.tolist() == [0.0, 1.0, 2.0, 3.0]
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_disk_store_shared_by_two_processes(tmp_path):
+    """Test: stores sharing a path never hand out one slot to two keys"""
+    first = DiskEmbeddingStore(str(tmp_path), dim=2, capacity=16)
+    second = DiskEmbeddingStore(str(tmp_path), dim=2, capacity=16)
+
+    for i in range(6):
+        store = first if i % 2 else second
+        store.put(f"q{i}", np.full(2, i, dtype=np.float32))
+
+    for store in (first, second):
+        for i in range(6):
+            assert store.get(f"q{i}").tolist() == [i, i]
+    first.close()
+    second.close()
+
+    # Compaction rewrites the log; a store that opened before it follows along
+    older = DiskEmbeddingStore(str(tmp_path), dim=2, capacity=2)
+    for i in range(6):
+        older.put(f"r{i}", np.full(2, i, dtype=np.float32))
+    newer = DiskEmbeddingStore(str(tmp_path), dim=2, capacity=2)
+    older.put("r6", np.full(2, 6, dtype=np.float32))
+    assert newer.get("r6").tolist() == [6, 6]
+    assert newer.get("r5").tolist() == [5, 5]
+    assert older.get("r4") is None and newer.get("r4") is None
+
+
+def test_disk_store_crash_before_logging_key(tmp_path, monkeypatch):
+    """Test: a write interrupted before its key is logged leaves no key pointing at the new vector"""
+    store = DiskEmbeddingStore(str(tmp_path), dim=2, capacity=2)
+    store.put("a", np.array([1, 1], dtype=np.float32))
+    store.put("b", np.array([2, 2], dtype=np.float32))
+
+    append = store._append
+
+    def crash(slot, key):
+        if key == "c":
+            raise OSError("crashed")
+        append(slot, key)
+    monkeypatch.setattr(store, "_append", crash)
+    with pytest.raises(OSError):
+        store.put("c", np.array([3, 3], dtype=np.float32))
+
+    reopened = DiskEmbeddingStore(str(tmp_path), dim=2, capacity=2)
+    assert reopened.get("a") is None
+    assert reopened.get("b").tolist() == [2, 2]
+    assert reopened.get("c") is None
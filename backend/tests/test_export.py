@@ -0,0 +1,59 @@
+"""
+Tests for the streaming history export.
+Run with: pytest backend/tests/test_export.py -v
+"""
+import asyncio
+import gzip
+import json
+from uuid import uuid4
+
+from app.services.export import gzip_stream, iter_user_export
+
+
+def collect(stream):
+    async def run():
+        return [chunk async for chunk in stream]
+    return asyncio.run(run())
+
+
+def make_history(fake, user_id, scans=7):
+    fake.tables["blueprints"] = [{"id": str(uuid4()), "user_id": user_id, "created_at": "2026-01-01T00:00:00"}]
+    fake.tables["scans"] = []
+    fake.tables["scan_results"] = []
+    for i in range(scans):
+        created_at = f"2026-01-{2 + i // 2:02d}T00:00:00"
+        scan = {"id": str(uuid4()), "user_id": user_id, "created_at": created_at}
+        fake.tables["scans"].append(scan)
+        fake.tables["scan_results"].append({"id": str(uuid4()), "scan_id": scan["id"], "created_at": created_at})
+    fake.tables["scans"].append({"id": str(uuid4()), "user_id": str(uuid4()), "created_at": "2026-01-01T00:00:00"})
+
+
+def test_export_streams_every_record_once(fake_supabase, fake_repositories):
+    """Test: each page is its own chunk, every row appears once, counts close the stream"""
+    user_id = str(uuid4())
+    make_history(fake_supabase, user_id)
+
+    chunks = collect(iter_user_export(fake_repositories, user_id, page_size=3))
+    records = [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+
+    # blueprints: 1 page; scans and results: 3 pages each; trailer
+    assert len(chunks) == 1 + 3 + 3 + 1
+    assert records[-1] == {"type": "export_complete", "data": {"blueprint": 1, "scan": 7, "scan_result": 7}}
+    scan_ids = [r["data"]["id"] for r in records if r["type"] == "scan"]
+    assert sorted(scan_ids) == sorted(s["id"] for s in fake_supabase.tables["scans"] if s["user_id"] == user_id)
+    assert all("scans" not in r["data"] for r in records if r["type"] == "scan_result")
+
+
+def test_export_gzip_and_error_marker(fake_supabase, fake_repositories):
+    """Test: gzip output decompresses to the same stream; failures end with export_error"""
+    user_id = str(uuid4())
+    make_history(fake_supabase, user_id, scans=2)
+    repos = fake_repositories
+
+    plain = b"".join(collect(iter_user_export(repos, user_id)))
+    compressed = b"".join(collect(gzip_stream(iter_user_export(repos, user_id))))
+    assert gzip.decompress(compressed) == plain
+
+    del fake_supabase.tables["scans"][0]["created_at"]
+    lines = b"".join(collect(iter_user_export(repos, user_id, page_size=1))).decode().splitlines()
+    assert json.loads(lines[-1])["type"] == "export_error"
@@ -0,0 +1,49 @@
+"""
+Tests for the precompiled keyword matcher.
+Run with: pytest backend/tests/test_keyword_matcher.py -v
+"""
+import random
+
+import pytest
+
+from app.services.amora_enhanced_service import EMOTION_KEYWORDS, INTENT_KEYWORDS
+from app.utils.keyword_matcher import KeywordMatcher
+
+
+def brute_force(table, text):
+    return {label for label, keywords in table.items() if any(k in text for k in keywords)}
+
+
+def test_overlapping_keywords_hit_every_label():
+    """Test: keywords sharing a start position or nested inside each other all match"""
+    matcher = KeywordMatcher({
+        "advice": ["what should i"],
+        "decision": ["should i"],
+        "hope": ["hope", "hopeful"],
+        "hopeless": ["hopeless"],
+    })
+
+    assert matcher.match("what should i do") == {"advice", "decision"}
+    assert matcher.match("i feel hopeless") == {"hope", "hopeless"}
+    assert matcher.match("nothing here") == set()
+
+
+def test_matches_any_substring_semantics():
+    """Test: results equal the original any(keyword in text) checks"""
+    table = {}
+    for kind, vocab in (("emotion", EMOTION_KEYWORDS), ("intent", INTENT_KEYWORDS)):
+        for name, (_, keywords) in vocab.items():
+            table[(kind, name)] = keywords
+    matcher = KeywordMatcher(table)
+
+    words = [k for keywords in table.values() for k in keywords] + ["so", "i", "the", "x", "or"]
+    rng = random.Random(7)
+    for _ in range(500):
+        text = "".join(rng.choice(words) + rng.choice(["", " ", "  "]) for _ in range(rng.randint(0, 6)))
+        assert matcher.match(text) == brute_force(table, text), text
+
+
+def test_empty_keyword_is_rejected():
+    """Test: an empty keyword would match everything and is refused"""
+    with pytest.raises(ValueError):
+        KeywordMatcher({"bad": [""]})
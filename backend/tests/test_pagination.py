@@ -0,0 +1,74 @@
+"""
+Tests for keyset pagination of listings.
+Run with: pytest backend/tests/test_pagination.py -v
+"""
+import asyncio
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app.api import assessments
+from app.utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+
+def make_scan(user_id, created_at):
+    return {
+        "id": str(uuid4()),
+        "user_id": user_id,
+        "scan_type": "single",
+        "status": "completed",
+        "answers": [{"question_id": "q1", "rating": "good"}],
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+
+
+def list_all(user_id, **kwargs):
+    """Follow X-Next-Cursor until the last page."""
+    pages, cursor = [], None
+    while True:
+        response = Response()
+        pages.append(asyncio.run(assessments.list_assessments(
+            response, user_id=UUID(user_id), cursor=cursor, **kwargs
+        )))
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip_and_tampering():
+    """Test: cursors are opaque round trips; anything else is rejected"""
+    row = {"created_at": "2026-01-01T00:00:00.12345+00:00", "id": str(uuid4())}
+    assert decode_cursor(encode_cursor(row)) == (row["created_at"], row["id"])
+
+    for bad in ["not-a-cursor", encode_cursor({"created_at": "x", "id": row["id"]}),
+                encode_cursor({"created_at": row["created_at"], "id": "1),or(id.gt.0"})]:
+        with pytest.raises(ValueError):
+            decode_cursor(bad)
+
+
+def test_list_assessments_pages_through_ties(fake_supabase, fake_repositories, monkeypatch):
+    """Test: (created_at, id) cursors neither skip nor repeat rows sharing a timestamp"""
+    user_id = str(uuid4())
+    scans = [make_scan(user_id, f"2026-01-0{1 + i // 3}T00:00:00") for i in range(8)]
+    fake_supabase.tables["scans"] = scans + [make_scan(str(uuid4()), "2026-01-01T00:00:00")]
+    monkeypatch.setattr(assessments, "get_repositories", lambda: fake_repositories)
+
+    pages = list_all(user_id, limit=3, include_answers=False)
+
+    expected = sorted(scans, key=lambda s: (s["created_at"], s["id"]), reverse=True)
+    assert [[str(s.id) for s in page] for page in pages] == [
+        [s["id"] for s in expected[i:i + 3]] for i in (0, 3, 6)
+    ]
+    assert all(s.answers is None for page in pages for s in page)
+    assert all(s.answers == scans[0]["answers"] for s in list_all(user_id, limit=10)[0])
+
+
+def test_invalid_cursor_is_a_client_error(fake_repositories, monkeypatch):
+    """Test: a malformed cursor returns 400"""
+    monkeypatch.setattr(assessments, "get_repositories", lambda: fake_repositories)
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(assessments.list_assessments(Response(), user_id=uuid4(), cursor="garbage"))
+    assert excinfo.value.status_code == 400
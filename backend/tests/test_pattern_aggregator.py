@@ -0,0 +1,121 @@
+"""
+Tests for incremental pattern_knowledge_base aggregation.
+Run with: pytest backend/tests/test_pattern_aggregator.py -v
+"""
+import asyncio
+import random
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.models.db_models import ScanResult
+from app.services.pattern_aggregator import PatternAggregator, PatternStats
+
+
+def make_result(score, severity="high", category="caution"):
+    return ScanResult(
+        id=uuid4(),
+        scan_id=uuid4(),
+        overall_score=score,
+        category=category,
+        category_scores={"trust": score, "values": 90},
+        ai_analysis={"confidence_score": 0.8},
+        red_flags=[{
+            "severity": severity,
+            "category": "trust",
+            "signal": "Multiple concerns in trust category",
+            "evidence": ["q1", "q2"],
+        }],
+    )
+
+
+def test_welford_and_merge_match_numpy():
+    """Test: streamed and merged statistics equal the batch mean / sample variance"""
+    rng = random.Random(5)
+    scores = [rng.uniform(0, 100) for _ in range(500)]
+
+    parts = [PatternStats("red_flag", {}) for _ in range(3)]
+    for i, score in enumerate(scores):
+        parts[i % 3].add(score, score < 30, 0.5, "caution")
+    merged = PatternStats("red_flag", {})
+    for part in parts:
+        merged.merge(part)
+
+    assert merged.count == len(scores)
+    assert merged.mean == pytest.approx(np.mean(scores))
+    assert merged.variance == pytest.approx(np.var(scores, ddof=1))
+    assert merged.flag_count == sum(1 for s in scores if s < 30)
+    assert merged.outcomes == {"caution": len(scores)}
+
+
+def test_aggregator_flushes_one_batch(fake_supabase, fake_repositories):
+    """Test: results are buffered per pattern and flushed in a single rpc"""
+    aggregator = PatternAggregator(fake_repositories.pattern_stats, max_pending=100, flush_interval=3600)
+    aggregator.observe(make_result(40))
+    aggregator.observe(make_result(60, severity="medium", category="mixed-signals"))
+
+    # Two red_flag patterns (different severity) and two score profiles (trust bands 40 and 60)
+    assert len(aggregator) == 4
+    assert fake_supabase.rpc_calls == []
+
+    assert asyncio.run(aggregator.flush()) == 4
+    (name, params), = fake_supabase.rpc_calls
+    assert name == "merge_pattern_stats"
+    profiles = [p for p in params["batch"] if p["pattern_type"] == "score_profile"]
+    assert sorted(p["pattern_data"]["category_bands"]["trust"] for p in profiles) == [40, 60]
+    flags = {p["pattern_data"]["severity"]: p for p in params["batch"] if p["pattern_type"] == "red_flag"}
+    assert flags["high"]["flag_count"] == 1
+    assert flags["medium"]["flag_count"] == 0
+    assert len(aggregator) == 0
+
+
+def test_failed_flush_keeps_statistics(fake_supabase, fake_repositories):
+    """Test: a failed flush is merged back with anything observed since"""
+    aggregator = PatternAggregator(fake_repositories.pattern_stats, max_pending=100, flush_interval=3600)
+    aggregator.observe(make_result(40))
+    fake_supabase.rpc_error = RuntimeError("database unavailable")
+    assert asyncio.run(aggregator.flush()) == 0
+
+    aggregator.observe(make_result(40))
+    fake_supabase.rpc_error = None
+    asyncio.run(aggregator.flush())
+
+    (_, params), = fake_supabase.rpc_calls
+    assert {p["occurrence_count"] for p in params["batch"]} == {2}
+
+
+class BlockingPatternStats:
+    """Pattern stats repository whose merges wait until released."""
+
+    def __init__(self):
+        self.batches = []
+        self.release = None
+
+    async def merge(self, batch):
+        self.batches.append(batch)
+        await self.release.wait()
+
+
+def test_observe_flushes_in_the_background():
+    """Test: a due flush runs as a task, one at a time, and close() waits for it"""
+    repository = BlockingPatternStats()
+    aggregator = PatternAggregator(repository, max_pending=1, flush_interval=3600)
+
+    async def scenario():
+        repository.release = asyncio.Event()
+        aggregator.observe(make_result(40))
+        await asyncio.sleep(0)
+        assert len(repository.batches) == 1
+
+        # The first flush is still blocked; later results only buffer
+        aggregator.observe(make_result(60))
+        await asyncio.sleep(0)
+        assert len(repository.batches) == 1
+
+        repository.release.set()
+        await aggregator.close()
+
+    asyncio.run(scenario())
+    assert len(repository.batches) == 2
+    assert len(aggregator) == 0
@@ -0,0 +1,39 @@
+"""
+Tests for preloading shared state before workers fork.
+Run with: pytest backend/tests/test_preload.py -v
+"""
+import gc
+
+from app import database, preload
+from app.services.red_flag_rules import RedFlagRuleStore
+from app.services.template_index import TemplateIndex
+
+
+def test_preload_loads_state_and_forgets_master_client(fake_supabase, monkeypatch):
+    """Test: preloaded stores keep their data but workers get fresh clients"""
+    fake_supabase.tables = {
+        "amora_templates": [{
+            "id": "t1", "active": True, "confidence_level": "HIGH",
+            "embedding": [1.0, 0.0], "updated_at": "2026-01-01T00:00:00",
+        }],
+        "ai_logic_versions": [],
+    }
+    index, rules = TemplateIndex(), RedFlagRuleStore()
+    monkeypatch.setattr(preload, "get_embedding_model", lambda: object())
+    monkeypatch.setattr(preload, "get_template_index", lambda: index)
+    monkeypatch.setattr(preload, "get_red_flag_rule_store", lambda: rules)
+    monkeypatch.setattr(database, "_supabase_client", fake_supabase)
+
+    try:
+        preload.preload()
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
+
+    assert index.top_k("HIGH", [1.0, 0.0])[0][0]["id"] == "t1"
+    assert database._supabase_client is None
+
+    # A worker's own client is picked up, not the one used while preloading
+    worker_client = object()
+    monkeypatch.setattr(database, "_supabase_client", worker_client)
+    assert index.supabase is worker_client and rules.supabase is worker_client
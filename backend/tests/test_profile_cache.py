@@ -0,0 +1,124 @@
+"""
+Tests for the profile / active blueprint cache.
+Run with: pytest backend/tests/test_profile_cache.py -v
+"""
+import asyncio
+from uuid import UUID, uuid4
+
+from app.api import blueprints
+from app.config import settings
+from app.models.pydantic_models import UpdateBlueprintRequest
+from app.services import profile_cache
+from app.services.profile_cache import InMemoryProfileCache, RedisProfileCache
+
+
+class FakeRedis:
+    """Minimal redis.asyncio-compatible client backed by a dict."""
+
+    def __init__(self):
+        self.data = {}
+        self.error = None
+
+    async def get(self, name):
+        if self.error:
+            raise self.error
+        return self.data.get(name)
+
+    async def set(self, name, value, ex=None):
+        if self.error:
+            raise self.error
+        self.data[name] = value.encode() if isinstance(value, str) else value
+
+    async def delete(self, name):
+        self.data.pop(name, None)
+
+
+def seed(fake_supabase):
+    user_id = str(uuid4())
+    blueprint_id = str(uuid4())
+    fake_supabase.tables = {
+        "users": [{
+            "id": user_id, "email": "a@example.com", "subscription_tier": "free",
+            "password_hash": "secret-hash",
+        }],
+        "blueprints": [{
+            "id": blueprint_id, "user_id": user_id, "answers": [],
+            "profile_summary": {"category_weights": {"trust": 1.0}}, "is_active": True,
+        }],
+    }
+    return UUID(user_id), UUID(blueprint_id)
+
+
+def user_reads(fake_supabase):
+    return fake_supabase.calls.count(("users", "select"))
+
+
+def test_repeat_loads_hit_the_database_once(fake_supabase, fake_repositories):
+    """Test: consecutive loads for one user are served from the cache"""
+    user_id, blueprint_id = seed(fake_supabase)
+    cache = InMemoryProfileCache(max_entries=10, ttl_seconds=60)
+
+    for _ in range(3):
+        user, blueprint = asyncio.run(cache.load(fake_repositories, user_id))
+        assert (user.id, blueprint.id) == (user_id, blueprint_id)
+
+    assert user_reads(fake_supabase) == 1
+    assert cache.stats()["hits"] == 2
+
+    # Unknown users are not cached
+    assert asyncio.run(cache.load(fake_repositories, uuid4())) == (None, None)
+    assert len(cache._cache) == 1
+
+
+def test_update_blueprint_invalidates(fake_supabase, fake_repositories, monkeypatch):
+    """Test: a blueprint update drops the user's entry so the next load sees it"""
+    user_id, blueprint_id = seed(fake_supabase)
+    cache = InMemoryProfileCache(max_entries=10, ttl_seconds=60)
+    monkeypatch.setattr(blueprints, "get_repositories", lambda: fake_repositories)
+    monkeypatch.setattr(blueprints, "get_profile_cache", lambda: cache)
+    asyncio.run(cache.load(fake_repositories, user_id))
+
+    request = UpdateBlueprintRequest(answers=[{
+        "question_id": "q1", "category": "values", "response": "x", "importance": "high"
+    }])
+    asyncio.run(blueprints.update_blueprint(blueprint_id, request, user_id=user_id))
+
+    _, blueprint = asyncio.run(cache.load(fake_repositories, user_id))
+    assert blueprint.profile_summary["top_priorities"] == ["values"]
+    assert user_reads(fake_supabase) == 2
+
+
+def test_redis_cache_shares_snapshots(fake_supabase, fake_repositories):
+    """Test: the Redis backend round-trips rows, including a missing blueprint, without credentials"""
+    user_id, _ = seed(fake_supabase)
+    fake_supabase.tables["blueprints"] = []
+    client = FakeRedis()
+
+    asyncio.run(RedisProfileCache(client, ttl_seconds=60).load(fake_repositories, user_id))
+    other_worker = RedisProfileCache(client, ttl_seconds=60)
+    user, blueprint = asyncio.run(other_worker.load(fake_repositories, user_id))
+
+    assert (user.id, blueprint) == (user_id, None)
+    assert user_reads(fake_supabase) == 1
+    raw, = client.data.values()
+    assert b"password_hash" not in raw and b"secret-hash" not in raw
+    asyncio.run(other_worker.invalidate(user_id))
+    assert client.data == {}
+
+    # A Redis outage falls back to the database instead of failing the load
+    client.error = ConnectionError("redis unavailable")
+    user, _ = asyncio.run(other_worker.load(fake_repositories, user_id))
+    assert user.id == user_id
+    assert user_reads(fake_supabase) == 2
+
+
+def test_memory_backend_uses_short_ttl(monkeypatch):
+    """Test: per-worker entries expire after the memory TTL, not the shared Redis TTL"""
+    monkeypatch.setattr(settings, "PROFILE_CACHE_BACKEND", "memory")
+    monkeypatch.setattr(settings, "PROFILE_CACHE_TTL_SECONDS", 300)
+    monkeypatch.setattr(settings, "PROFILE_CACHE_MEMORY_TTL_SECONDS", 30)
+
+    cache = profile_cache._create_profile_cache()
+
+    assert isinstance(cache, InMemoryProfileCache)
+    assert cache._cache.ttl_seconds == 30
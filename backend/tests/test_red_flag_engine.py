@@ -0,0 +1,73 @@
+"""
+Tests for the red flag engine.
+Run with: pytest backend/tests/test_red_flag_engine.py -v
+"""
+from uuid import uuid4
+
+import pytest
+
+from app.models.db_models import Blueprint, Scan, User
+from app.services.red_flag_engine import RedFlagEngine
+from app.services.scan_features import ScanFeatures
+
+
+@pytest.fixture
+def user():
+    return User(id=uuid4(), email="test@example.com")
+
+
+def make_scan(answers):
+    return Scan(id=uuid4(), user_id=uuid4(), scan_type="full", answers=answers)
+
+
+def test_scan_features_group_in_one_pass():
+    """Test: features keep answer order and default missing categories to unknown"""
+    answers = [
+        {"question_id": "q1", "category": "trust", "rating": "red-flag"},
+        {"question_id": "q2", "rating": "yellow-flag"},
+        {"question_id": "q3", "category": "trust", "rating": "green"},
+        {"question_id": "q1", "category": "trust", "rating": "yellow-flag"},
+    ]
+    features = ScanFeatures(answers)
+
+    assert [a["question_id"] for a in features.by_key[("trust", "q1")]] == ["q1", "q1"]
+    assert list(features.by_category) == ["trust", "unknown"]
+    assert features.rating_positions["trust"] == {"red-flag": [0], "green": [2], "yellow-flag": [3]}
+    assert [a["question_id"] for a in features.by_rating["red-flag"]] == ["q1"]
+    assert features.rating_histograms["trust"] == {"red-flag": 1, "green": 1, "yellow-flag": 1}
+    assert features.flagged_question_ids == ["q1", "q2", "q1"]
+    assert features.categories == ["trust", "unknown"]
+    assert features.rating_vector.tolist() == [0, 25, 50, 25]
+
+
+def test_detect_all_order_and_evidence(user):
+    """Test: deal-breakers then safety flags, each citing their questions; mixed signals kept apart"""
+    scan = make_scan([
+        {"question_id": "q1", "category": "trust", "rating": "red-flag"},
+        {"question_id": "q2", "category": "trust", "rating": "good"},
+        {"question_id": "q3", "category": "values", "rating": "red-flag"},
+        {"question_id": "q4", "category": "trust", "rating": "red-flag"},
+    ])
+    blueprint = Blueprint(
+        id=uuid4(),
+        user_id=uuid4(),
+        profile_summary={"deal_breakers": [
+            {"category": "values", "question_id": "q3", "response": "No honesty"},
+        ]}
+    )
+
+    flags = RedFlagEngine().detect_all(scan, blueprint, user)
+
+    assert [(f["severity"], f["category"]) for f in flags] == [
+        ("high", "values"),
+        ("critical", "safety"),
+        ("high", "trust"),
+    ]
+    assert flags[0]["signal"] == "Deal-breaker violation: No honesty"
+    assert flags[1]["evidence"] == ["q1", "q3", "q4"]
+    assert flags[2]["evidence"] == ["q1", "q4"]
+    assert all(len(f["pattern_hash"]) == 64 for f in flags)
+
+    inconsistencies = RedFlagEngine().detect_inconsistencies(scan)
+    assert [i["type"] for i in inconsistencies] == ["mixed_signals"]
+    assert inconsistencies[0]["questions"] == ["q1", "q2", "q4"]
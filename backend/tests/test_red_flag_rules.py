@@ -0,0 +1,135 @@
+"""
+Tests for declarative red flag rules.
+Run with: pytest backend/tests/test_red_flag_rules.py -v
+"""
+import threading
+import time
+
+import pytest
+
+from app.services.red_flag_rules import DEFAULT_RULE_SET, RedFlagRuleSet, RedFlagRuleStore
+from app.services.scan_features import ScanFeatures
+
+
+def signals(flags):
+    return [(f["severity"], f["category"], f["signal"], f["evidence"]) for f in flags]
+
+
+def test_default_rules_match_original_thresholds():
+    """Test: 3+ red flags is critical, 2+ flags in a category is high, in first-flag order"""
+    features = ScanFeatures([
+        {"question_id": "q1", "category": "values", "rating": "good"},
+        {"question_id": "q2", "category": "trust", "rating": "red-flag"},
+        {"question_id": "q3", "category": "values", "rating": "red-flag"},
+        {"question_id": "q4", "category": "values", "rating": "yellow-flag"},
+        {"question_id": "q5", "category": "trust", "rating": "red-flag"},
+    ])
+
+    assert signals(DEFAULT_RULE_SET.evaluate(features)) == [
+        ("critical", "safety", "Multiple red flags detected (3)", ["q2", "q3", "q5"]),
+        ("high", "trust", "Multiple concerns in trust category", ["q2", "q5"]),
+        ("high", "values", "Multiple concerns in values category", ["q3", "q4"]),
+    ]
+
+
+def test_custom_rules_compile_combinators():
+    """Test: all/not/share predicates and explicit evidence ratings"""
+    rules = RedFlagRuleSet([{
+        "name": "mostly_negative",
+        "scope": "category",
+        "when": {"all": [
+            {"share": ["yellow-flag", "red-flag"], "gt": 0.5},
+            {"not": {"count": "strong-match", "gte": 1}},
+        ]},
+        "severity": "medium",
+        "signal": "{count} of {total} {category} answers are flags",
+    }])
+    features = ScanFeatures([
+        {"question_id": "q1", "category": "goals", "rating": "yellow-flag"},
+        {"question_id": "q2", "category": "goals", "rating": "yellow-flag"},
+        {"question_id": "q3", "category": "goals", "rating": "neutral"},
+        {"question_id": "q4", "category": "trust", "rating": "red-flag"},
+        {"question_id": "q5", "category": "trust", "rating": "strong-match"},
+        {"question_id": "q6", "category": "trust", "rating": "red-flag"},
+    ])
+
+    assert signals(rules.evaluate(features)) == [
+        ("medium", "goals", "2 of 3 goals answers are flags", ["q1", "q2"]),
+    ]
+
+
+@pytest.mark.parametrize("config", [
+    {"red_flag_rules": "not-a-list"},
+    {"red_flag_rules": [{"scope": "scan", "signal": "x"}]},
+    {"red_flag_rules": [{"when": {"count": ["red-flag"]}, "signal": "x"}]},
+    {"red_flag_rules": [{"when": {"count": ["red-flag"], "gte": 1}, "signal": "{nope}"}]},
+    {"red_flag_rules": [{"when": {"count": ["red-flag"], "gte": 1}, "signal": "x", "scope": "user"}]},
+])
+def test_invalid_rules_are_rejected(config):
+    """Test: malformed rule configs fail to compile"""
+    with pytest.raises(ValueError):
+        RedFlagRuleSet.from_scoring_config(config)
+
+
+def test_store_swaps_rules_on_activation(fake_supabase):
+    """Test: store follows the active version and keeps the last good rules on bad config"""
+    custom = [{"when": {"count": ["neutral"], "gte": 1}, "signal": "Neutral answers"}]
+    fake_supabase.tables["ai_logic_versions"] = [
+        {"version": "2.0.0", "is_active": True, "activated_at": "2026-01-01", "scoring_config": {}},
+    ]
+    store = RedFlagRuleStore(fake_supabase, refresh_interval=3600)
+
+    assert store.current().config == DEFAULT_RULE_SET.config
+    assert store.current().version == "2.0.0"
+
+    versions = fake_supabase.tables["ai_logic_versions"]
+    versions[0]["is_active"] = False
+    versions.append({
+        "version": "2.1.0",
+        "is_active": True,
+        "activated_at": "2026-02-01",
+        "scoring_config": {"red_flag_rules": custom},
+    })
+    # Throttled: still the cached rules until the refresh interval passes
+    assert store.current().version == "2.0.0"
+
+    store.invalidate()
+    assert store.current().config == custom
+
+    versions[1]["scoring_config"] = {"red_flag_rules": [{"signal": "broken"}]}
+    versions[1]["activated_at"] = "2026-03-01"
+    store.invalidate()
+    assert store.current().config == custom
+
+
+def test_snapshot_refreshes_in_the_background(fake_supabase):
+    """Test: a due snapshot returns the cached rules at once and loads the new ones off-thread"""
+    custom = [{"when": {"count": ["neutral"], "gte": 1}, "signal": "Neutral answers"}]
+    fake_supabase.tables["ai_logic_versions"] = [
+        {"version": "2.1.0", "is_active": True, "activated_at": "2026-02-01",
+         "scoring_config": {"red_flag_rules": custom}},
+    ]
+    store = RedFlagRuleStore(fake_supabase, refresh_interval=3600)
+    loading = threading.Event()
+    release = threading.Event()
+    fetch = store._fetch_active_version
+
+    def slow_fetch():
+        loading.set()
+        release.wait(5)
+        return fetch()
+
+    store._fetch_active_version = slow_fetch
+    try:
+        assert store.snapshot() is DEFAULT_RULE_SET
+        assert loading.wait(5)
+        # Still loading: callers keep getting the cached rules without waiting
+        assert store.snapshot() is DEFAULT_RULE_SET
+    finally:
+        release.set()
+
+    for _ in range(100):
+        if not store._refreshing:
+            break
+        time.sleep(0.01)
+    assert store.snapshot().config == custom
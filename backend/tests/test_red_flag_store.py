@@ -0,0 +1,46 @@
+"""
+Tests for red flag persistence.
+Run with: pytest backend/tests/test_red_flag_store.py -v
+"""
+import asyncio
+from uuid import uuid4
+
+from app.services.red_flag_engine import compute_pattern_hash
+from app.services.red_flag_store import build_red_flag_rows
+
+
+def make_flag(evidence, detected_at="2026-01-01T00:00:00"):
+    return {
+        "severity": "high",
+        "category": "trust",
+        "signal": "Multiple concerns in trust category",
+        "evidence": evidence,
+        "detected_at": detected_at,
+    }
+
+
+def test_pattern_hash_ignores_order_and_timestamp():
+    """Test: the hash depends only on the flag signature"""
+    a = compute_pattern_hash(make_flag(["q1", "q2"]))
+    b = compute_pattern_hash(make_flag(["q2", "q1"], detected_at="2026-02-01T00:00:00"))
+
+    assert a == b
+    assert len(a) == 64
+    assert a != compute_pattern_hash(make_flag(["q1", "q3"]))
+
+
+def test_build_red_flag_rows_and_repository_save(fake_supabase, fake_repositories):
+    """Test: build_red_flag_rows keeps one row per pattern; RedFlagRepository.save upserts once and reruns add nothing"""
+    scan_id, user_id, result_id = uuid4(), uuid4(), uuid4()
+    flags = [make_flag(["q1", "q2"]), make_flag(["q2", "q1"]), make_flag(["q5"])]
+
+    rows = build_red_flag_rows(flags, scan_id, user_id, result_id)
+    assert len(rows) == 2
+    asyncio.run(fake_repositories.red_flags.save(rows))
+    asyncio.run(fake_repositories.red_flags.save(rows))
+
+    rows = fake_supabase.tables["red_flags"]
+    assert len(rows) == 2
+    assert fake_supabase.calls == [("red_flags", "upsert"), ("red_flags", "upsert")]
+    assert {row["scan_result_id"] for row in rows} == {str(result_id)}
+    assert rows[0]["pattern_hash"] == compute_pattern_hash(flags[0])
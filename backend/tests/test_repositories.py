@@ -0,0 +1,133 @@
+"""
+Tests for the repository layer.
+Run with: pytest backend/tests/test_repositories.py -v
+"""
+import asyncio
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from app.repositories.postgres import PostgresRepositories, record_to_row
+
+
+class RecordingPool:
+    """Stands in for PostgresPool and records the SQL it is sent."""
+
+    def __init__(self, rows=None):
+        self.rows = rows or []
+        self.statements = []
+
+    async def fetch(self, query, *args):
+        self.statements.append((query, args))
+        return self.rows
+
+    async def fetchrow(self, query, *args):
+        self.statements.append((query, args))
+        return self.rows[0] if self.rows else None
+
+    async def execute(self, query, *args):
+        self.statements.append((query, args))
+        return "INSERT 0 1"
+
+    async def close(self):
+        pass
+
+
+def test_rest_blueprints_owner_and_update(fake_supabase, fake_repositories):
+    """Test: ownership is checked and updates stamp updated_at"""
+    user_id = uuid4()
+    created = asyncio.run(fake_repositories.blueprints.create({
+        "user_id": str(user_id), "answers": [], "is_active": True
+    }))
+
+    assert asyncio.run(fake_repositories.blueprints.get_owned(created["id"], uuid4())) is None
+    assert asyncio.run(fake_repositories.blueprints.get_active(user_id))["id"] == created["id"]
+
+    updated = asyncio.run(fake_repositories.blueprints.update(created["id"], {"completion_percentage": 40}))
+    assert updated["completion_percentage"] == 40
+    assert updated["updated_at"]
+
+
+def test_postgres_keyset_query():
+    """Test: cursor pages use a row comparison on (created_at, id) with typed parameters"""
+    pool = RecordingPool()
+    repos = PostgresRepositories(pool)
+    user_id, row_id = uuid4(), uuid4()
+
+    asyncio.run(repos.scan_results.list_for_user(
+        user_id, 20, after=("2026-01-01T00:00:00+00:00", str(row_id)), offset=40
+    ))
+
+    (query, args), = pool.statements
+    assert "(r.created_at, r.id) < ($2, $3)" in query
+    assert "ORDER BY r.created_at DESC, r.id DESC LIMIT $4 OFFSET $5" in query
+    assert args == (str(user_id), datetime(2026, 1, 1, tzinfo=timezone.utc), row_id, 20, 0)
+
+
+def test_postgres_writes_and_rows():
+    """Test: writes go through jsonb_populate_record(set); rows come back PostgREST-shaped"""
+    pool = RecordingPool()
+    repos = PostgresRepositories(pool)
+    asyncio.run(repos.red_flags.save([
+        {"scan_id": "s", "pattern_hash": "a", "detected_at": "2026-01-01T00:00:00"},
+        {"scan_id": "s", "pattern_hash": "b"},
+        {"scan_id": "s", "pattern_hash": "c", "detected_at": "2026-01-01T00:00:00"},
+    ]))
+
+    # Rows without detected_at are inserted separately so the column keeps its default
+    assert [len(args[0]) for _, args in pool.statements] == [2, 1]
+    assert all("jsonb_populate_recordset(NULL::red_flags" in query for query, _ in pool.statements)
+
+    row_id = uuid4()
+    created_at = datetime(2026, 1, 2, tzinfo=timezone.utc)
+    assert record_to_row({"id": row_id, "created_at": created_at, "answers": []}) == {
+        "id": str(row_id), "created_at": "2026-01-02T00:00:00+00:00", "answers": []
+    }
+
+
+def test_postgres_create_with_result_single_statement():
+    """Test: scan and result are inserted by one CTE statement; the result takes the new scan's id"""
+    pool = RecordingPool(rows=[{"scan": {"id": "s"}, "result": {"id": "r", "scan_id": "s"}}])
+    repos = PostgresRepositories(pool)
+
+    scan, result = asyncio.run(repos.scans.create_with_result(
+        {"id": "s", "user_id": "u", "scan_type": "single"},
+        {"id": "r", "scan_id": "s", "overall_score": 70}
+    ))
+
+    (query, args), = pool.statements
+    assert query.startswith("WITH new_scan AS (INSERT INTO scans")
+    assert 'INSERT INTO scan_results (scan_id, "id", "overall_score") SELECT new_scan.id, r."id", r."overall_score"' in query
+    assert len(args) == 2
+    assert (scan["id"], result["scan_id"]) == ("s", "s")
+
+
+def test_postgres_rescore_writes():
+    """Test: result upserts replace by id; prune keeps the listed and acknowledged patterns"""
+    pool = RecordingPool()
+    repos = PostgresRepositories(pool)
+
+    asyncio.run(repos.scan_results.upsert([{"id": "r", "scan_id": "s", "overall_score": 70}]))
+    asyncio.run(repos.red_flags.prune({"s1": ["a", "b"], "s2": []}))
+
+    (upsert, _), (prune, args) = pool.statements
+    assert upsert.endswith('ON CONFLICT (id) DO UPDATE SET "scan_id" = EXCLUDED."scan_id", '
+                           '"overall_score" = EXCLUDED."overall_score"')
+    assert "acknowledged_at IS NULL AND resolved_at IS NULL" in prune
+    assert args == (["s1", "s2"], ["s1:a", "s1:b"])
+
+
+def test_postgres_subscription_and_pattern_stats():
+    """Test: subscription status is one column of one row; pattern stats go to merge_pattern_stats"""
+    pool = RecordingPool(rows=[{"subscription_status": "premium"}])
+    repos = PostgresRepositories(pool)
+    user_id = uuid4()
+
+    assert asyncio.run(repos.users.get_subscription_status(user_id)) == "premium"
+    asyncio.run(repos.pattern_stats.merge([]))
+    asyncio.run(repos.pattern_stats.merge([{"pattern_hash": "a", "occurrence_count": 1}]))
+
+    (lookup, lookup_args), (merge, merge_args) = pool.statements
+    assert lookup == "SELECT subscription_status FROM users WHERE id = $1"
+    assert lookup_args == (str(user_id),)
+    assert merge == "SELECT merge_pattern_stats($1::jsonb)"
+    assert merge_args == ([{"pattern_hash": "a", "occurrence_count": 1}],)
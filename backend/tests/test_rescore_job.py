@@ -0,0 +1,178 @@
+"""
+Tests for the bulk rescoring job.
+Run with: pytest backend/tests/test_rescore_job.py -v
+"""
+import uuid
+
+import pytest
+
+from app.services.red_flag_rules import RedFlagRuleStore
+from app.services.rescore_job import RescoreJob
+
+RATINGS = ["strong-match", "good", "neutral", "yellow-flag", "red-flag"]
+
+
+@pytest.fixture
+def seeded(fake_supabase):
+    users, blueprints, scans, results = [], [], [], []
+    for u in range(3):
+        user_id = str(uuid.UUID(int=u + 1))
+        users.append({"id": user_id, "email": f"user{u}@example.com"})
+        if u < 2:  # third user has no active blueprint
+            blueprints.append({
+                "id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "is_active": True,
+                "profile_summary": {"category_weights": {"values": 2.0}},
+            })
+        for s in range(5):
+            scans.append({
+                "id": str(uuid.UUID(int=1000 + u * 10 + s)),
+                "user_id": user_id,
+                "scan_type": "full",
+                "status": "completed",
+                "answers": [
+                    {"question_id": f"q{i}", "category": ["values", "trust"][i % 2], "rating": RATINGS[(s + i) % 5]}
+                    for i in range(6)
+                ],
+            })
+    results.append({
+        "id": "existing-result",
+        "scan_id": scans[0]["id"],
+        "ai_version": "0.9.0",
+        "created_at": "2024-01-01T00:00:00",
+    })
+    results.append({
+        "id": "current-result",
+        "scan_id": scans[1]["id"],
+        "ai_version": "2.0.0",
+        "created_at": "2024-01-01T00:00:00",
+    })
+    fake_supabase.tables.update({
+        "users": users,
+        "blueprints": blueprints,
+        "scans": scans,
+        "scan_results": results,
+        "red_flags": [],
+    })
+    return fake_supabase
+
+
+@pytest.fixture
+def make_job(seeded, fake_repositories):
+    def make(**options):
+        return RescoreJob(
+            "2.0.0", repositories=fake_repositories, rule_store=RedFlagRuleStore(seeded),
+            page_size=4, **options
+        )
+    return make
+
+
+def test_rescore_upserts_and_skips(seeded, make_job):
+    """Test: stale results are replaced in place, current ones and blueprint-less users skipped"""
+    stats = make_job().run()
+
+    assert stats.scanned == 15
+    assert stats.skipped_current == 1
+    assert stats.skipped_missing == 5
+    assert stats.rescored == 9
+    assert stats.pages == 4
+
+    results = {row["scan_id"]: row for row in seeded.tables["scan_results"]}
+    assert len(seeded.tables["scan_results"]) == 10
+    assert results[seeded.tables["scans"][0]["id"]]["id"] == "existing-result"
+    assert results[seeded.tables["scans"][0]["id"]]["ai_version"] == "2.0.0"
+    assert "overall_score" not in results[seeded.tables["scans"][1]["id"]]
+
+
+def test_rescore_resumes_from_checkpoint(seeded, make_job, tmp_path):
+    """Test: an interrupted run continues after the last written page"""
+    checkpoint = str(tmp_path / "rescore.json")
+
+    first = make_job(checkpoint_path=checkpoint).run(max_pages=2)
+    assert first.pages == 2
+
+    seeded.calls.clear()
+    stats = make_job(checkpoint_path=checkpoint).run()
+
+    assert stats.pages == 4
+    assert stats.scanned == 15
+    assert stats.rescored == 9
+    # Only the remaining pages are read again
+    assert seeded.calls.count(("scans", "select")) == 3
+
+
+def test_rescore_with_worker_processes(seeded, make_job):
+    """Test: the process pool path produces the same results as inline scoring"""
+    stats = make_job(workers=2).run()
+
+    assert stats.rescored == 9
+    rescored = [row for row in seeded.tables["scan_results"] if row.get("overall_score") is not None]
+    assert len(rescored) == 9
+
+
+def test_rescore_saves_red_flags_and_counts_skips_after_write(seeded, fake_repositories, make_job, monkeypatch):
+    """Test: flags land in red_flags with the results; a failed write counts nothing as skipped"""
+    stats = make_job().run()
+
+    flagged = [row for row in seeded.tables["scan_results"] if row.get("red_flags")]
+    assert flagged
+    saved = {(row["scan_id"], row["pattern_hash"]) for row in seeded.tables["red_flags"]}
+    assert saved == {
+        (row["scan_id"], flag["pattern_hash"]) for row in flagged for flag in row["red_flags"]
+    }
+    assert all(row["scan_result_id"] for row in seeded.tables["red_flags"])
+    assert stats.skipped_missing == 5
+
+    # Rescoring again re-saves without duplicating
+    make_job(force=True).run()
+    assert len(seeded.tables["red_flags"]) == len(saved)
+
+    async def fail(rows):
+        raise ConnectionError("write failed")
+    monkeypatch.setattr(fake_repositories.red_flags, "save", fail)
+    job = make_job(force=True)
+    with pytest.raises(ConnectionError):
+        job.run()
+    assert (job.stats.pages, job.stats.skipped_current, job.stats.skipped_missing) == (0, 0, 0)
+
+
+def test_rescore_pages_result_lookups(seeded, fake_repositories, make_job):
+    """Test: `in` lookups are read in pages, so a row cap cannot hide a scan's latest result"""
+    scan_id = seeded.tables["scans"][0]["id"]
+    seeded.tables["scan_results"].append({
+        "id": "zz-newer-current",
+        "scan_id": scan_id,
+        "ai_version": "2.0.0",
+        "created_at": "2025-01-01T00:00:00",
+    })
+    fake_repositories.scan_results.in_page_size = 1
+
+    stats = make_job().run()
+
+    assert stats.skipped_current == 2
+    assert stats.rescored == 8
+
+
+def test_rescore_prunes_stale_unacknowledged_flags(seeded, make_job):
+    """Test: patterns the new scoring no longer produces are deleted unless acknowledged or resolved"""
+    scan = seeded.tables["scans"][0]
+    stale = {"scan_id": scan["id"], "user_id": scan["user_id"], "severity": "high", "category": "old"}
+    seeded.tables["red_flags"] = [
+        {**stale, "id": "stale", "pattern_hash": "a" * 64},
+        {**stale, "id": "acknowledged", "pattern_hash": "b" * 64, "acknowledged_at": "2024-02-01T00:00:00"},
+        {**stale, "id": "resolved", "pattern_hash": "c" * 64, "resolved_at": "2024-02-01T00:00:00"},
+    ]
+
+    make_job().run()
+
+    ids = {row["id"] for row in seeded.tables["red_flags"]}
+    assert "stale" not in ids
+    assert {"acknowledged", "resolved"} <= ids
+    current = {
+        flag["pattern_hash"] for row in seeded.tables["scan_results"]
+        if row["scan_id"] == scan["id"] for flag in row["red_flags"]
+    }
+    assert {row["pattern_hash"] for row in seeded.tables["red_flags"] if row["scan_id"] == scan["id"]} == (
+        current | {"b" * 64, "c" * 64}
+    )
@@ -0,0 +1,79 @@
+"""
+Tests for the scan results listing.
+Run with: pytest backend/tests/test_results_api.py -v
+"""
+import asyncio
+from uuid import UUID, uuid4
+
+from fastapi import Response
+
+from app.api import results
+from app.models.db_models import ScanResult
+from app.utils.pagination import NEXT_CURSOR_HEADER
+
+AI_ANALYSIS = {
+    "strengths": ["trust"],
+    "awareness_areas": [],
+    "confidence_score": 0.8,
+    "explanation": "x",
+    "recommended_action": "proceed",
+    "action_label": "Proceed",
+    "action_guidance": "x",
+}
+
+
+def make_rows(user_id, count, day_offset=0):
+    scans, rows = [], []
+    for i in range(count):
+        scan = {"id": str(uuid4()), "user_id": user_id}
+        scans.append(scan)
+        rows.append({
+            "id": str(uuid4()),
+            "scan_id": scan["id"],
+            "overall_score": 50 + i,
+            "category": "mixed-signals",
+            "category_scores": {"trust": 60},
+            "ai_analysis": AI_ANALYSIS,
+            "red_flags": [{"severity": "high", "category": "trust", "signal": "x", "evidence": ["q1"], "pattern_hash": "h"}],
+            "inconsistencies": None,
+            "profile_mismatches": [],
+            "explanation_metadata": {"large": "x" * 100},
+            "ai_version": "1.0.0",
+            "created_at": f"2026-01-{day_offset + i + 1:02d}T00:00:00",
+        })
+    return scans, rows
+
+
+def test_list_scan_results_joined_keyset_pages(fake_supabase, fake_repositories, monkeypatch):
+    """Test: one query per page, filtered by owner, newest first, paged by cursor"""
+    user_id = str(uuid4())
+    scans, rows = make_rows(user_id, 5)
+    other_scans, other_rows = make_rows(str(uuid4()), 3, day_offset=10)
+    fake_supabase.tables = {"scans": scans + other_scans, "scan_results": rows + other_rows}
+    monkeypatch.setattr(results, "get_repositories", lambda: fake_repositories)
+
+    first_response, second_response = Response(), Response()
+    first = asyncio.run(results.list_scan_results(first_response, user_id=UUID(user_id), limit=3))
+    second = asyncio.run(results.list_scan_results(
+        second_response, user_id=UUID(user_id), limit=3, cursor=first_response.headers[NEXT_CURSOR_HEADER]
+    ))
+
+    assert fake_supabase.calls == [("scan_results", "select"), ("scan_results", "select")]
+    assert [str(r.id) for r in first + second] == [row["id"] for row in reversed(rows)]
+    assert NEXT_CURSOR_HEADER not in second_response.headers
+    assert first[0].inconsistencies == []
+    assert first[0].red_flags[0].evidence == ["q1"]
+
+
+def test_converter_matches_scan_result():
+    """Test: the row converter agrees with the ScanResult model"""
+    _, (row,) = make_rows(str(uuid4()), 1)
+    row["inconsistencies"] = [{"category": "trust"}]
+    response = results.to_scan_result_response(row)
+    scan_result = ScanResult.from_dict(row)
+
+    assert response.id == scan_result.id
+    assert response.scan_id == scan_result.scan_id
+    assert response.category_scores == scan_result.category_scores
+    assert response.inconsistencies == scan_result.inconsistencies
+    assert response.ai_analysis.confidence_score == 0.8
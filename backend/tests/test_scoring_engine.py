@@ -0,0 +1,76 @@
+"""
+Tests for the scoring engine batch path.
+Run with: pytest backend/tests/test_scoring_engine.py -v
+"""
+import random
+from uuid import uuid4
+
+import pytest
+
+from app.models.db_models import Blueprint, Scan, User
+from app.services.scoring_engine import RATING_SCORES, ScoringEngine
+
+CATEGORIES = ["values", "communication", "trust", "lifestyle", "intimacy", "goals"]
+RATINGS = list(RATING_SCORES) + ["unknown-rating"]
+
+
+@pytest.fixture
+def engine():
+    return ScoringEngine(ai_version="test")
+
+
+def make_scan(rng):
+    answers = []
+    for i in range(rng.randint(0, 30)):
+        answer = {"question_id": f"q{i}"}
+        if rng.random() > 0.05:
+            answer["category"] = rng.choice(CATEGORIES)
+        if rng.random() > 0.05:
+            answer["rating"] = rng.choice(RATINGS)
+        answers.append(answer)
+    return Scan(id=uuid4(), user_id=uuid4(), scan_type="full", answers=answers)
+
+
+def make_blueprint(rng):
+    kind = rng.randint(0, 3)
+    if kind == 0:
+        profile_summary = None
+    elif kind == 1:
+        profile_summary = {"category_weights": {}}
+    else:
+        weights = {
+            cat: rng.choice([rng.random(), rng.randint(0, 3)])
+            for cat in rng.sample(CATEGORIES, rng.randint(1, len(CATEGORIES)))
+        }
+        profile_summary = {"category_weights": weights}
+    return Blueprint(id=uuid4(), user_id=uuid4(), profile_summary=profile_summary)
+
+
+def test_score_batch_matches_process_scan(engine):
+    """Test: batch results are identical to the per-scan path"""
+    rng = random.Random(11)
+    scans = [make_scan(rng) for _ in range(400)]
+    blueprints = [make_blueprint(rng) for _ in scans]
+    user = User(id=uuid4(), email="test@example.com")
+
+    batch = engine.score_batch(scans, blueprints)
+
+    assert len(batch) == len(scans)
+    for scan, blueprint, result in zip(scans, blueprints, batch):
+        expected = engine.process_scan(scan, blueprint, user)
+        assert result.scan_id == scan.id
+        assert result.overall_score == expected.overall_score
+        assert result.category == expected.category
+        assert list(result.category_scores.items()) == list(expected.category_scores.items())
+        assert result.ai_analysis == expected.ai_analysis
+        assert result.explanation_metadata == expected.explanation_metadata
+        assert result.ai_version == "test"
+
+
+def test_score_batch_empty_and_mismatched(engine):
+    """Test: empty input returns nothing and misaligned inputs are rejected"""
+    assert engine.score_batch([], []) == []
+
+    rng = random.Random(1)
+    with pytest.raises(ValueError):
+        engine.score_batch([make_scan(rng)], [])
@@ -0,0 +1,131 @@
+"""
+Tests for Amora conversation session stores.
+Run with: pytest backend/tests/test_session_store.py -v
+"""
+import pytest
+
+from app.services.conversation_state import CONFIDENCE_HISTORY_SIZE, ConversationState
+from app.services.session_store import InMemorySessionStore, RedisSessionStore
+
+
+class FakeRedis:
+    """Minimal Redis-compatible client backed by a dict."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+
+    def get(self, name):
+        return self.data.get(name)
+
+    def set(self, name, value, ex=None):
+        self.data[name] = value.encode() if isinstance(value, str) else value
+        self.expiry[name] = ex
+
+    def delete(self, name):
+        self.data.pop(name, None)
+
+
+@pytest.fixture
+def state():
+    state = ConversationState(is_first_message=False, turns_count=4)
+    state.record_confidence("LOW")
+    state.record_confidence("MEDIUM")
+    state.add_theme("trust")
+    state.update_emotions({"anxiety": 0.7})
+    state.unresolved_questions.append("should I stay?")
+    return state
+
+
+def test_state_history_is_bounded():
+    """Test: confidence history and themes keep only the most recent entries"""
+    state = ConversationState()
+    for i in range(CONFIDENCE_HISTORY_SIZE + 5):
+        state.record_confidence("HIGH" if i % 2 else "LOW")
+    for theme in ["trust", "love", "trust", "decision", "communication"]:
+        state.add_theme(theme)
+
+    assert len(state.confidence_history) == CONFIDENCE_HISTORY_SIZE
+    assert state.confidence_history[-1] == "LOW"
+    assert state.recent_themes == ["love", "decision", "communication"]
+
+
+def test_state_emotions_are_rolling_averages():
+    """Test: first observation is stored as-is, later ones are averaged"""
+    state = ConversationState()
+    state.update_emotions({"hope": 0.5})
+    state.update_emotions({"hope": 1.0, "sadness": 0.25})
+
+    assert state.emotional_patterns == {
+        "sadness": pytest.approx(0.25),
+        "hope": pytest.approx(0.75),
+    }
+
+
+def test_state_binary_round_trip(state):
+    """Test: to_bytes/from_bytes preserves every field"""
+    loaded = ConversationState.from_bytes(state.to_bytes())
+
+    assert loaded.to_dict() == state.to_dict()
+    assert len(state.to_bytes()) < 64
+
+
+def test_long_question_truncated_on_character_boundary():
+    """Test: a question over 64KiB is cut between characters and still loads"""
+    state = ConversationState()
+    state.unresolved_questions.append("\u00e9" * 40000)  # 2-byte chars; the limit is odd
+
+    loaded = ConversationState.from_bytes(state.to_bytes())
+
+    question = loaded.unresolved_questions[0]
+    assert len(question.encode("utf-8")) <= 0xFFFF
+    assert state.unresolved_questions[0].startswith(question)
+
+
+def test_memory_store_round_trip(state):
+    """Test: stored state is returned for the same session key"""
+    store = InMemorySessionStore(max_sessions=10)
+    store.set("session-1", state)
+
+    assert store.get("session-1") is state
+    assert store.get("session-2") is None
+
+
+def test_memory_store_is_bounded(state):
+    """Test: least recently used sessions are evicted past max_sessions"""
+    store = InMemorySessionStore(max_sessions=2)
+    store.set("a", state)
+    store.set("b", state)
+    store.get("a")
+    store.set("c", state)
+
+    assert len(store) == 2
+    assert store.get("b") is None
+    assert store.get("a") is not None
+
+
+def test_redis_store_round_trip(state):
+    """Test: state survives serialization through a Redis-compatible client"""
+    client = FakeRedis()
+    store = RedisSessionStore(client, ttl_seconds=60)
+    store.set("session-1", state)
+
+    loaded = store.get("session-1")
+    assert loaded is not state
+    assert loaded.turns_count == 4
+    assert loaded.is_first_message is False
+    assert loaded.confidence_history == ["LOW", "MEDIUM"]
+    assert loaded.recent_themes == ["trust"]
+    assert loaded.emotional_patterns["anxiety"] == pytest.approx(0.7)
+    assert loaded.unresolved_questions == ["should I stay?"]
+    assert client.expiry["amora:session:session-1"] == 60
+
+
+def test_redis_store_missing_and_delete(state):
+    """Test: unknown keys return None and delete removes the session"""
+    store = RedisSessionStore(FakeRedis(), ttl_seconds=60)
+    assert store.get("missing") is None
+
+    store.set("session-1", state)
+    store.delete("session-1")
+    assert store.get("session-1") is None
@@ -0,0 +1,86 @@
+"""
+Tests for the coach subscription cache.
+Run with: pytest backend/tests/test_subscription_cache.py -v
+"""
+import asyncio
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.services import subscription_cache
+from app.services.subscription_cache import SubscriptionCache, invalidate_subscription
+from app.utils import cache as cache_module
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def lookups(fake_supabase):
+    return fake_supabase.calls.count(("users", "select"))
+
+
+def test_premium_is_cached_until_ttl(fake_supabase, fake_repositories, clock):
+    """Test: repeated messages from a premium user hit the database once per TTL"""
+    user_id = str(uuid4())
+    fake_supabase.tables = {"users": [{"id": user_id, "subscription_status": "premium"}]}
+    subscriptions = SubscriptionCache(fake_repositories.users, max_entries=10, ttl_seconds=300, negative_ttl_seconds=60)
+
+    assert all(asyncio.run(subscriptions.is_premium(UUID(user_id))) for _ in range(5))
+    assert lookups(fake_supabase) == 1
+
+    clock[0] += 301
+    assert asyncio.run(subscriptions.is_premium(UUID(user_id)))
+    assert lookups(fake_supabase) == 2
+
+
+def test_negative_answers_use_short_ttl(fake_supabase, fake_repositories, clock):
+    """Test: free, unknown and failed lookups are cached for the negative TTL only"""
+    user_id = str(uuid4())
+    fake_supabase.tables = {"users": [{"id": user_id, "subscription_status": "free"}]}
+    subscriptions = SubscriptionCache(fake_repositories.users, max_entries=10, ttl_seconds=300, negative_ttl_seconds=60)
+    unknown = uuid4()
+
+    for _ in range(3):
+        assert not asyncio.run(subscriptions.is_premium(UUID(user_id)))
+        assert not asyncio.run(subscriptions.is_premium(unknown))
+    assert lookups(fake_supabase) == 2
+
+    # An upgrade shows up once the negative entry expires
+    fake_supabase.tables["users"][0]["subscription_status"] = "premium"
+    clock[0] += 61
+    assert asyncio.run(subscriptions.is_premium(UUID(user_id)))
+
+
+def test_invalidate_applies_change_immediately(fake_supabase, fake_repositories, clock):
+    """Test: invalidate() drops the cached entitlement"""
+    user_id = str(uuid4())
+    fake_supabase.tables = {"users": [{"id": user_id, "subscription_status": "premium"}]}
+    subscriptions = SubscriptionCache(fake_repositories.users, max_entries=10, ttl_seconds=300, negative_ttl_seconds=60)
+    assert asyncio.run(subscriptions.is_premium(UUID(user_id)))
+
+    fake_supabase.tables["users"][0]["subscription_status"] = "free"
+    subscriptions.invalidate(UUID(user_id))
+
+    assert not asyncio.run(subscriptions.is_premium(UUID(user_id)))
+    assert subscriptions.stats()["hits"] == 0
+
+
+def test_invalidate_subscription_hook_rereads_user(fake_supabase, fake_repositories, monkeypatch, clock):
+    """Test: after the hook runs, the next check reads the user's new status from the database"""
+    user_id = uuid4()
+    fake_supabase.tables = {"users": [{"id": str(user_id), "subscription_status": "free"}]}
+    subscriptions = SubscriptionCache(fake_repositories.users, max_entries=10, ttl_seconds=300, negative_ttl_seconds=60)
+    monkeypatch.setattr(subscription_cache, "_subscription_cache", subscriptions)
+    assert not asyncio.run(subscriptions.is_premium(user_id))
+    assert not asyncio.run(subscriptions.is_premium(user_id))
+    assert lookups(fake_supabase) == 1
+
+    fake_supabase.tables["users"][0]["subscription_status"] = "premium"
+    invalidate_subscription(user_id)
+
+    assert asyncio.run(subscriptions.is_premium(user_id))
+    assert lookups(fake_supabase) == 2
@@ -0,0 +1,97 @@
+"""
+Tests for the Amora template index.
+Run with: pytest backend/tests/test_template_index.py -v
+"""
+import random
+
+import numpy as np
+import pytest
+
+from app.services.template_index import TemplateIndex
+
+
+class FlakyClient:
+    """Fake client that counts queries and can be made to fail."""
+
+    def __init__(self, fake):
+        self.fake = fake
+        self.queries = 0
+        self.fail = False
+
+    def table(self, name):
+        self.queries += 1
+        if self.fail:
+            raise ConnectionError("database unavailable")
+        return self.fake.table(name)
+
+
+def template(template_id, embedding, level="HIGH", updated_at="2026-01-01T00:00:00"):
+    return {
+        "id": template_id, "active": True, "confidence_level": level,
+        "embedding": embedding, "updated_at": updated_at,
+    }
+
+
+@pytest.fixture
+def client(fake_supabase):
+    fake_supabase.tables = {"amora_templates": [template("a", [1.0, 0.0]), template("b", [0.0, 1.0])]}
+    return FlakyClient(fake_supabase)
+
+
+def test_reload_only_when_watermark_moves(fake_supabase, client):
+    """Test: one watermark query per check; templates reload only when (updated_at, count) changes"""
+    index = TemplateIndex(supabase=client, refresh_interval=0)
+
+    index.top_k("HIGH", [1.0, 0.0])
+    assert client.queries == 2  # watermark + load
+
+    for _ in range(3):
+        index.top_k("HIGH", [1.0, 0.0])
+    assert client.queries == 5  # watermark only
+
+    # Newer updated_at
+    fake_supabase.tables["amora_templates"][0]["updated_at"] = "2026-02-01T00:00:00"
+    index.top_k("HIGH", [1.0, 0.0])
+    assert client.queries == 7
+
+    # Same latest updated_at, different active count
+    fake_supabase.tables["amora_templates"].append(template("c", [0.6, 0.8]))
+    assert [t["id"] for t, _ in index.top_k("HIGH", [0.6, 0.8], k=3)][0] == "c"
+    assert client.queries == 9
+
+
+def test_failed_refresh_keeps_previous_snapshot(fake_supabase, client):
+    """Test: a refresh error leaves the last loaded templates in service"""
+    index = TemplateIndex(supabase=client, refresh_interval=0)
+    assert index.top_k("HIGH", [1.0, 0.0])[0][0]["id"] == "a"
+
+    client.fail = True
+    assert index.top_k("HIGH", [1.0, 0.0])[0][0]["id"] == "a"
+    assert index.top_k("HIGH", [0.0, 1.0])[0][0]["id"] == "b"
+
+
+def test_top_k_matches_per_template_cosine_loop():
+    """Test: the matrix-vector ranking agrees with cosine similarity computed template by template"""
+    rng = random.Random(7)
+    rows = [
+        template(str(i), [rng.uniform(-1, 1) for _ in range(16)])
+        for i in range(50)
+    ]
+    index = TemplateIndex(supabase=object())
+    index._partitions = TemplateIndex.build_partitions(rows)
+    index._watermark = ("x", len(rows))
+    index._last_checked = float("inf")
+
+    for _ in range(10):
+        query = np.array([rng.uniform(-1, 1) for _ in range(16)])
+        expected = []
+        for row in rows:
+            vector = np.asarray(row["embedding"])
+            score = float(query @ vector / (np.linalg.norm(query) * np.linalg.norm(vector)))
+            if score > 0:
+                expected.append((row["id"], score))
+        expected.sort(key=lambda pair: -pair[1])
+
+        ranked = index.top_k("HIGH", query, k=5)
+        assert [t["id"] for t, _ in ranked] == [template_id for template_id, _ in expected[:5]]
+        assert np.allclose([score for _, score in ranked], [score for _, score in expected[:5]], atol=1e-5)